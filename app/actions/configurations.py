@@ -203,6 +203,18 @@ class PullObservationsConfig(PullActionConfiguration):
         ge=1,
         ui_options=UIOptions(widget="updown"),
     )
+    max_parallel_units: int = FieldWithUIOptions(
+        1,
+        title="Max Parallel Units",
+        description=(
+            "How many (source × sub-window) slices are pulled from ER and sent to "
+            "Gundi at the same time. Raise it to speed up backfills over many "
+            "sources; each slice adds load on the ER instance. Default 1 (one at a time)."
+        ),
+        ge=1,
+        le=20,
+        ui_options=UIOptions(widget="updown"),
+    )
     continue_immediately: bool = FieldWithUIOptions(
         False,
         title="Continue Immediately (self-re-trigger)",
@@ -228,7 +240,7 @@ class PullObservationsConfig(PullActionConfiguration):
     )
 
     ui_global_options: GlobalUISchemaOptions = GlobalUISchemaOptions(
-        order=["start_datetime", "end_datetime", "subject_group_ids", "subwindow_days", "force_run_since_start", "continue_immediately", "run_on_schedule"],
+        order=["start_datetime", "end_datetime", "subject_group_ids", "subwindow_days", "max_parallel_units", "force_run_since_start", "continue_immediately", "run_on_schedule"],
     )
 
 
@@ -290,6 +302,28 @@ class PullEventsConfig(PullActionConfiguration):
             "downstream destinations receive."
         ),
     )
+    max_concurrent_updates: int = FieldWithUIOptions(
+        5,
+        title="Max Concurrent Event Updates",
+        description=(
+            "How many previously-forwarded ER events may have their updates (new notes, "
+            "changed fields, new attachments) sent to Gundi at the same time. Updates of "
+            "a single event are always sent in order. Default 5."
+        ),
+        ge=1,
+        le=50,
+        ui_options=UIOptions(widget="updown"),
+    )
+    continue_immediately: bool = FieldWithUIOptions(
+        False,
+        title="Continue Immediately (self-re-trigger)",
+        description=(
+            "When a run hits its time budget with events remaining, immediately "
+            "re-trigger the next chunk via PubSub instead of waiting for the next "
+            "scheduled tick. Faster backfills, but requires INTEGRATION_COMMANDS_TOPIC "
+            "to be configured. Off by default (scheduler-driven catch-up)."
+        ),
+    )
     event_types: List[str] = Field(
         default_factory=list,
         title="Event Types",
@@ -324,6 +358,6 @@ class PullEventsConfig(PullActionConfiguration):
     )
 
     ui_global_options: GlobalUISchemaOptions = GlobalUISchemaOptions(
-        order=["start_datetime", "end_datetime", "filter_date_field", "event_types", "event_categories", "force_run_since_start", "include_attachments", "run_on_schedule"],
+        order=["start_datetime", "end_datetime", "filter_date_field", "event_types", "event_categories", "force_run_since_start", "include_attachments", "max_concurrent_updates", "continue_immediately", "run_on_schedule"],
     )
 
@@ -1,9 +1,12 @@
+import asyncio
 import json
 import datetime
+import hashlib
 import logging
+import sys
 import time
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import Dict
 from urllib.parse import urlparse
 
@@ -17,13 +20,16 @@ from gundi_core.events import LogLevel
 from gundi_core.schemas.v2 import Integration
 from app import settings
 from app.services.utils import find_config_for_action
-from app.services.state import IntegrationStateManager
+from app.services.state import IntegrationStateManager, StateWriteBuffer
 from .configurations import AuthenticateConfig, EventFilterDateField, PullObservationsConfig, PullEventsConfig, \
     ERAuthenticationType, ShowPermissionsConfig
+from .observation_batcher import ObservationBatcher
 from .source_profiles import SourceProfileResolver
 from ..services.activity_logger import activity_logger, log_action_activity
 from ..services.gundi import send_events_to_gundi, send_observations_to_gundi, update_event_in_gundi, send_event_attachments_to_gundi
+from ..services.outbox import enqueue as enqueue_in_outbox, is_transient_send_error, outbox_delivery, outbox_depth
 from ..services.action_scheduler import trigger_action
+from ..services.admission import run_time_left
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +37,12 @@ logger = logging.getLogger(__name__)
 DEFAULT_CONNECT_TIMEOUT_SECONDS = 10.0
 BATCH_SIZE = 100
 SUBJECT_ID_CHUNK_SIZE = 25
-BUDGET_FRACTION = 0.8            # fraction of MAX_ACTION_EXECUTION_TIME before yielding
+BUDGET_FRACTION = 0.8            # fraction of the run's time left (before its hard timeout) spent before yielding
 MAX_NO_PROGRESS_RETRIES = 3      # self-re-trigger runaway guard
 LOCK_MARGIN_SECONDS = 30         # lease TTL margin above the hard timeout
 BACKFILL_LOCK_SOURCE_ID = "backfill-lock"
+CURSOR_FLUSH_UNITS = 25          # max completed units kept unflushed (re-done after a crash)
+OBSERVATION_SENDERS = 8          # observation batches in flight per pull_observations run (the send scheduler paces the POSTs)
 state_manager = IntegrationStateManager()
 
 # Maps the operator-selected date field to the corresponding key on ER's
@@ -45,6 +53,18 @@ ER_EVENT_FILTER_KEY_BY_DATE_FIELD = {
     EventFilterDateField.CREATED_AT: "create_date",
     EventFilterDateField.UPDATED_AT: "update_date",
 }
+# pull_events pages ascending on the filtered field (ER sort_by value) and
+# checkpoints on the same field of each event payload.
+ER_EVENT_SORT_BY_DATE_FIELD = {
+    EventFilterDateField.EVENT_TIME: "event_time",
+    EventFilterDateField.CREATED_AT: "created_at",
+    EventFilterDateField.UPDATED_AT: "updated_at",
+}
+ER_EVENT_PAYLOAD_KEY_BY_DATE_FIELD = {
+    EventFilterDateField.EVENT_TIME: "time",
+    EventFilterDateField.CREATED_AT: "created_at",
+    EventFilterDateField.UPDATED_AT: "updated_at",
+}
 
 
 async def action_auth(integration: Integration, action_config: AuthenticateConfig):
@@ -314,42 +334,41 @@ async def action_show_permissions(integration: Integration, action_config: ShowP
             client_id="das_web_client",
             connect_timeout=DEFAULT_CONNECT_TIMEOUT_SECONDS,
     ) as er_client:
-        try:  # Get user details and global permissions from the users/me endpoint
-            if auth_config.authentication_type == ERAuthenticationType.TOKEN:
-                er_user_details = await er_client.get_me()
-            elif auth_config.authentication_type == ERAuthenticationType.USERNAME_PASSWORD:
+        if auth_config.authentication_type == ERAuthenticationType.USERNAME_PASSWORD:
+            try:  # Log in once, before the concurrent lookups below share the token
                 token_retrieved = await er_client.login()
-                if not token_retrieved:
-                    response["data"]["User Details"]["error"] = "Invalid credentials. Please provide a valid username and password in the authentication config."
-                    return response
-                er_user_details = await er_client.get_me()
-            else:
-                response["data"]["User Details"]["error"] = "Please select an valid authentication method."
+            except Exception as e:
+                response["data"]["User Details"]["error"] = _user_details_error(e)
                 return response
-        except ERClientBadCredentials:
-            response["data"]["User Details"]["error"] = "Invalid credentials. Please provide a valid credentials in the authentication config."
-            return response
-        except httpx.HTTPStatusError as e:
-            try:  # ToDo: Handle this inside the er-client and raise ERClientBadCredentials
-                json_response = e.response.json()
-            except (ValueError, AttributeError):
-                json_response = {}
-            error_details = json_response.get("error_description") or response.text
-            response["data"]["User Details"]["error"] = f"ER status {e.response.status_code}: {error_details}"
+            if not token_retrieved:
+                response["data"]["User Details"]["error"] = "Invalid credentials. Please provide a valid username and password in the authentication config."
+                return response
+        elif auth_config.authentication_type != ERAuthenticationType.TOKEN:
+            response["data"]["User Details"]["error"] = "Please select an valid authentication method."
             return response
-        except Exception as e:
-            response["data"]["User Details"]["error"] = f"Error retrieving user details: {type(e).__name__}:{e}"
+        # users/me, eventtypes and subjectgroups don't depend on each other, so
+        # they're requested concurrently. Each result is checked on its own
+        # below: one failing endpoint only fills in that section's error.
+        include_subjects_from_subgroups_in_parent = action_config.include_subjects_from_subgroups_in_parent
+        er_user_details, event_types_response, subject_groups_response = await asyncio.gather(
+            _capture_error(er_client.get_me),
+            _capture_error(er_client.get_event_types),
+            _capture_error(er_client.get_subjectgroups, flat=not include_subjects_from_subgroups_in_parent),
+        )
+        # Get user details and global permissions from the users/me endpoint
+        if isinstance(er_user_details, Exception):
+            response["data"]["User Details"]["error"] = _user_details_error(er_user_details)
             return response  # Cannot continue without a valid user/token
         response["data"]["User Details"] = _extract_user_details(er_user_details=er_user_details)
         user_global_permissions = er_user_details.get("permissions", {})
         response["data"]["Global Permissions"] = _extract_global_permissions(er_user_permissions=user_global_permissions)
         global_category_permissions = _extract_category_permissions(er_user_permissions=user_global_permissions)
-        try:  # Get event categories and types from the activity/events/eventtypes endpoint
-            event_types_response = _as_list(await er_client.get_event_types())
-        except Exception as e:
+        # Get event categories and types from the activity/events/eventtypes endpoint
+        if isinstance(event_types_response, Exception):
+            e = event_types_response
             response["data"]["Event Categories"]["error"] = f"Error retrieving event categories: {type(e).__name__}:{e}"
         else:
-            event_types_response = [et for et in event_types_response if isinstance(et, dict)]
+            event_types_response = [et for et in _as_list(event_types_response) if isinstance(et, dict)]
             response["data"]["Event Categories"] = _merge_event_categories_and_type_perms(
                 global_category_permissions=global_category_permissions,
                 er_event_types=event_types_response
@@ -362,12 +381,9 @@ async def action_show_permissions(integration: Integration, action_config: ShowP
                 for et in event_types_response
                 if (et.get("category") or {}).get("value")
             })
-        try:  # Get Subject Groups from the subjectgroups/ endpoint
-            include_subjects_from_subgroups_in_parent = action_config.include_subjects_from_subgroups_in_parent
-            subject_groups_response = await er_client.get_subjectgroups(
-                flat=not include_subjects_from_subgroups_in_parent
-            )
-        except Exception as e:
+        # Get Subject Groups from the subjectgroups/ endpoint
+        if isinstance(subject_groups_response, Exception):
+            e = subject_groups_response
             response["data"]["Subject Groups"]["error"] = f"Error retrieving subject groups: {type(e).__name__}:{e}"
         else:
             response["data"]["Subject Groups"] = _extract_subject_groups(er_subject_groups=subject_groups_response)
@@ -377,13 +393,56 @@ async def action_show_permissions(integration: Integration, action_config: ShowP
     return response
 
 
+async def _capture_error(call, *args, **kwargs):
+    """Await ``call(*args, **kwargs)``, returning the exception instead of raising it.
+
+    Lets independent ER lookups run under one asyncio.gather while each keeps
+    its own error handling, as if it had been awaited in its own try block.
+    """
+    try:
+        return await call(*args, **kwargs)
+    except Exception as e:
+        return e
+
+
+def _user_details_error(error):
+    """Describe a failed ER login or users/me lookup for the show_permissions card."""
+    if isinstance(error, ERClientBadCredentials):
+        return "Invalid credentials. Please provide a valid credentials in the authentication config."
+    if isinstance(error, httpx.HTTPStatusError):
+        try:  # ToDo: Handle this inside the er-client and raise ERClientBadCredentials
+            json_response = error.response.json()
+        except (ValueError, AttributeError):
+            json_response = {}
+        error_details = json_response.get("error_description") or error.response.text
+        return f"ER status {error.response.status_code}: {error_details}"
+    return f"Error retrieving user details: {type(error).__name__}:{error}"
+
+
 @activity_logger()
 async def action_pull_events(integration: Integration, action_config: PullEventsConfig):
+    integration_id = str(integration.id)
+    # Same lease as pull_observations (under this action's own key): a run
+    # resuming from a checkpoint must not race an overlapping scheduled tick or
+    # re-trigger over the same pages (duplicate posts + checkpoint races).
+    if not await _acquire_backfill_lease(integration_id, action_id="pull_events"):
+        return _skip_quietly(
+            integration_id, "pull_events",
+            reason="pull_in_progress",
+            message="Skipping 'pull_events': another run holds the lease.",
+            log_level=logging.INFO,
+        )
+    try:
+        return await _pull_events(integration, action_config)
+    finally:
+        await _release_backfill_lease(integration_id, action_id="pull_events")
+
+
+async def _pull_events(integration: Integration, action_config: PullEventsConfig):
     integration_id = str(integration.id)
     logger.info(
         f"Extracting events for integration {integration_id}, with config {action_config}",
     )
-    total_events = 0
     execution_timestamp = datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
     # Parse configurations
     pull_config = action_config
@@ -418,10 +477,33 @@ async def action_pull_events(integration: Integration, action_config: PullEvents
         f"State retrieved for integration {integration_id}, action pull_events:\n{state}",
     )
     last_execution = state.get("last_execution")
-    if not last_execution or pull_config.force_run_since_start:
+    filter_date_field = pull_config.filter_date_field
+    checkpoint = state.get("checkpoint")
+    if checkpoint and checkpoint.get("filter_date_field") != filter_date_field.value:
+        # Pages were ordered by another field; its checkpoint says nothing here.
+        logger.warning(
+            "pull_events: discarding checkpoint taken on %r (now filtering on %r).",
+            checkpoint.get("filter_date_field"), filter_date_field.value,
+        )
+        checkpoint = None
+    if checkpoint:
+        # Resume an interrupted pull. The checkpoint wins over
+        # force_run_since_start, like the pull_observations cursor does.
+        start_datetime = checkpoint["after"]
+    elif not last_execution or pull_config.force_run_since_start:
         start_datetime = pull_config.start_datetime
     else:
         start_datetime = last_execution
+    if not checkpoint:
+        checkpoint = _new_events_checkpoint(filter_date_field=filter_date_field, after=start_datetime)
+    # Events at exactly the checkpoint value that were completed before the
+    # interruption; ER's lower bound is inclusive, so they come back first.
+    done_at_checkpoint = set(checkpoint["after_ids"])
+    checkpoint_start = checkpoint["after"]
+    event_date_key = ER_EVENT_PAYLOAD_KEY_BY_DATE_FIELD[filter_date_field]
+    start_monotonic = time.monotonic()
+    soft_budget = run_time_left() * BUDGET_FRACTION
+    pages_completed = 0
     # Process events in batches. Per-event state in Redis (keyed by ER event UUID)
     # distinguishes never-seen events (post as new) from previously-forwarded events
     # whose updated_at has advanced (emit one update_event per detected change).
@@ -436,8 +518,13 @@ async def action_pull_events(integration: Integration, action_config: PullEvents
         #      resolved to UUIDs before being sent in the ER filter blob —
         #      ER filters by event_type__id__in, not by slug.
         #   2) Titleless events fall back to the EventType display name.
-        # Best-effort: if the lookup fails we degrade gracefully.
-        event_type_maps = await _fetch_event_type_maps(earth_ranger)
+        # Best-effort: if the lookup fails we degrade gracefully. The maps are
+        # cached per ER host and account across runs (they rarely change).
+        event_type_maps = await _get_event_type_maps(
+            earth_ranger, url_parse.hostname, _er_account_id(auth_config),
+            event_types=pull_config.event_types,
+            event_categories=pull_config.event_categories,
+        )
         event_type_display_by_slug = event_type_maps.display_by_slug
 
         # Resolve configured slugs → ER UUIDs for the filter.
@@ -495,7 +582,7 @@ async def action_pull_events(integration: Integration, action_config: PullEvents
                 "skipped_reason": "no_resolvable_event_categories",
             }
 
-        date_filter_key = ER_EVENT_FILTER_KEY_BY_DATE_FIELD[pull_config.filter_date_field]
+        date_filter_key = ER_EVENT_FILTER_KEY_BY_DATE_FIELD[filter_date_field]
         event_filter = {
             date_filter_key: {"lower": start_datetime}
         }
@@ -508,6 +595,12 @@ async def action_pull_events(integration: Integration, action_config: PullEvents
         json_filter = json.dumps(event_filter)
         logger.info(f"Extracting events with filter '{event_filter}'...")
 
+        # Per-event states are recorded after the Gundi calls they describe and
+        # written once per page; the finally also persists what a failing page
+        # already forwarded, so those events aren't posted again next run.
+        state_buffer = StateWriteBuffer(state_manager, integration_id=integration_id, action_id="pull_events")
+        update_semaphore = asyncio.Semaphore(pull_config.max_concurrent_updates)
+
         # include_notes is required: ER's events-list endpoint omits the notes
         # array unless explicitly requested, so without this each er_event comes
         # back without notes and no note update_event is ever emitted (the
@@ -517,123 +610,165 @@ async def action_pull_events(integration: Integration, action_config: PullEvents
         # nothing to forward — the feature would silently no-op if the server
         # default ever differs from what we assume. It follows the flag so
         # flag-off connections don't pay for file payloads they never read.
-        async for event_batch in earth_ranger.get_events(
-            filter=json_filter, batch_size=BATCH_SIZE, include_notes=True,
-            include_files=pull_config.include_attachments,
-        ):
-            for er_event in event_batch:
-                er_event_uuid = er_event.get("id")
-                if not er_event_uuid:
-                    logger.warning("ER event payload missing 'id'; skipping.", extra={"event": er_event})
-                    continue
-                state_record = await state_manager.get_state(
+        # sort_by pages ascending on the filtered field, so the checkpoint (the
+        # highest value of the completed pages) covers everything before it.
+        try:
+            async for event_batch in earth_ranger.get_events(
+                filter=json_filter, batch_size=BATCH_SIZE, include_notes=True,
+                include_files=pull_config.include_attachments,
+                sort_by=ER_EVENT_SORT_BY_DATE_FIELD[filter_date_field],
+            ):
+                # Yield before starting a page if the soft budget is spent.
+                if time.monotonic() - start_monotonic >= soft_budget:
+                    # Tracks consecutive zero-progress yields (runaway guard).
+                    checkpoint["no_progress_count"] = (
+                        checkpoint.get("no_progress_count", 0) + 1
+                        if pages_completed == 0 else 0
+                    )
+                    _save_events_checkpoint(
+                        state_buffer, last_execution=last_execution, checkpoint=checkpoint
+                    )
+                    await state_buffer.flush()
+                    logger.info(
+                        "pull_events yielding (budget) after %d pages; checkpoint %s=%s",
+                        pages_completed, filter_date_field.value, checkpoint["after"],
+                    )
+                    if pull_config.continue_immediately:
+                        await _retrigger_pull(integration_id, "pull_events", checkpoint["no_progress_count"])
+                    return {
+                        "status": "in_progress",
+                        "events_extracted": events_new,
+                        "events_updated": events_updated,
+                        "updates_emitted": updates_emitted,
+                        "events_skipped_unchanged": events_skipped_unchanged,
+                        "attachments_forwarded": attachments_forwarded,
+                        "checkpoint": checkpoint["after"],
+                        "outbox_depth": await outbox_depth(integration_id),
+                    }
+                # One MGET per page instead of one GET per event: the per-event
+                # state decides new vs. changed vs. unchanged for the whole page.
+                states_by_uuid = await state_manager.get_states(
                     integration_id=integration_id,
                     action_id="pull_events",
-                    source_id=er_event_uuid,
+                    source_ids=[e.get("id") for e in event_batch if e.get("id")],
                 )
-                if not state_record.get("gundi_object_id"):
-                    # Never seen this ER event before → post it to Gundi as new.
-                    transformed = transform_events_to_gundi_schema(
-                        events=[er_event],
-                        event_type_display_by_slug=event_type_display_by_slug,
-                        er_ui_root=er_ui_root,
-                    )
-                    if not transformed:
+                # Never-seen events of this page, posted together after the loop.
+                new_events = []  # [(er_event, transformed_event)]
+                # Previously-forwarded events whose updated_at has advanced.
+                updated_events = []  # [(er_event, state_record)]
+                for er_event in event_batch:
+                    er_event_uuid = er_event.get("id")
+                    if not er_event_uuid:
+                        logger.warning("ER event payload missing 'id'; skipping.", extra={"event": er_event})
                         continue
-                    # Diagnostic: log what we're about to POST so a downstream
-                    # destination seeing an unexpected payload (e.g. CMORE
-                    # rendering provider_metadata=None) can be traced back to
-                    # the ER runner's outbound shape.
-                    logger.info(
-                        "Posting Gundi event: er_event_uuid=%r title=%r "
-                        "provider_metadata=%r",
-                        er_event_uuid,
-                        transformed[0].get("title"),
-                        transformed[0].get("provider_metadata"),
-                    )
-                    response = await send_events_to_gundi(
-                        events=transformed, integration_id=integration_id
-                    )
-                    gundi_object_id = _extract_object_id_from_post_events_response(response)
-                    if not gundi_object_id:
-                        logger.error(
-                            "Could not extract object_id from post_events response; "
-                            "skipping state persistence for this event.",
-                            extra={"er_event_id": er_event_uuid, "response": response},
-                        )
+                    if er_event_uuid in done_at_checkpoint and er_event.get(event_date_key) == checkpoint_start:
+                        continue  # Completed by the interrupted run
+                    state_record = states_by_uuid.get(er_event_uuid, {})
+                    if not state_record.get("gundi_object_id") and _outbox_pending(state_record):
+                        # Its post is waiting in the outbox; posting it again would duplicate it
+                        events_skipped_unchanged += 1
                         continue
-                    # Forward files attached to the event (photos, documents)
-                    # before persisting state: a crash between post and save
-                    # re-runs this event next pull and the seen-list dedupes.
-                    seen_file_ids = []
-                    if pull_config.include_attachments:
-                        forwarded, seen_file_ids = await _forward_event_files(
-                            earth_ranger, er_event, gundi_object_id,
-                            integration_id, [],
+                    if state_record.get("outbox_base") and not _outbox_pending(state_record):
+                        # Its updates in the outbox were never confirmed (e.g. the outbox
+                        # was lost with its instance): diff against what Gundi has.
+                        state_record = {**state_record, **state_record["outbox_base"], "updated_at": None}
+                    if not state_record.get("gundi_object_id"):
+                        # Never seen this ER event before → post it to Gundi as new.
+                        # Transformed one by one so a payload that fails to transform
+                        # can't shift the positional response mapping of the others.
+                        transformed = transform_events_to_gundi_schema(
+                            events=[er_event],
+                            event_type_display_by_slug=event_type_display_by_slug,
+                            er_ui_root=er_ui_root,
                         )
-                        attachments_forwarded += forwarded
-                    # Mark all existing notes as already-seen (no bulk-forward on first sight).
-                    note_ids = [n["id"] for n in er_event.get("notes") or [] if n.get("id")]
-                    await _save_event_state(
-                        integration_id=integration_id,
-                        er_event_uuid=er_event_uuid,
-                        gundi_object_id=gundi_object_id,
-                        er_event=er_event,
-                        seen_note_ids=note_ids,
-                        seen_file_ids=seen_file_ids,
-                    )
-                    events_new += 1
-                    continue
+                        if transformed:
+                            new_events.append((er_event, transformed[0]))
+                        continue
 
-                # Seen before. Defensive freshness check: same updated_at → no work to do.
-                if state_record.get("updated_at") == er_event.get("updated_at"):
-                    events_skipped_unchanged += 1
-                    continue
+                    # Seen before. Defensive freshness check: same updated_at → no work to do.
+                    if state_record.get("updated_at") == er_event.get("updated_at"):
+                        events_skipped_unchanged += 1
+                        continue
 
-                # Updated event → emit one update_event per detected change.
-                emitted, new_seen_note_ids = await _emit_event_updates(
-                    er_event=er_event,
-                    state_record=state_record,
-                    integration_id=integration_id,
-                )
-                updates_emitted += emitted
-                if emitted > 0:
-                    events_updated += 1
-                seen_file_ids = state_record.get("seen_file_ids", [])
-                if pull_config.include_attachments:
-                    forwarded, seen_file_ids = await _forward_event_files(
-                        earth_ranger, er_event, state_record["gundi_object_id"],
-                        integration_id, seen_file_ids,
+                    # Updated event → emit one update_event per detected change.
+                    updated_events.append((er_event, state_record))
+                if updated_events:
+                    # Different events are updated concurrently (bounded); each
+                    # event's own updates stay in order inside its coroutine.
+                    results = await asyncio.gather(
+                        *[
+                            _process_updated_event(
+                                earth_ranger, er_event, state_record,
+                                integration_id=integration_id,
+                                state_buffer=state_buffer,
+                                include_attachments=pull_config.include_attachments,
+                                semaphore=update_semaphore,
+                            )
+                            for er_event, state_record in updated_events
+                        ],
+                        return_exceptions=True,
                     )
+                    errors = [r for r in results if isinstance(r, BaseException)]
+                    for result in results:
+                        if isinstance(result, BaseException):
+                            continue
+                        emitted, forwarded = result
+                        updates_emitted += emitted
+                        if emitted > 0:
+                            events_updated += 1
+                        attachments_forwarded += forwarded
+                    if errors:
+                        # Updates that fail transiently are kept in the outbox,
+                        # so only a permanent failure gets here and fails the
+                        # run. States of the events that did succeed are
+                        # already buffered and flushed in the finally below.
+                        raise errors[0]
+                if new_events:
+                    posted, forwarded = await _post_new_events(
+                        earth_ranger, new_events,
+                        integration_id=integration_id,
+                        state_buffer=state_buffer,
+                        include_attachments=pull_config.include_attachments,
+                    )
+                    events_new += posted
                     attachments_forwarded += forwarded
-                # Refresh state to reflect what we forwarded this run.
-                await _save_event_state(
-                    integration_id=integration_id,
-                    er_event_uuid=er_event_uuid,
-                    gundi_object_id=state_record["gundi_object_id"],
-                    er_event=er_event,
-                    seen_note_ids=new_seen_note_ids,
-                    seen_file_ids=seen_file_ids,
+                for er_event in event_batch:
+                    er_event_uuid = er_event.get("id")
+                    if er_event_uuid and _outbox_pending(
+                        state_buffer.get(er_event_uuid) or states_by_uuid.get(er_event_uuid, {})
+                    ):
+                        _hold_events_checkpoint(checkpoint, er_event, event_date_key)
+                # Page boundary: persist every per-event state of the page and
+                # the advanced checkpoint at once.
+                _advance_events_checkpoint(checkpoint, event_batch, event_date_key)
+                _save_events_checkpoint(
+                    state_buffer, last_execution=last_execution, checkpoint=checkpoint
                 )
-    # Save watermark.
-    state = {"last_execution": execution_timestamp}
-    logger.debug(f"Saving watermark for integration {integration}, action pull_events:\n{state}")
-    await state_manager.set_state(
-        integration_id=integration_id,
-        action_id="pull_events",
-        state=state
-    )
+                await state_buffer.flush()
+                pages_completed += 1
+            # Save watermark. It is this run's start, not the checkpoint: pages
+            # are only complete up to the moment the pull began. It stays at
+            # the oldest event still waiting in the outbox, if any. It replaces
+            # the checkpoint still pending in the buffer.
+            state = {"last_execution": _events_watermark(checkpoint, execution_timestamp)}
+            logger.debug(f"Saving watermark for integration {integration}, action pull_events:\n{state}")
+            state_buffer.set_state(state=state)
+            await state_buffer.flush()
+        finally:
+            await _flush_state_on_exit(state_buffer)
     logger.info(
         f"pull_events done. new={events_new} updated={events_updated} "
         f"updates_emitted={updates_emitted} skipped_unchanged={events_skipped_unchanged} "
         f"attachments_forwarded={attachments_forwarded}"
     )
     return {
+        "status": "complete",
         "events_extracted": events_new,
         "events_updated": events_updated,
         "updates_emitted": updates_emitted,
         "events_skipped_unchanged": events_skipped_unchanged,
         "attachments_forwarded": attachments_forwarded,
+        "outbox_depth": await outbox_depth(integration_id),
     }
 
 
@@ -658,7 +793,7 @@ async def action_pull_observations(integration: Integration, action_config: Pull
     )
 
     start_monotonic = time.monotonic()
-    soft_budget = settings.MAX_ACTION_EXECUTION_TIME * BUDGET_FRACTION
+    soft_budget = run_time_left() * BUDGET_FRACTION
 
     async with er_client as earth_ranger:
         # Mutual exclusion: a long backfill may still be running when the next
@@ -671,11 +806,21 @@ async def action_pull_observations(integration: Integration, action_config: Pull
                 message="Skipping 'pull_observations': another run holds the backfill lease.",
                 log_level=logging.INFO,
             )
+        # Every write to this action's state (cursor and watermark) goes
+        # through one write-behind buffer: last write wins, flushed at
+        # sub-window boundaries, every CURSOR_FLUSH_UNITS units, before
+        # returning, and in the finally below.
+        state_buffer = StateWriteBuffer(
+            state_manager, integration_id=integration_id, action_id="pull_observations"
+        )
         try:
             # One resolver per run: lazily fetches + caches per-source profiles
             # (manufacturer_id, subject assignment history) so observations are
             # labelled with the device's natural id and time-correct subject name.
-            resolver = SourceProfileResolver(earth_ranger, integration_id=integration_id)
+            # Profiles are shared across runs through the Redis cache.
+            resolver = SourceProfileResolver(
+                earth_ranger, integration_id=integration_id, state_manager=state_manager
+            )
             state = await state_manager.get_state(
                 integration_id=integration_id, action_id="pull_observations"
             )
@@ -691,11 +836,12 @@ async def action_pull_observations(integration: Integration, action_config: Pull
                     window_start = last
                 window_end = pull_config.end_datetime or execution_timestamp
 
-                source_id_set = await _resolve_source_ids(
+                source_ranges = await _resolve_source_ranges(
                     earth_ranger,
                     group_ids=pull_config.subject_group_ids,
                     integration_id=integration_id,
                 )
+                source_id_set = set(source_ranges)
                 if pull_config.subject_group_ids and not source_id_set:
                     await log_action_activity(
                         integration_id=integration_id,
@@ -716,6 +862,7 @@ async def action_pull_observations(integration: Integration, action_config: Pull
                     end=window_end,
                     subwindow_days=pull_config.subwindow_days,
                     source_ids=source_id_set,
+                    source_ranges=source_ranges,
                 )
 
             filter_active = cursor["sources"] != [None]
@@ -725,99 +872,163 @@ async def action_pull_observations(integration: Integration, action_config: Pull
 
             total_observations = 0
             units_completed = 0
-            wi = cursor["window_index"]
-            si = cursor["source_index"]
-
-            while wi < len(subwindows):
-                w_start, w_end = subwindows[wi]
-                while si < len(cursor["sources"]):
-                    # Yield before starting a unit if the soft budget is spent.
-                    if time.monotonic() - start_monotonic >= soft_budget:
-                        cursor["window_index"] = wi
-                        cursor["source_index"] = si
-                        # Tracks consecutive zero-progress yields. Only consulted
-                        # by the self-re-trigger guard below (continue_immediately);
-                        # in scheduler-driven mode the scheduler cadence is the brake.
-                        cursor["no_progress_count"] = (
-                            cursor.get("no_progress_count", 0) + 1
-                            if units_completed == 0 else 0
-                        )
-                        await _save_backfill_cursor(
-                            integration_id, last_execution=last_execution, cursor=cursor
-                        )
-                        logger.info(
-                            "pull_observations yielding (budget): window %d/%d source %d/%d",
-                            wi, len(subwindows), si, len(cursor["sources"]),
-                        )
-                        # Opt-in: immediately re-trigger the next chunk via PubSub,
-                        # unless we're making no progress (runaway guard). Under
-                        # TRIGGER_ACTIONS_ALWAYS_SYNC (local/test), the re-triggered
-                        # run is a no-op: it runs inline before this run's finally
-                        # releases the lease, so it skips on the held lease.
-                        if pull_config.continue_immediately:
-                            if cursor["no_progress_count"] < MAX_NO_PROGRESS_RETRIES:
-                                try:
-                                    await trigger_action(integration_id, "pull_observations")
-                                except Exception as exc:
-                                    # Cursor is already saved; a failed re-trigger is
-                                    # non-fatal — the next scheduled tick resumes from it.
-                                    logger.warning(
-                                        "pull_observations: re-trigger failed (%s); next "
-                                        "chunk will resume on the scheduled tick.",
-                                        exc,
-                                        extra={"attention_needed": True},
-                                    )
-                            else:
-                                logger.warning(
-                                    "pull_observations not re-triggering: %d consecutive "
-                                    "no-progress runs (runaway guard).",
-                                    cursor["no_progress_count"],
-                                    extra={"attention_needed": True},
-                                )
-                        return {
-                            "status": "in_progress",
-                            "observations_extracted": total_observations,
-                            "units_failed": cursor.get("units_failed", 0),
-                            "window_index": wi,
-                            "source_index": si,
-                            "filter_active": filter_active,
-                            "sources_resolved": len(cursor["sources"]) if filter_active else None,
-                        }
-                    source = cursor["sources"][si]
-                    try:
-                        total_observations += await _pull_source_window(
-                            earth_ranger, source, w_start, w_end,
-                            integration_id=integration_id, resolver=resolver,
-                        )
-                    except Exception as e:
-                        # Don't wedge the backfill on one bad unit: log loudly and
-                        # advance past it (at-least-once; operator can re-pull).
-                        cursor["units_failed"] = cursor.get("units_failed", 0) + 1
-                        logger.error(
-                            "pull_observations unit failed (source=%r window=%s..%s): %s",
-                            source, w_start, w_end, e,
-                            extra={"attention_needed": True},
-                        )
-                    si += 1
-                    units_completed += 1
-                    cursor["window_index"] = wi
-                    cursor["source_index"] = si
-                    await _save_backfill_cursor(
-                        integration_id, last_execution=last_execution, cursor=cursor
+            # Units are numbered window-major (unit = window_index * n_sources +
+            # source_index). Everything before the frontier is done; units
+            # completed out of order beyond it are kept in done_units, so a
+            # resume skips them exactly.
+            n_sources = len(cursor["sources"])
+            n_units = len(subwindows) * n_sources
+            frontier = cursor["window_index"] * n_sources + cursor["source_index"]
+            done_units = set(cursor.get("done_units", []))
+            # Units whose window overlaps none of the source's assignments to
+            # the selected subjects can't return anything: they count as done
+            # without an ER request (but not as completed, nor in the cursor).
+            unassigned_units = _unassigned_units(cursor, subwindows)
+            if unassigned_units:
+                logger.info(
+                    "pull_observations skipping %d of %d units outside the sources' assignments.",
+                    len(unassigned_units), n_units,
+                )
+            done_units |= unassigned_units
+            while frontier in done_units:
+                done_units.discard(frontier)
+                frontier += 1
+            next_unit = frontier
+            # A unit is read from ER into the run-wide batcher, which merges
+            # observations across pages and sources into larger Gundi sends.
+            # It's only done (and recorded in the cursor) once its receipt
+            # confirms everything it read was sent.
+            batcher = _new_observation_batcher(integration_id)
+            reading = {}  # read task -> unit
+            sending = {}  # receipt -> (unit, observations)
+
+            def unit_failed(unit, e):
+                # Don't wedge the backfill on one bad unit: log loudly and
+                # advance past it (at-least-once; operator can re-pull).
+                w_start, w_end = subwindows[unit // n_sources]
+                cursor["units_failed"] = cursor.get("units_failed", 0) + 1
+                logger.error(
+                    "pull_observations unit failed (source=%r window=%s..%s): %s",
+                    cursor["sources"][unit % n_sources], w_start, w_end, e,
+                    extra={"attention_needed": True},
+                )
+
+            async def read_unit(unit):
+                w_start, w_end = subwindows[unit // n_sources]
+                try:
+                    return await _pull_source_window(
+                        earth_ranger, cursor["sources"][unit % n_sources], w_start, w_end,
+                        batcher=batcher, resolver=resolver,
+                    )
+                except Exception as e:
+                    unit_failed(unit, e)
+                    return 0, None
+
+            budget_spent = False
+            try:
+                while True:
+                    # Start reading units up to max_parallel_units, unless the
+                    # soft budget is spent: then let the running ones finish and yield.
+                    while not budget_spent and next_unit < n_units and \
+                            len(reading) < pull_config.max_parallel_units:
+                        if next_unit < frontier or next_unit in done_units:
+                            next_unit += 1  # Completed by an earlier run
+                            continue
+                        if time.monotonic() - start_monotonic >= soft_budget:
+                            budget_spent = True
+                            break
+                        reading[asyncio.create_task(read_unit(next_unit))] = next_unit
+                        next_unit += 1
+                    if not reading and not sending:
+                        break
+                    if not reading:
+                        # Nothing left to read could join the buffered batch: send it now.
+                        await batcher.flush()
+                    finished, _ = await asyncio.wait(
+                        [*reading, *sending], return_when=asyncio.FIRST_COMPLETED
+                    )
+                    completed = 0
+                    for future in finished:
+                        if future in reading:
+                            unit = reading.pop(future)
+                            observations, receipt = future.result()
+                            if receipt is not None:
+                                sending[receipt] = (unit, observations)
+                                continue
+                        else:
+                            unit, observations = sending.pop(future)
+                            try:
+                                future.result()
+                                total_observations += observations
+                            except Exception as e:
+                                unit_failed(unit, e)
+                        done_units.add(unit)
+                        completed += 1
+                    if not completed:
+                        continue
+                    units_completed += completed
+                    previous_window = frontier // n_sources
+                    while frontier in done_units:
+                        done_units.discard(frontier)
+                        frontier += 1
+                    cursor["window_index"], cursor["source_index"] = divmod(frontier, n_sources)
+                    cursor["done_units"] = sorted(done_units - unassigned_units)
+                    _save_backfill_cursor(
+                        state_buffer, last_execution=last_execution, cursor=cursor
                     )
-                si = 0
-                wi += 1
+                    if frontier // n_sources != previous_window or \
+                            units_completed % CURSOR_FLUSH_UNITS < completed:
+                        await state_buffer.flush()
+            finally:
+                # Only reached with units running if the run is failing or being
+                # cancelled (hard timeout): don't leave them behind.
+                for task in reading:
+                    task.cancel()
+                # Wait for them to unwind, so none is still running (or fails unretrieved) after the run
+                await asyncio.gather(*reading, return_exceptions=True)
+                await batcher.close()
+
+            if frontier < n_units:
+                # Yielded on the soft budget with units left.
+                wi, si = cursor["window_index"], cursor["source_index"]
+                # Tracks consecutive zero-progress yields. Only consulted
+                # by the self-re-trigger guard below (continue_immediately);
+                # in scheduler-driven mode the scheduler cadence is the brake.
+                cursor["no_progress_count"] = (
+                    cursor.get("no_progress_count", 0) + 1
+                    if units_completed == 0 else 0
+                )
+                _save_backfill_cursor(
+                    state_buffer, last_execution=last_execution, cursor=cursor
+                )
+                await state_buffer.flush()
+                logger.info(
+                    "pull_observations yielding (budget): window %d/%d source %d/%d",
+                    wi, len(subwindows), si, n_sources,
+                )
+                if pull_config.continue_immediately:
+                    await _retrigger_pull(
+                        integration_id, "pull_observations", cursor["no_progress_count"]
+                    )
+                return {
+                    "status": "in_progress",
+                    "observations_extracted": total_observations,
+                    "units_failed": cursor.get("units_failed", 0),
+                    "window_index": wi,
+                    "source_index": si,
+                    "filter_active": filter_active,
+                    "sources_resolved": n_sources if filter_active else None,
+                    "outbox_depth": await outbox_depth(integration_id),
+                }
 
             # All units done → advance the watermark to the window end and clear
             # the cursor (drops "backfill", sets last_execution).
             units_failed = cursor.get("units_failed", 0)
             # Advance the watermark first (durable record of completion) so a
             # failure publishing the warning below can't force a full re-run.
-            await state_manager.set_state(
-                integration_id=integration_id,
-                action_id="pull_observations",
-                state={"last_execution": cursor["end"]},
-            )
+            # It replaces any cursor still pending in the buffer.
+            state_buffer.set_state(state={"last_execution": cursor["end"]})
+            await state_buffer.flush()
             if units_failed:
                 await log_action_activity(
                     integration_id=integration_id,
@@ -835,9 +1046,15 @@ async def action_pull_observations(integration: Integration, action_config: Pull
                 "units_failed": units_failed,
                 "filter_active": filter_active,
                 "sources_resolved": len(cursor["sources"]) if filter_active else None,
+                "outbox_depth": await outbox_depth(integration_id),
             }
         finally:
-            await _release_backfill_lease(integration_id)
+            try:
+                # Persist progress not yet flushed (e.g. a unit raised or the run
+                # was cancelled) while this run still holds the lease.
+                await _flush_state_on_exit(state_buffer)
+            finally:
+                await _release_backfill_lease(integration_id)
 
 
 async def _fetch_source_assignments(er_client, subject_ids, *, integration_id=None):
@@ -902,13 +1119,27 @@ async def _fetch_source_assignments(er_client, subject_ids, *, integration_id=No
 async def _resolve_source_ids(er_client, group_ids, *, integration_id=None):
     """Resolve subject-group UUIDs to a set of source UUIDs.
 
+    Thin wrapper over ``_resolve_source_ranges`` for callers that only need
+    the sources, not when they were assigned.
+    """
+    return set(await _resolve_source_ranges(er_client, group_ids, integration_id=integration_id))
+
+
+async def _resolve_source_ranges(er_client, group_ids, *, integration_id=None):
+    """Resolve subject-group UUIDs to {source UUID: assigned ranges}.
+
     Walks ER's subjectgroup tree recursively (flat=False). When a matched UUID
     is found, every descendant subject is included. Then resolves the subjects'
-    current source assignments via ``_fetch_source_assignments`` (chunked, so a
-    large subject list neither overruns the URL nor drops paginated rows).
+    source assignments via ``_fetch_source_assignments`` (chunked, so a large
+    subject list neither overruns the URL nor drops paginated rows).
+
+    Each source maps to the ``[lower, upper]`` ISO pairs of its assignments to
+    those subjects (``None`` = unbounded on that side), or to ``None`` if any
+    of its records carries no ``assigned_range`` — such a source is assumed
+    assigned at all times.
     """
     if not group_ids:
-        return set()
+        return {}
 
     wanted = set(group_ids)
     groups = await er_client.get_subjectgroups(flat=False)
@@ -926,16 +1157,51 @@ async def _resolve_source_ids(er_client, group_ids, *, integration_id=None):
         walk(group)
 
     if not subject_ids:
-        return set()
+        return {}
 
     assignments = await _fetch_source_assignments(
         er_client, sorted(subject_ids), integration_id=integration_id
     )
-    return {str(a["source"]) for a in assignments if a.get("source")}
+    ranges_by_source = {}
+    for a in assignments:
+        source = str(a["source"])
+        rng = a.get("assigned_range")
+        if not isinstance(rng, dict):
+            ranges_by_source[source] = None  # Unknown range: never prune it
+        elif source not in ranges_by_source or ranges_by_source[source] is not None:
+            ranges_by_source.setdefault(source, []).append([rng.get("lower"), rng.get("upper")])
+    return ranges_by_source
+
+
+async def _retrigger_pull(integration_id, action_id, no_progress_count):
+    """Opt-in: immediately re-trigger the next chunk of a pull that yielded.
+
+    Skipped when the pull is making no progress (runaway guard). Under
+    TRIGGER_ACTIONS_ALWAYS_SYNC (local/test), the re-triggered run is a no-op:
+    it runs inline before the yielding run's finally releases the lease, so it
+    skips on the held lease.
+    """
+    if no_progress_count >= MAX_NO_PROGRESS_RETRIES:
+        logger.warning(
+            "%s not re-triggering: %d consecutive no-progress runs (runaway guard).",
+            action_id, no_progress_count,
+            extra={"attention_needed": True},
+        )
+        return
+    try:
+        await trigger_action(integration_id, action_id)
+    except Exception as exc:
+        # Progress is already saved; a failed re-trigger is non-fatal — the
+        # next scheduled tick resumes from it.
+        logger.warning(
+            "%s: re-trigger failed (%s); next chunk will resume on the scheduled tick.",
+            action_id, exc,
+            extra={"attention_needed": True},
+        )
 
 
-async def _acquire_backfill_lease(integration_id):
-    """Acquire the per-(integration, pull_observations) lease.
+async def _acquire_backfill_lease(integration_id, action_id="pull_observations"):
+    """Acquire the per-(integration, action) lease of a resumable pull.
 
     Returns True if this invocation may proceed, False if another invocation
     currently holds it. The TTL is the crash backstop: because the handler is
@@ -949,7 +1215,7 @@ async def _acquire_backfill_lease(integration_id):
     try:
         return await state_manager.set_if_absent(
             integration_id=integration_id,
-            action_id="pull_observations",
+            action_id=action_id,
             source_id=BACKFILL_LOCK_SOURCE_ID,
             ttl_seconds=ttl,
         )
@@ -960,12 +1226,12 @@ async def _acquire_backfill_lease(integration_id):
         return True
 
 
-async def _release_backfill_lease(integration_id):
+async def _release_backfill_lease(integration_id, action_id="pull_observations"):
     """Release the lease. Best-effort: if this fails, the TTL expires it."""
     try:
         await state_manager.delete_state(
             integration_id=integration_id,
-            action_id="pull_observations",
+            action_id=action_id,
             source_id=BACKFILL_LOCK_SOURCE_ID,
         )
     except Exception as e:
@@ -974,6 +1240,24 @@ async def _release_backfill_lease(integration_id):
         )
 
 
+async def _flush_state_on_exit(state_buffer):
+    """Flush what a pull left in its state buffer, from its ``finally``.
+
+    If the pull is already failing (or being cancelled), a flush error is
+    logged instead of raised, so it doesn't mask the original error.
+    """
+    failing = sys.exc_info()[1] is not None
+    try:
+        await state_buffer.flush()
+    except Exception:
+        if not failing:
+            raise
+        logger.exception(
+            "Failed to save the state of %s for integration %s while the run was failing.",
+            state_buffer.action_id, state_buffer.integration_id,
+        )
+
+
 def _skip_quietly(integration_id, action_id, *, reason, message, log_level=logging.INFO):
     """Record an expected pull-action skip in the local log only.
 
@@ -986,15 +1270,19 @@ def _skip_quietly(integration_id, action_id, *, reason, message, log_level=loggi
     return {"skipped": True, "reason": reason}
 
 
-def _build_backfill_cursor(*, start, end, subwindow_days, source_ids):
+def _build_backfill_cursor(*, start, end, subwindow_days, source_ids, source_ranges=None):
     """Snapshot the work definition + zeroed progress for a new backfill run.
 
     ``source_ids`` is snapshotted (sorted) so the unit sequence is stable across
     resumes. An empty set means "no group filter" → a single ``None`` source,
     i.e. one whole-instance fetch per sub-window.
+
+    ``source_ranges`` (as returned by ``_resolve_source_ranges``) is snapshotted
+    under ``ranges`` for the sources whose assignments are known, so units
+    whose window overlaps none of them are skipped (``_unassigned_units``).
     """
     sources = sorted(source_ids) if source_ids else [None]
-    return {
+    cursor = {
         "start": start,
         "end": end,
         "subwindow_days": int(subwindow_days or 1),
@@ -1003,31 +1291,141 @@ def _build_backfill_cursor(*, start, end, subwindow_days, source_ids):
         "source_index": 0,
         "no_progress_count": 0,
     }
+    ranges = {
+        source: list(source_ranges[source])
+        for source in sources
+        if source is not None and (source_ranges or {}).get(source) is not None
+    }
+    if ranges:
+        cursor["ranges"] = ranges
+    return cursor
+
+
+def _unassigned_units(cursor, subwindows):
+    """Units (numbered window-major) whose window overlaps none of their
+    source's assigned ranges.
 
+    Only sources listed in ``cursor["ranges"]`` can have unassigned units.
+    Ranges are half-open like the windows; a missing bound is unbounded on
+    that side.
+    """
+    ranges = cursor.get("ranges")
+    if not ranges:
+        return set()
+    n_sources = len(cursor["sources"])
+    windows = [
+        (_ensure_utc(_parse_iso(w_start)), _ensure_utc(_parse_iso(w_end)))
+        for w_start, w_end in subwindows
+    ]
+    unassigned = set()
+    for si, source in enumerate(cursor["sources"]):
+        if source not in ranges:
+            continue
+        bounds = [
+            (
+                _ensure_utc(_parse_iso(lower)) if lower else None,
+                _ensure_utc(_parse_iso(upper)) if upper else None,
+            )
+            for lower, upper in ranges[source]
+        ]
+        for wi, (w_start, w_end) in enumerate(windows):
+            if not any(
+                (lower is None or lower < w_end) and (upper is None or upper > w_start)
+                for lower, upper in bounds
+            ):
+                unassigned.add(wi * n_sources + si)
+    return unassigned
 
-async def _save_backfill_cursor(integration_id, *, last_execution, cursor):
-    """Persist the cursor alongside the (unchanged) watermark.
+
+def _save_backfill_cursor(state_buffer, *, last_execution, cursor):
+    """Record the cursor alongside the (unchanged) watermark.
 
     The watermark is only advanced on completion; until then it is preserved so
-    a failure never loses the previously-confirmed window.
+    a failure never loses the previously-confirmed window. The state is written
+    when ``state_buffer`` is next flushed. A snapshot of the cursor is recorded,
+    since the caller keeps mutating it.
     """
-    state = {"backfill": cursor}
+    state = {"backfill": dict(cursor)}
     if last_execution is not None:
         state["last_execution"] = last_execution
-    await state_manager.set_state(
-        integration_id=integration_id,
-        action_id="pull_observations",
-        state=state,
-    )
+    state_buffer.set_state(state=state)
 
 
-async def _pull_source_window(er_client, source, start, end, *, integration_id, resolver=None):
-    """Drain one (source × sub-window) unit and forward to Gundi.
+def _new_events_checkpoint(*, filter_date_field, after):
+    """A pull_events checkpoint with nothing completed past ``after`` yet."""
+    return {
+        "filter_date_field": filter_date_field.value,
+        "after": after,
+        "after_ids": [],
+        "no_progress_count": 0,
+    }
+
+
+def _advance_events_checkpoint(checkpoint, event_batch, event_date_key):
+    """Move the checkpoint to the highest date-field value of a completed page.
+
+    Pages come sorted ascending on that field, so every event before
+    ``checkpoint["after"]`` is done. ``after_ids`` is the tie-breaker: the ids
+    of the completed events sharing exactly that value.
+    """
+    after = _ensure_utc(_parse_iso(checkpoint["after"]))
+    for er_event in event_batch:
+        er_event_uuid = er_event.get("id")
+        value = er_event.get(event_date_key)
+        if not er_event_uuid or not value:
+            continue
+        when = _ensure_utc(_parse_iso(value))
+        if when > after:
+            after = when
+            checkpoint["after"] = value
+            checkpoint["after_ids"] = [er_event_uuid]
+        elif when == after and er_event_uuid not in checkpoint["after_ids"]:
+            checkpoint["after_ids"].append(er_event_uuid)
+
+
+def _hold_events_checkpoint(checkpoint, er_event, event_date_key):
+    """Keep the watermark from moving past an event with sends waiting in the outbox.
+
+    The outbox lives on this instance's disk, so the event is read again by
+    every run until its sends are delivered (or its marker expires) in case
+    the outbox is lost. ``outbox_hold`` is the lowest date-field value of such
+    events.
+    """
+    value = er_event.get(event_date_key)
+    hold = checkpoint.get("outbox_hold")
+    if value and (not hold or _ensure_utc(_parse_iso(value)) < _ensure_utc(_parse_iso(hold))):
+        checkpoint["outbox_hold"] = value
+
+
+def _events_watermark(checkpoint, execution_timestamp):
+    """The watermark a complete pull_events run saves: its start, or the outbox hold if earlier."""
+    hold = checkpoint.get("outbox_hold")
+    if hold and _ensure_utc(_parse_iso(hold)) < _ensure_utc(_parse_iso(execution_timestamp)):
+        return hold
+    return execution_timestamp
+
+
+def _save_events_checkpoint(state_buffer, *, last_execution, checkpoint):
+    """Record the pull_events checkpoint alongside the (unchanged) watermark.
+
+    Same contract as ``_save_backfill_cursor``: written on the next flush, as a
+    snapshot of the checkpoint the caller keeps mutating.
+    """
+    state = {"checkpoint": {**checkpoint, "after_ids": list(checkpoint["after_ids"])}}
+    if last_execution is not None:
+        state["last_execution"] = last_execution
+    state_buffer.set_state(state=state)
+
+
+async def _pull_source_window(er_client, source, start, end, *, batcher, resolver=None):
+    """Read one (source × sub-window) unit from ER into ``batcher``.
 
     ``source=None`` means no source filter (whole instance for the window).
-    Returns the number of observations forwarded. ER filters server-side, so no
-    client-side source filtering is needed. ``er_client`` must already be an
-    entered/open client session (call within ``async with er_client``).
+    Returns ``(observations, receipt)``: the number of observations handed to
+    the batcher, and the batcher's receipt for them, which resolves once they
+    were all sent to Gundi. ER filters server-side, so no client-side source
+    filtering is needed. ``er_client`` must already be an entered/open client
+    session (call within ``async with er_client``).
 
     When ``resolver`` is given, each batch's source UUIDs are prefetched (so the
     resolver caches per-source profiles) and passed into the transform to enrich
@@ -1036,19 +1434,49 @@ async def _pull_source_window(er_client, source, start, end, *, integration_id,
     params = {"start": start, "end": end, "batch_size": BATCH_SIZE}
     if source is not None:
         params["source_id"] = source
-    sent = 0
+    # The batcher sends in the background, so the next ER page is read while
+    # earlier observations are on their way to Gundi.
+    observations = 0
+    receipts = []
     async for observation_batch in er_client.get_observations(**params):
         if resolver is not None:
             await resolver.ensure({o.get("source") for o in observation_batch if o.get("source")})
         transformed = transform_observations_to_gundi_schema(
             observations=observation_batch, resolver=resolver
         )
-        if not transformed:
-            continue
-        logger.info(f"Sending {len(transformed)} observations to Gundi...")
-        await send_observations_to_gundi(observations=transformed, integration_id=integration_id)
-        sent += len(transformed)
-    return sent
+        if transformed:
+            receipts.append(await batcher.add(transformed))
+            observations += len(transformed)
+    return observations, asyncio.gather(*receipts)
+
+
+def _new_observation_batcher(integration_id):
+    """The run-wide batcher that sends pull_observations data to Gundi.
+
+    A batch that still fails transiently after the send retries goes to the
+    outbox, so its units count as done and it is redelivered in the background.
+    """
+    async def send(observations):
+        try:
+            await send_observations_to_gundi(observations=observations, integration_id=integration_id)
+        except Exception as e:
+            if not is_transient_send_error(e):
+                raise
+            logger.warning(f"Sending {len(observations)} observations failed ({e}); keeping them in the outbox.")
+            await enqueue_in_outbox(integration_id, "observations", {"observations": observations})
+
+    return ObservationBatcher(
+        send,
+        max_records=settings.OBSERVATION_BATCH_MAX_RECORDS,
+        max_bytes=settings.OBSERVATION_BATCH_MAX_BYTES,
+        max_delay_seconds=settings.OBSERVATION_BATCH_MAX_DELAY_SECONDS,
+        max_concurrent_sends=OBSERVATION_SENDERS,
+    )
+
+
+@outbox_delivery("observations")
+async def _deliver_outboxed_observations(integration_id, payload):
+    await send_observations_to_gundi(observations=payload["observations"], integration_id=integration_id)
 
 
 # Auxiliary functions
@@ -1146,6 +1574,52 @@ class EventTypeMaps:
     category_id_by_slug: Dict[str, str] = field(default_factory=dict)
 
 
+def _er_account_id(auth_config):
+    """A short, stable id of the ER account an integration signs in as (not its credentials).
+
+    Like the ER client, it goes by the token if there's one, else the username.
+    """
+    token = auth_config.token.get_secret_value() if auth_config.token else ""
+    identity = f"token:{token}" if token else f"user:{auth_config.username or ''}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
+async def _get_event_type_maps(er_client, er_host, er_account, *, event_types=(), event_categories=()) -> EventTypeMaps:
+    """Return the event-type maps of an ER host, from the Redis cache when possible.
+
+    ER lists the types and categories the calling account can see, so the maps
+    are cached per host and account (``er_account``, see ``_er_account_id``).
+
+    The cached maps are used only if they resolve every configured slug; a miss
+    forces a refresh, so a type created in ER since the maps were cached
+    resolves right away. Freshly fetched maps are cached for
+    EVENT_TYPE_MAPS_CACHE_TTL seconds, unless every fetch failed. The cache is
+    best-effort: a state-store error falls back to fetching from ER.
+    """
+    ttl = settings.EVENT_TYPE_MAPS_CACHE_TTL
+    cache_key = f"event_type_maps.{er_host}.{er_account}"
+    if ttl > 0:
+        try:
+            cached = await state_manager.get_cached(cache_key)
+        except Exception as e:
+            logger.warning("Event-type maps cache read failed (%s); fetching from ER.", e)
+            cached = None
+        if cached:
+            maps = EventTypeMaps(**cached)
+            if all(slug in maps.id_by_slug for slug in event_types) and \
+                    all(slug in maps.category_id_by_slug for slug in event_categories):
+                return maps
+            logger.info("Configured slugs missing from the cached event-type maps of %s; refreshing.", er_host)
+
+    maps = await _fetch_event_type_maps(er_client)
+    if ttl > 0 and (maps.id_by_slug or maps.category_id_by_slug):
+        try:
+            await state_manager.set_cached(cache_key, asdict(maps), ttl_seconds=ttl)
+        except Exception as e:
+            logger.warning("Event-type maps cache write failed (%s).", e)
+    return maps
+
+
 async def _fetch_event_type_maps(er_client) -> EventTypeMaps:
     """Build slug→display, slug→type_id, and category_slug→category_id maps.
 
@@ -1158,36 +1632,49 @@ async def _fetch_event_type_maps(er_client) -> EventTypeMaps:
     Neither endpoint returns the other version's types, so we query both and
     merge. v1 responses carry a nested category dict (`id`, `value`, ...);
     v2 responses carry only the category slug. As a fallback for category
-    UUIDs we hit ``GET /activity/events/categories`` if the merged maps
+    UUIDs we use ``GET /activity/events/categories`` if the merged maps
     haven't already populated ``category_id_by_slug`` (e.g. an ER instance
     with only v2 event types).
 
-    All three fetches are best-effort and logged independently — a 403 on
-    one doesn't break the others. If everything fails, all maps are empty;
-    downstream callers treat that as the "skip the pull" signal.
+    All three fetches run concurrently, are best-effort and are logged
+    independently — a 403 on one doesn't break the others. If everything
+    fails, all maps are empty; downstream callers treat that as the "skip the
+    pull" signal.
     """
     maps = EventTypeMaps()
 
+    # Authenticate once up front: with username/password the client would
+    # otherwise log in from each of the concurrent calls below. A failure here
+    # surfaces again (and is logged) from the calls themselves.
     try:
-        v1_types = await er_client.get_event_types(version=VERSION_1_0)
-    except Exception as e:
+        await er_client.auth_headers()
+    except Exception:
+        pass
+    # The three fetches don't depend on each other, so they run concurrently.
+    # The categories endpoint is only a fallback but is requested along with
+    # the others, so a start-up never waits for it after the event types.
+    v1_types, v2_types, categories = await asyncio.gather(
+        _capture_error(er_client.get_event_types, version=VERSION_1_0),
+        _capture_error(er_client.get_event_types, version=VERSION_2_0),
+        _capture_error(er_client.get_event_categories),
+    )
+
+    if isinstance(v1_types, Exception):
         logger.warning(
             "Could not fetch ER v1 event types: %s: %s. "
             "Slug→UUID resolution will fall back to v2-only results.",
-            type(e).__name__, e,
+            type(v1_types).__name__, v1_types,
         )
     else:
         for et in _as_list(v1_types):
             if isinstance(et, dict):
                 _absorb_event_type(maps, et, with_category=True)
 
-    try:
-        v2_types = await er_client.get_event_types(version=VERSION_2_0)
-    except Exception as e:
+    if isinstance(v2_types, Exception):
         logger.warning(
             "Could not fetch ER v2 event types: %s: %s. "
             "Slug→UUID resolution will fall back to v1-only results.",
-            type(e).__name__, e,
+            type(v2_types).__name__, v2_types,
         )
     else:
         for et in _as_list(v2_types):
@@ -1199,13 +1686,11 @@ async def _fetch_event_type_maps(er_client) -> EventTypeMaps:
     # If we got no category UUIDs from the v1 event types (e.g. ER has only
     # v2 types defined), the canonical categories endpoint fills the gap.
     if not maps.category_id_by_slug:
-        try:
-            categories = await er_client.get_event_categories()
-        except Exception as e:
+        if isinstance(categories, Exception):
             logger.warning(
                 "Could not fetch ER event categories: %s: %s. "
                 "event_category filter slugs will not resolve.",
-                type(e).__name__, e,
+                type(categories).__name__, categories,
             )
         else:
             for cat in _as_list(categories):
@@ -1389,6 +1874,11 @@ def transform_observations_to_gundi_schema(observations, resolver=None):
     return transformed_data
 
 
+# How long a pull trusts an event's "pending in the outbox" marker. After that
+# (e.g. the outbox was lost with its instance's disk) the event is handled as
+# if the marker weren't there.
+OUTBOX_PENDING_MAX_AGE_SECONDS = 24 * 60 * 60
+
 # Maps an ER event field name to the corresponding key the sensors-API
 # EventCreateUpdateSerializer accepts on PATCH (see cdip PR #428). For each
 # entry: (er_event_field, serializer_patch_field, state_record_key).
@@ -1399,83 +1889,327 @@ _ER_FIELD_DIFF_MAP = (
 )
 
 
-def _extract_object_id_from_post_events_response(response):
-    """Pull the Gundi-assigned object_id out of a post_events response.
+def _extract_object_ids_from_post_events_response(response, expected_count):
+    """Map a post_events response back to the posted events, by position.
 
     post_events always wraps in a list on the wire — even for a single event —
-    so the response is normally a list of dicts. Be defensive about dict
-    responses too in case the API surface ever shifts.
+    and returns one entry per posted event, in request order. Returns a list of
+    ``expected_count`` object_ids (None where an entry carries none). If the
+    response length doesn't match what was posted, positions can't be trusted,
+    so every slot is None. Be defensive about dict responses too (single event)
+    in case the API surface ever shifts.
     """
-    if isinstance(response, list):
-        if not response:
-            return None
-        first = response[0]
-        if isinstance(first, dict):
-            return first.get("object_id")
-        return None
-    if isinstance(response, dict):
-        return response.get("object_id")
-    return None
+    if isinstance(response, dict) and expected_count == 1:
+        response = [response]
+    if not isinstance(response, list) or len(response) != expected_count:
+        return [None] * expected_count
+    return [
+        item.get("object_id") if isinstance(item, dict) else None
+        for item in response
+    ]
+
+
+async def _post_new_events(er_client, new_events, *, integration_id, state_buffer, include_attachments):
+    """Post a page of never-seen ER events to Gundi in one sensors-API call.
+
+    ``new_events`` is a list of (er_event, transformed_event) pairs. The
+    returned object_ids are mapped back to the ER events by position and their
+    per-event state is recorded in ``state_buffer``; events without one are
+    logged and left without state, so the next pull posts them again.
+    If the post still fails transiently after its retries, the page goes to the
+    outbox instead of failing the run. Its events are then marked as pending in
+    the outbox (so later pulls don't post them again) and get their full state
+    on delivery.
+    Returns (events_posted, attachments_forwarded).
+    """
+    for er_event, transformed in new_events:
+        # Diagnostic: log what we're about to POST so a downstream
+        # destination seeing an unexpected payload (e.g. CMORE
+        # rendering provider_metadata=None) can be traced back to
+        # the ER runner's outbound shape.
+        logger.info(
+            "Posting Gundi event: er_event_uuid=%r title=%r "
+            "provider_metadata=%r",
+            er_event.get("id"),
+            transformed.get("title"),
+            transformed.get("provider_metadata"),
+        )
+    try:
+        response = await send_events_to_gundi(
+            events=[transformed for _, transformed in new_events],
+            integration_id=integration_id,
+        )
+    except Exception as e:
+        if not is_transient_send_error(e):
+            raise
+        logger.warning(f"Posting {len(new_events)} events failed ({e}); keeping them in the outbox.")
+        states = [
+            _event_state(er_event, gundi_object_id=None, seen_note_ids=_note_ids(er_event))
+            for er_event, _ in new_events
+        ]
+        await enqueue_in_outbox(integration_id, "events", {
+            "events": [transformed for _, transformed in new_events],
+            "er_event_ids": [er_event["id"] for er_event, _ in new_events],
+            "states": states,
+        })
+        pending_at = time.time()
+        for (er_event, _), state in zip(new_events, states):
+            state_buffer.set_state(source_id=er_event["id"], state={**state, "outbox_pending_at": pending_at})
+        return 0, 0
+    object_ids = _extract_object_ids_from_post_events_response(
+        response, expected_count=len(new_events)
+    )
+    posted = 0
+    attachments_forwarded = 0
+    for (er_event, _), gundi_object_id in zip(new_events, object_ids):
+        er_event_uuid = er_event["id"]
+        if not gundi_object_id:
+            logger.error(
+                "Could not extract object_id from post_events response; "
+                "skipping state persistence for this event.",
+                extra={"er_event_id": er_event_uuid, "response": response},
+            )
+            continue
+        # Forward files attached to the event (photos, documents)
+        # before persisting state: a crash between post and save
+        # re-runs this event next pull and the seen-list dedupes.
+        seen_file_ids = []
+        if include_attachments:
+            forwarded, seen_file_ids = await _forward_event_files(
+                er_client, er_event, gundi_object_id,
+                integration_id, [],
+            )
+            attachments_forwarded += forwarded
+        # Mark all existing notes as already-seen (no bulk-forward on first sight).
+        note_ids = _note_ids(er_event)
+        _save_event_state(
+            state_buffer,
+            er_event_uuid=er_event_uuid,
+            gundi_object_id=gundi_object_id,
+            er_event=er_event,
+            seen_note_ids=note_ids,
+            seen_file_ids=seen_file_ids,
+        )
+        posted += 1
+    return posted, attachments_forwarded
 
 
-async def _save_event_state(integration_id, er_event_uuid, gundi_object_id, er_event,
-                            seen_note_ids, seen_file_ids=None):
-    """Persist per-event state under (pull_events, er_event_uuid)."""
-    await state_manager.set_state(
-        integration_id=integration_id,
-        action_id="pull_events",
+def _save_event_state(state_buffer, er_event_uuid, gundi_object_id, er_event,
+                      seen_note_ids, seen_file_ids=None):
+    """Record per-event state under (pull_events, er_event_uuid).
+
+    The state is written when ``state_buffer`` is flushed, at the page boundary.
+    """
+    state_buffer.set_state(
         source_id=er_event_uuid,
-        state={
-            "gundi_object_id": gundi_object_id,
-            "updated_at": er_event.get("updated_at"),
-            "state": er_event.get("state"),
-            "priority": er_event.get("priority"),
-            "title": er_event.get("title"),
-            "seen_note_ids": list(seen_note_ids),
-            "seen_file_ids": list(seen_file_ids or []),
-        },
+        state=_event_state(
+            er_event, gundi_object_id=gundi_object_id,
+            seen_note_ids=seen_note_ids, seen_file_ids=seen_file_ids,
+        ),
+    )
+
+
+def _event_state(er_event, *, gundi_object_id, seen_note_ids, seen_file_ids=None):
+    return {
+        "gundi_object_id": gundi_object_id,
+        "updated_at": er_event.get("updated_at"),
+        "state": er_event.get("state"),
+        "priority": er_event.get("priority"),
+        "title": er_event.get("title"),
+        "seen_note_ids": list(seen_note_ids),
+        "seen_file_ids": list(seen_file_ids or []),
+    }
+
+
+def _note_ids(er_event):
+    return [n["id"] for n in er_event.get("notes") or [] if n.get("id")]
+
+
+def _outbox_pending(state_record):
+    """Whether the event has sends waiting in the outbox, per its state.
+
+    Markers older than OUTBOX_PENDING_MAX_AGE_SECONDS are ignored, so an event
+    whose outbox item was lost (e.g. with its instance's disk) is handled again:
+    pull_events keeps reading it until then (see ``_hold_events_checkpoint``).
+    """
+    pending_at = state_record.get("outbox_pending_at")
+    return bool(pending_at) and time.time() - pending_at < OUTBOX_PENDING_MAX_AGE_SECONDS
+
+
+def _outbox_base(state_record):
+    """What Gundi is known to have of an event: its fields before the updates waiting in the outbox."""
+    if state_record.get("outbox_base"):
+        return state_record["outbox_base"]
+    base = {state_key: state_record.get(state_key) for _, _, state_key in _ER_FIELD_DIFF_MAP}
+    return {**base, "seen_note_ids": list(state_record.get("seen_note_ids", []))}
+
+
+def _state_is_newer(current, state):
+    """Whether ``current`` was recorded from a later version of the ER event than ``state``."""
+    current_updated_at, updated_at = current.get("updated_at"), state.get("updated_at")
+    if not current_updated_at or not updated_at:
+        return False
+    try:
+        return _parse_iso(current_updated_at) > _parse_iso(updated_at)
+    except (TypeError, ValueError):
+        return current_updated_at > updated_at
+
+
+@outbox_delivery("events")
+async def _deliver_outboxed_events(integration_id, payload):
+    """Post events kept in the outbox and record their per-event states.
+
+    The states were taken when the events were first read; attachments are not
+    forwarded here but when the event is next updated in ER. A state is not
+    written if a later pull already recorded a newer one (e.g. it posted the
+    event again after its outbox marker expired).
+    """
+    response = await send_events_to_gundi(events=payload["events"], integration_id=integration_id)
+    object_ids = _extract_object_ids_from_post_events_response(
+        response, expected_count=len(payload["events"])
+    )
+    current_states = await state_manager.get_states(
+        integration_id=integration_id, action_id="pull_events", source_ids=payload["er_event_ids"],
+    )
+    states = {}
+    for state, er_event_uuid, gundi_object_id in zip(
+        payload["states"], payload["er_event_ids"], object_ids
+    ):
+        if not gundi_object_id:
+            continue
+        current = current_states.get(er_event_uuid, {})
+        if current.get("gundi_object_id") or _state_is_newer(current, state):
+            logger.info(f"Not recording the outboxed state of ER event {er_event_uuid}: it has a newer one.")
+            continue
+        states[er_event_uuid] = {**state, "gundi_object_id": gundi_object_id}
+    await state_manager.set_states(integration_id=integration_id, action_id="pull_events", states=states)
+
+
+@outbox_delivery("event_updates")
+async def _deliver_outboxed_event_update(integration_id, payload):
+    """Send one event update kept in the outbox.
+
+    The last update of a run carries the event's state after all of them, which
+    is recorded unless a later pull already recorded a newer one.
+    """
+    await update_event_in_gundi(
+        gundi_object_id=payload["gundi_object_id"],
+        changes=payload["changes"],
+        integration_id=integration_id,
+    )
+    state = payload.get("state")
+    if state is None:
+        return
+    current = await state_manager.get_state(
+        integration_id=integration_id, action_id="pull_events", source_id=payload["er_event_id"],
+    )
+    if _state_is_newer(current, state):
+        return  # A later pull queued more updates behind this one; the last of those records the state
+    await state_manager.set_state(
+        integration_id=integration_id, action_id="pull_events", state=state, source_id=payload["er_event_id"],
     )
 
 
 async def _emit_event_updates(er_event, state_record, integration_id):
     """Emit one Gundi update_event per detected change on a previously-seen event.
 
-    Returns a tuple (emitted_count, new_seen_note_ids). The caller persists
-    the updated state after we return so a transient failure mid-loop leaves
-    the watermark untouched and the next run can re-detect.
+    Returns a tuple (emitted_count, new_seen_note_ids, unsent_changes). The
+    updates are sent in order; if one fails transiently, it and the ones after
+    it are returned unsent for the caller to keep in the outbox. If the event
+    already has updates waiting in the outbox, nothing is sent, so the new ones
+    queue up behind them. The caller persists the updated state after we
+    return so a failure mid-loop leaves the watermark untouched and the next
+    run can re-detect.
     """
     gundi_object_id = state_record["gundi_object_id"]
     seen_note_ids = list(state_record.get("seen_note_ids", []))
     seen_set = set(seen_note_ids)
-    emitted = 0
+    changes = []
 
     # New notes — one update_event each, preserves author + timestamp per comment.
     for note in er_event.get("notes") or []:
         note_id = note.get("id")
         if not note_id or note_id in seen_set:
             continue
-        await update_event_in_gundi(
-            gundi_object_id=gundi_object_id,
-            changes={"notes": [note]},
-            integration_id=integration_id,
-        )
+        changes.append({"notes": [note]})
         seen_note_ids.append(note_id)
         seen_set.add(note_id)
-        emitted += 1
 
     # Field changes — one update_event per changed field.
     for er_field, patch_field, state_key in _ER_FIELD_DIFF_MAP:
         new_value = er_event.get(er_field)
         if new_value == state_record.get(state_key):
             continue
-        await update_event_in_gundi(
-            gundi_object_id=gundi_object_id,
-            changes={patch_field: new_value},
+        changes.append({patch_field: new_value})
+
+    if _outbox_pending(state_record):
+        return 0, seen_note_ids, changes
+    for emitted, change in enumerate(changes):
+        try:
+            await update_event_in_gundi(
+                gundi_object_id=gundi_object_id,
+                changes=change,
+                integration_id=integration_id,
+            )
+        except Exception as e:
+            if not is_transient_send_error(e):
+                raise
+            logger.warning(
+                f"Updating Gundi event {gundi_object_id} failed ({e}); "
+                f"keeping {len(changes) - emitted} updates in the outbox."
+            )
+            return emitted, seen_note_ids, changes[emitted:]
+    return len(changes), seen_note_ids, []
+
+
+async def _process_updated_event(er_client, er_event, state_record, *, integration_id, state_buffer,
+                                 include_attachments, semaphore):
+    """Forward everything that changed on one previously-seen event.
+
+    Emits its updates and (optionally) its new files in order, then records its
+    refreshed state in ``state_buffer``. Updates that can't be sent now (see
+    ``_emit_event_updates``) go to the outbox, one item each, and the state is
+    marked as pending there, keeping what Gundi had before them (``outbox_base``)
+    to diff against if they're never delivered. ``semaphore`` bounds how many events
+    are processed at once. Returns (updates_emitted, attachments_forwarded).
+    """
+    async with semaphore:
+        emitted, new_seen_note_ids, unsent_changes = await _emit_event_updates(
+            er_event=er_event,
+            state_record=state_record,
             integration_id=integration_id,
         )
-        emitted += 1
-
-    return emitted, seen_note_ids
+        forwarded = 0
+        seen_file_ids = state_record.get("seen_file_ids", [])
+        if include_attachments:
+            forwarded, seen_file_ids = await _forward_event_files(
+                er_client, er_event, state_record["gundi_object_id"],
+                integration_id, seen_file_ids,
+            )
+        # Refresh state to reflect what we forwarded (or kept in the outbox) this run.
+        state = _event_state(
+            er_event, gundi_object_id=state_record["gundi_object_id"],
+            seen_note_ids=new_seen_note_ids, seen_file_ids=seen_file_ids,
+        )
+        if unsent_changes:
+            # One item per update, delivered in order; the last one records the state
+            for i, changes in enumerate(unsent_changes):
+                await enqueue_in_outbox(integration_id, "event_updates", {
+                    "gundi_object_id": state_record["gundi_object_id"],
+                    "er_event_id": er_event["id"],
+                    "changes": changes,
+                    "state": state if i == len(unsent_changes) - 1 else None,
+                })
+            state = {**state, "outbox_pending_at": time.time(), "outbox_base": _outbox_base(state_record)}
+        elif _outbox_pending(state_record):
+            # Still waiting there
+            state = {
+                **state,
+                "outbox_pending_at": state_record["outbox_pending_at"],
+                "outbox_base": _outbox_base(state_record),
+            }
+        state_buffer.set_state(source_id=er_event["id"], state=state)
+    return emitted, forwarded
 
 
 # Guardrail: don't pull pathological uploads (videos, raw camera dumps) into
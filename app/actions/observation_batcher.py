@@ -0,0 +1,119 @@
+# app/actions/observation_batcher.py
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class ObservationBatcher:
+    """Accumulates transformed observations across ER pages and sources into
+    larger sensors-API batches.
+
+    A batch is sent once it holds ``max_records`` observations, once adding the
+    next one would take it past ``max_bytes`` (JSON-encoded), or
+    ``max_delay_seconds`` after its first observation arrived, whichever comes
+    first. At most ``max_concurrent_sends`` batches are in flight; ``add()``
+    waits for a free slot before cutting another batch, which is the
+    backpressure on the readers.
+
+    ``add()`` returns a receipt: a future that resolves once every batch holding
+    one of the added observations was sent (or raises that send's error), so
+    callers only record progress for data that actually reached Gundi.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[dict]], Awaitable],
+        *,
+        max_records: int,
+        max_bytes: int,
+        max_delay_seconds: float,
+        max_concurrent_sends: int,
+    ):
+        self._send = send
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_delay_seconds = max_delay_seconds
+        self._slots = asyncio.Semaphore(max_concurrent_sends)
+        self._records = []
+        self._bytes = 0
+        self._future = None  # Resolves when the batch being filled is sent
+        self._timer = None
+        self._tasks = set()
+
+    async def add(self, observations: List[dict]) -> asyncio.Future:
+        futures = []
+        for observation in observations:
+            size = len(json.dumps(observation, default=str))
+            if self._records and (len(self._records) >= self.max_records or self._bytes + size > self.max_bytes):
+                await self._dispatch()
+            if not self._records:
+                loop = asyncio.get_running_loop()
+                self._future = loop.create_future()
+                self._timer = loop.call_later(self.max_delay_seconds, self._on_timer)
+            self._records.append(observation)
+            self._bytes += size
+            if not futures or futures[-1] is not self._future:
+                futures.append(self._future)
+        if len(self._records) >= self.max_records:
+            await self._dispatch()
+        return asyncio.gather(*futures)
+
+    async def flush(self):
+        """Send whatever is buffered now, without waiting for the limits."""
+        await self._dispatch()
+
+    async def close(self):
+        """Drop the buffer and cancel in-flight sends (their receipts are cancelled)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._future is not None and not self._future.done():
+            self._future.cancel()
+        self._records, self._bytes, self._future = [], 0, None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _on_timer(self):
+        self._timer = None
+        if self._records:
+            task = asyncio.create_task(self._dispatch())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self):
+        # Take the buffer before waiting for a slot, so concurrent add() calls
+        # start a new batch instead of growing this one.
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        records, future = self._records, self._future
+        self._records, self._bytes, self._future = [], 0, None
+        if not records:
+            return
+        try:
+            await self._slots.acquire()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        task = asyncio.create_task(self._send_batch(records, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, records, future):
+        try:
+            logger.info(f"Sending {len(records)} observations to Gundi...")
+            await self._send(records)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(len(records))
+        finally:
+            self._slots.release()
+            if not future.done():
+                future.cancel()  # The send was cancelled
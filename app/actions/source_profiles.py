@@ -1,9 +1,12 @@
 # app/actions/source_profiles.py
+import asyncio
 import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Iterable, List, Optional
 
-from pydantic import BaseModel
+from app import settings
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +14,9 @@ logger = logging.getLogger(__name__)
 # small so the query string can't 414 and the (single-page) response isn't truncated.
 SOURCE_ID_CHUNK_SIZE = 25
 
+# How many source profiles are built at once (each one is two ER requests).
+PROFILE_BUILD_CONCURRENCY = 8
+
 
 def _ensure_utc(dt: Optional[datetime]) -> Optional[datetime]:
     """Return dt normalised to UTC-aware, or None if dt is None.
@@ -36,7 +42,13 @@ def _parse_dt(value):
     return _ensure_utc(datetime.fromisoformat(value))
 
 
-class Assignment(BaseModel):
+# The records below sit on the per-observation path, so they are plain slotted
+# dataclasses rather than pydantic models; SourceProfile.to_dict()/from_dict()
+# are the (de)serialization edge.
+
+
+@dataclass(frozen=True, slots=True)
+class Assignment:
     lower: datetime
     upper: Optional[datetime] = None  # None = still assigned (open-ended)
     subject_name: Optional[str] = None
@@ -55,17 +67,104 @@ class Assignment(BaseModel):
         return True
 
 
-class SourceProfile(BaseModel):
-    manufacturer_id: Optional[str] = None
-    assignments: List[Assignment] = []
-
-
-class ResolvedSource(BaseModel):
+@dataclass(frozen=True, slots=True)
+class ResolvedSource:
     external_source_id: str
     source_name: Optional[str] = None
     subject_type: Optional[str] = None
 
 
+class _AssignmentIndex:
+    """The assignment history of one source flattened into disjoint segments.
+
+    ``starts`` are the ascending UTC boundaries (every assignment's lower and
+    upper bound); segment ``i`` spans ``[starts[i], starts[i + 1])`` and
+    ``resolved[i]`` is its ResolvedSource, built once per winning assignment.
+    A lookup is one bisect and returns a shared, pre-built ResolvedSource.
+    """
+    __slots__ = ("starts", "resolved", "unassigned")
+
+    def __init__(self, assignments: List["Assignment"], external_source_id: str):
+        self.unassigned = ResolvedSource(external_source_id=external_source_id)
+        bounds = [(_ensure_utc(a.lower), _ensure_utc(a.upper), a) for a in assignments]
+        self.starts = sorted(
+            {lower for lower, _, _ in bounds} | {upper for _, upper, _ in bounds if upper is not None}
+        )
+        by_assignment = {}
+        self.resolved = []
+        for start in self.starts:
+            # Coverage can only change at a boundary, so the assignment that
+            # covers the start of a segment covers all of it. On overlap the
+            # latest-starting assignment wins (the first one listed on a tie).
+            covering = [
+                (lower, i) for i, (lower, upper, _) in enumerate(bounds)
+                if lower <= start and (upper is None or start < upper)
+            ]
+            if not covering:
+                self.resolved.append(self.unassigned)
+                continue
+            _, winner = max(covering, key=lambda c: (c[0], -c[1]))
+            if winner not in by_assignment:
+                chosen = bounds[winner][2]
+                by_assignment[winner] = ResolvedSource(
+                    external_source_id=external_source_id,
+                    source_name=chosen.subject_name,
+                    subject_type=chosen.subject_type,
+                )
+            self.resolved.append(by_assignment[winner])
+
+    def lookup(self, when: Optional[datetime]) -> ResolvedSource:
+        if when is None:
+            return self.unassigned
+        i = bisect_right(self.starts, _ensure_utc(when)) - 1
+        return self.resolved[i] if i >= 0 else self.unassigned
+
+
+@dataclass(slots=True)
+class SourceProfile:
+    manufacturer_id: Optional[str] = None
+    assignments: List[Assignment] = field(default_factory=list)
+    # Built on first resolve; profiles aren't mutated once built.
+    _index: Optional[_AssignmentIndex] = field(default=None, init=False, repr=False, compare=False)
+
+    def to_dict(self) -> dict:
+        """JSON-ready form, used for the Redis cache."""
+        return {
+            "manufacturer_id": self.manufacturer_id,
+            "assignments": [
+                {
+                    "lower": a.lower.isoformat(),
+                    "upper": a.upper.isoformat() if a.upper else None,
+                    "subject_name": a.subject_name,
+                    "subject_type": a.subject_type,
+                }
+                for a in self.assignments
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, value: dict) -> "SourceProfile":
+        return cls(
+            manufacturer_id=value.get("manufacturer_id"),
+            assignments=[
+                Assignment(
+                    lower=_parse_dt(a["lower"]),
+                    upper=_parse_dt(a.get("upper")),
+                    subject_name=a.get("subject_name"),
+                    subject_type=a.get("subject_type"),
+                )
+                for a in value.get("assignments") or []
+            ],
+        )
+
+    def assignment_index(self, source_uuid: str) -> _AssignmentIndex:
+        external = self.manufacturer_id or f"er-src-{source_uuid}"
+        index = self._index
+        if index is None or index.unassigned.external_source_id != external:
+            index = self._index = _AssignmentIndex(self.assignments, external)
+        return index
+
+
 def _chunked(seq, size):
     seq = list(seq)
     for i in range(0, len(seq), size):
@@ -78,18 +177,12 @@ def resolve_source(profile: Optional[SourceProfile], source_uuid: str, recorded_
     external_source_id = manufacturer_id, falling back to er-src-{uuid}. The
     subject name/type come from the assignment whose half-open [lower, upper)
     range contains recorded_at; on overlap the latest-starting assignment wins.
+    The lookup goes through the profile's interval index (one bisect), and the
+    returned ResolvedSource is shared: treat it as read-only.
     """
-    fallback = f"er-src-{source_uuid}"
     if profile is None:
-        return ResolvedSource(external_source_id=fallback)
-    external = profile.manufacturer_id or fallback
-    covering = [a for a in profile.assignments if a.covers(recorded_at)]
-    chosen = max(covering, key=lambda a: _ensure_utc(a.lower)) if covering else None
-    return ResolvedSource(
-        external_source_id=external,
-        source_name=chosen.subject_name if chosen else None,
-        subject_type=chosen.subject_type if chosen else None,
-    )
+        return ResolvedSource(external_source_id=f"er-src-{source_uuid}")
+    return profile.assignment_index(source_uuid).lookup(recorded_at)
 
 
 class SourceProfileResolver:
@@ -98,29 +191,86 @@ class SourceProfileResolver:
     Covers both pull paths because it keys off the source UUIDs that actually
     appear in observations. Enrichment failures degrade to a UUID fallback and
     are never allowed to fail the pull.
+
+    With a ``state_manager`` (and an ``integration_id``), built profiles are
+    also kept in Redis for SOURCE_PROFILE_CACHE_TTL seconds, so later runs and
+    other replicas reuse them. That cache is best-effort: its errors are
+    logged and the profiles are fetched from ER instead.
     """
 
-    def __init__(self, er_client, *, integration_id=None):
+    def __init__(self, er_client, *, integration_id=None, state_manager=None):
         self._er = er_client
         self._integration_id = integration_id
+        self._state_manager = state_manager if integration_id else None
         self._cache = {}
 
     async def ensure(self, source_uuids: Iterable[str]) -> None:
         missing = sorted({u for u in source_uuids if u and u not in self._cache})
+        if not missing:
+            return
+        missing = await self._load_cached(missing)
         if not missing:
             return
         # _fetch_ranges is now per-chunk resilient and never raises; always returns
         # whatever it managed to collect before any failing chunk.
         ranges_by_source = await self._fetch_ranges(missing)
-        for uuid in missing:
-            try:
-                self._cache[uuid] = await self._build_profile(uuid, ranges_by_source.get(uuid, []))
-            except Exception as e:
-                logger.warning(
-                    "Source profile fetch failed for %s (%s); using UUID fallback.",
-                    uuid, e, extra={"attention_needed": True},
-                )
-                self._cache[uuid] = SourceProfile()
+        semaphore = asyncio.Semaphore(PROFILE_BUILD_CONCURRENCY)
+        built = {}
+
+        async def build(uuid):
+            async with semaphore:
+                try:
+                    profile = await self._build_profile(uuid, ranges_by_source.get(uuid, []))
+                except Exception as e:
+                    logger.warning(
+                        "Source profile fetch failed for %s (%s); using UUID fallback.",
+                        uuid, e, extra={"attention_needed": True},
+                    )
+                    profile = SourceProfile()
+                else:
+                    # Only complete profiles outlive the run: a source whose
+                    # assignments chunk failed is retried next time.
+                    if uuid in ranges_by_source:
+                        built[uuid] = profile
+            self._cache[uuid] = profile
+
+        # Sources don't depend on each other, so their profiles are built concurrently.
+        await asyncio.gather(*(build(uuid) for uuid in missing))
+        await self._store_cached(built)
+
+    def _cache_key(self, source_uuid):
+        return f"source_profile.{self._integration_id}.{source_uuid}"
+
+    async def _load_cached(self, source_uuids):
+        """Fill the per-run cache from Redis; return the UUIDs still missing."""
+        if self._state_manager is None or settings.SOURCE_PROFILE_CACHE_TTL <= 0:
+            return source_uuids
+        try:
+            cached = await self._state_manager.get_cached_many(
+                [self._cache_key(uuid) for uuid in source_uuids]
+            )
+        except Exception as e:
+            logger.warning("Source profile cache read failed (%s); fetching from ER.", e)
+            return source_uuids
+        still_missing = []
+        for uuid in source_uuids:
+            value = cached.get(self._cache_key(uuid))
+            if value is None:
+                still_missing.append(uuid)
+            else:
+                self._cache[uuid] = SourceProfile.from_dict(value)
+        return still_missing
+
+    async def _store_cached(self, profiles):
+        if self._state_manager is None or settings.SOURCE_PROFILE_CACHE_TTL <= 0 or not profiles:
+            return
+        try:
+            await self._state_manager.set_cached_many(
+                {self._cache_key(uuid): profile.to_dict() for uuid, profile in profiles.items()},
+                ttl_seconds=settings.SOURCE_PROFILE_CACHE_TTL,
+            )
+        except Exception as e:
+            logger.warning("Source profile cache write failed (%s).", e)
 
     def resolve(self, source_uuid, recorded_at) -> ResolvedSource:
         return resolve_source(self._cache.get(source_uuid), source_uuid, recorded_at)
@@ -131,7 +281,8 @@ class SourceProfileResolver:
         Chunks the request to keep URLs short. Per-chunk failures are logged and
         skipped; successfully collected chunks are always returned. The fallback
         to an empty SourceProfile() happens in ensure() for sources whose UUID
-        is absent from the returned dict.
+        is absent from the returned dict. Every source of a successful chunk is
+        present, with an empty list if it has no assignments.
         """
         out = {}
         for chunk in _chunked(source_uuids, SOURCE_ID_CHUNK_SIZE):
@@ -156,6 +307,8 @@ class SourceProfileResolver:
                 records = raw.get("results", [])
             else:
                 records = raw
+            for uuid in chunk:
+                out.setdefault(uuid, [])
             for rec in records or []:
                 src = rec.get("source")
                 rng = rec.get("assigned_range") or {}
@@ -272,10 +272,19 @@ def mock_state_manager(mocker):
     mock_state_manager.get_state.return_value = async_return(
         {'last_execution': '2023-11-17T11:20:00+0200'}
     )
+    # Per-page bulk read of per-event state. Default: every event is new.
+    mock_state_manager.get_states.return_value = async_return({})
     mock_state_manager.set_state.return_value = async_return(None)
+    # Flushes of the write-behind state buffer.
+    mock_state_manager.set_states.return_value = async_return(None)
     # Backfill lease + cursor-clear primitives. Default: lease acquired.
     mock_state_manager.set_if_absent.return_value = async_return(True)
     mock_state_manager.delete_state.return_value = async_return(None)
+    # Shared cross-run cache (e.g. event-type maps). Default: always a miss.
+    mock_state_manager.get_cached.return_value = async_return(None)
+    mock_state_manager.set_cached.return_value = async_return(None)
+    mock_state_manager.get_cached_many.return_value = async_return({})
+    mock_state_manager.set_cached_many.return_value = async_return(None)
     return mock_state_manager
 
 
@@ -297,6 +306,7 @@ def mock_erclient_class(
         get_me_response
     )
     erclient_mock.get_event_types.return_value = async_return(get_event_types_response)
+    erclient_mock.get_event_categories.return_value = async_return([])
 
     async def mock_get_subjectgroups(flat=False):
         return get_subjectgroups_flat_response if flat else get_subjectgroups_response
@@ -1,5 +1,6 @@
 import json
 
+import httpx
 import pytest
 from erclient import ERClientPermissionDenied
 from gundi_core.events import LogLevel
@@ -116,17 +117,42 @@ async def test_execute_pull_events_action(
 
     assert mock_config_manager_er_provider.get_integration_details.called
     assert mock_state_manager.get_state.called
-    assert mock_state_manager.set_state.called
+    # Per-event state is read in bulk: one round trip per ER page.
+    assert mock_state_manager.get_states.call_count == 2
     assert mock_erclient_class.return_value.get_events.called
-    # One post_events per event now (per-event state lookup) — was batched before GUNDI-5386.
+    # Pages are requested in ascending order of the checkpointed field.
+    assert mock_erclient_class.return_value.get_events.call_args.kwargs["sort_by"] == "updated_at"
+    # New events are posted in bulk: one post_events per ER page.
     total = len(events_batch_one) + len(events_batch_two)
-    assert mock_gundi_sensors_client_class.return_value.post_events.call_count == total
+    post_events = mock_gundi_sensors_client_class.return_value.post_events
+    assert post_events.call_count == 2
+    assert [len(c.kwargs["data"]) for c in post_events.call_args_list] == [
+        len(events_batch_one), len(events_batch_two)
+    ]
+    # Each ER event is recorded against the object_id at its position in the response.
+    # Per-event states and the checkpoint are written in one MSET per page,
+    # then the watermark replaces the checkpoint.
+    assert mock_state_manager.set_states.call_count == 3
+    page_writes = [c.kwargs["states"] for c in mock_state_manager.set_states.call_args_list[:2]]
+    saved = {
+        source_id: state["gundi_object_id"]
+        for states in page_writes
+        for source_id, state in states.items()
+        if source_id != "no-source"
+    }
+    assert saved[events_batch_one[0]["id"]] == "abebe106-3c50-446b-9c98-0b9b503fc900"
+    assert saved[events_batch_one[1]["id"]] == "cdebe106-3c50-446b-9c98-0b9b503fc911"
+    assert all("checkpoint" in states["no-source"] for states in page_writes)
+    final = mock_state_manager.set_states.call_args.kwargs["states"]["no-source"]
+    assert set(final) == {"last_execution"}
     assert response == {
+        "status": "complete",
         "events_extracted": total,
         "events_updated": 0,
         "updates_emitted": 0,
         "events_skipped_unchanged": 0,
         "attachments_forwarded": 0,
+        "outbox_depth": 0,
     }
 
 
@@ -157,15 +183,17 @@ async def test_execute_pull_observations_action(
 
     assert mock_config_manager_er_provider.get_integration_details.called
     assert mock_state_manager.get_state.called
-    assert mock_state_manager.set_state.called
+    assert mock_state_manager.set_states.called
     assert mock_erclient_class.return_value.get_observations.called
-    assert mock_gundi_sensors_client_class.return_value.post_observations.call_count == 2
+    # Both ER pages fit in one outbound batch
+    assert mock_gundi_sensors_client_class.return_value.post_observations.call_count == 1
     assert response == {
         "status": "complete",
         "observations_extracted": len(observations_batch_one) + len(observations_batch_two),
         "units_failed": 0,
         "filter_active": False,
         "sources_resolved": None,
+        "outbox_depth": 0,
     }
 
 
@@ -279,6 +307,44 @@ async def test_execute_show_permissions_action_with_default_config(
     assert permissions == expected_permissions_result_with_default_config
 
 
+@pytest.mark.asyncio
+async def test_show_permissions_requests_er_lookups_concurrently(
+        mocker, mock_gundi_client_v2, mock_erclient_class, er_integration_v2_provider,
+        mock_publish_event, mock_config_manager_er_destination,
+        get_me_response, get_event_types_response, get_subjectgroups_response,
+):
+    """users/me, eventtypes and subjectgroups are in flight at the same time."""
+    mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.config_manager", mock_config_manager_er_destination)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    in_flight = {"now": 0, "max": 0}
+
+    def tracked(result):
+        async def call(**kwargs):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await _asyncio.sleep(0)
+            in_flight["now"] -= 1
+            return result
+        return call
+
+    mock_erclient = mock_erclient_class.return_value
+    mock_erclient.get_me.side_effect = tracked(get_me_response)
+    mock_erclient.get_event_types.side_effect = tracked(get_event_types_response)
+    mock_erclient.get_subjectgroups.side_effect = tracked(get_subjectgroups_response)
+
+    response = await execute_action(
+        integration_id=str(er_integration_v2_provider.id),
+        action_id="show_permissions"
+    )
+
+    assert in_flight["max"] == 3
+    assert "error" not in response["data"]["User Details"]
+    assert response["data"]["Subject Group UUIDs"]
+
+
 @pytest.mark.asyncio
 async def test_execute_show_permissions_action_with_include_subjects_from_subgroups_true(
         mocker, mock_gundi_client_v2, mock_erclient_class, er_integration_v2_provider,
@@ -700,6 +766,40 @@ async def test_resolve_source_ids_dedups_across_overlapping_groups(mocker):
     assert er_client.get_source_assignments.call_count == 1
 
 
+@pytest.mark.asyncio
+async def test_resolve_source_ranges_keeps_assigned_ranges(mocker):
+    """Each source maps to the ranges of its assignments to the selected
+    subjects; a record without assigned_range makes the source unbounded."""
+    from app.actions.handlers import _resolve_source_ranges
+
+    er_client = mocker.MagicMock()
+
+    async def fake_get_subjectgroups(flat=False):
+        return [{"id": "grp", "subjects": [{"id": "subj-1"}, {"id": "subj-2"}], "subgroups": []}]
+
+    async def fake_get_source_assignments(subject_ids=None, source_ids=None):
+        return [
+            {"subject": "subj-1", "source": "collar-1",
+             "assigned_range": {"lower": "2024-01-01T00:00:00Z", "upper": "2024-06-01T00:00:00Z"}},
+            {"subject": "subj-2", "source": "collar-1",
+             "assigned_range": {"lower": "2025-01-01T00:00:00Z", "upper": None}},
+            {"subject": "subj-2", "source": "collar-2"},
+        ]
+
+    er_client.get_subjectgroups.side_effect = fake_get_subjectgroups
+    er_client.get_source_assignments.side_effect = fake_get_source_assignments
+
+    ranges = await _resolve_source_ranges(er_client, group_ids=["grp"])
+
+    assert ranges == {
+        "collar-1": [
+            ["2024-01-01T00:00:00Z", "2024-06-01T00:00:00Z"],
+            ["2025-01-01T00:00:00Z", None],
+        ],
+        "collar-2": None,
+    }
+
+
 @pytest.mark.asyncio
 async def test_resolve_source_ids_empty_group_ids_short_circuits(mocker):
     """No configured groups → no ER calls at all."""
@@ -783,6 +883,7 @@ async def test_pull_observations_filters_by_resolved_source_ids(
         "units_failed": 0,
         "filter_active": True,
         "sources_resolved": 2,
+        "outbox_depth": 0,
     }
     forwarded_sources = set()
     for call in mock_gundi_sensors_client_class.return_value.post_observations.call_args_list:
@@ -876,20 +977,141 @@ async def test_show_permissions_surfaces_raw_slugs_and_uuids(
 # GUNDI-5386: pull_events new-vs-update branching
 # ---------------------------------------------------------------------------
 
-from app.actions.handlers import _emit_event_updates, _extract_object_id_from_post_events_response
+from app.actions.handlers import _emit_event_updates, _extract_object_ids_from_post_events_response
+
+
+def test_extract_object_ids_from_post_events_response():
+    """Maps object_ids back to the posted events by position, and degrades cleanly."""
+    assert _extract_object_ids_from_post_events_response(
+        [{"object_id": "abc-123", "created_at": "..."}, {"object_id": "def-456"}], expected_count=2
+    ) == ["abc-123", "def-456"]
+    assert _extract_object_ids_from_post_events_response(
+        [{"object_id": "abc-123"}, {"created_at": "..."}], expected_count=2
+    ) == ["abc-123", None]
+    assert _extract_object_ids_from_post_events_response(
+        {"object_id": "single-dict-fallback"}, expected_count=1
+    ) == ["single-dict-fallback"]
+    # A length mismatch means positions can't be trusted.
+    assert _extract_object_ids_from_post_events_response(
+        [{"object_id": "abc-123"}], expected_count=2
+    ) == [None, None]
+    assert _extract_object_ids_from_post_events_response([], expected_count=1) == [None]
+    assert _extract_object_ids_from_post_events_response(None, expected_count=1) == [None]
+    assert _extract_object_ids_from_post_events_response("not-json", expected_count=1) == [None]
+
+
+@pytest.mark.asyncio
+async def test_post_new_events_keeps_page_in_outbox_when_gundi_is_down(mocker, gundi_outbox):
+    """A page whose post keeps failing transiently goes to the outbox and its
+    events are marked as pending there; their full states are recorded once
+    the outbox delivers it."""
+    from app.actions.handlers import _post_new_events
+    from app.services.outbox import drain_outbox
+    from app.services.state import StateWriteBuffer
+    er_event = {
+        "id": "er-uuid-1", "updated_at": "2026-06-01T00:00:00Z", "state": "new",
+        "priority": 100, "title": "Snare check", "notes": [{"id": "note-a", "text": "t"}],
+    }
+    send = mocker.patch(
+        "app.actions.handlers.send_events_to_gundi",
+        side_effect=[
+            httpx.HTTPStatusError("503", request=httpx.Request("POST", "https://sensors/"), response=httpx.Response(503)),
+            [{"object_id": "gundi-obj-1"}],
+        ],
+    )
+    state_manager = mocker.patch("app.actions.handlers.state_manager")
+    state_manager.set_states.return_value = async_return(None)
+    state_buffer = StateWriteBuffer(state_manager, integration_id="int-1", action_id="pull_events")
+
+    posted, forwarded = await _post_new_events(
+        mocker.MagicMock(), [(er_event, {"title": "Snare check"})],
+        integration_id="int-1", state_buffer=state_buffer, include_attachments=False,
+    )
+
+    assert (posted, forwarded) == (0, 0)
+    marker = state_buffer._pending["er-uuid-1"]
+    assert marker["gundi_object_id"] is None and marker["outbox_pending_at"]
+    assert await gundi_outbox.depth("int-1") == 1
+    state_manager.get_states.return_value = async_return({"er-uuid-1": marker})
+    assert await drain_outbox() == 1
+    assert send.call_args.kwargs["events"] == [{"title": "Snare check"}]
+    assert state_manager.set_states.call_args.kwargs == {
+        "integration_id": "int-1",
+        "action_id": "pull_events",
+        "states": {"er-uuid-1": {
+            "gundi_object_id": "gundi-obj-1", "updated_at": "2026-06-01T00:00:00Z", "state": "new",
+            "priority": 100, "title": "Snare check", "seen_note_ids": ["note-a"], "seen_file_ids": [],
+        }},
+    }
+
+
+@pytest.mark.asyncio
+async def test_outboxed_events_do_not_overwrite_a_newer_state(mocker, gundi_outbox):
+    """If a later pull already recorded the event (e.g. after its outbox marker
+    expired), the late delivery leaves that state alone."""
+    from app.actions.handlers import _deliver_outboxed_events
+    mocker.patch("app.actions.handlers.send_events_to_gundi", return_value=[{"object_id": "gundi-obj-old"}])
+    state_manager = mocker.patch("app.actions.handlers.state_manager")
+    state_manager.get_states.return_value = async_return({"er-uuid-1": {
+        "gundi_object_id": "gundi-obj-new", "updated_at": "2026-06-02T00:00:00Z", "seen_note_ids": ["note-b"],
+    }})
+    state_manager.set_states.return_value = async_return(None)
+
+    await _deliver_outboxed_events("int-1", {
+        "events": [{"title": "Snare check"}],
+        "er_event_ids": ["er-uuid-1"],
+        "states": [{"gundi_object_id": None, "updated_at": "2026-06-01T00:00:00Z", "seen_note_ids": []}],
+    })
+
+    assert state_manager.set_states.call_args.kwargs["states"] == {}
+
+
+def test_outbox_pending_marker_expires():
+    import time
+    from app.actions.handlers import _outbox_pending
+    assert _outbox_pending({"gundi_object_id": None, "outbox_pending_at": time.time()})
+    assert not _outbox_pending({"gundi_object_id": None, "outbox_pending_at": time.time() - 2 * 24 * 3600})
+    assert not _outbox_pending({"gundi_object_id": None})
+
+
+@pytest.mark.asyncio
+async def test_updates_that_fail_transiently_are_delivered_in_order_from_the_outbox(mocker, gundi_outbox):
+    from app.actions.handlers import _process_updated_event
+    from app.services.outbox import drain_outbox
+    from app.services.state import StateWriteBuffer
+    state_record = {
+        "gundi_object_id": "gundi-obj-2", "updated_at": "2026-06-01T00:00:00Z",
+        "state": "new", "priority": 100, "title": "Old title", "seen_note_ids": [],
+    }
+    er_event = {
+        "id": "er-uuid-2", "updated_at": "2026-06-02T00:00:00Z",
+        "state": "active", "priority": 200, "title": "Old title", "notes": [],
+    }
+    down = httpx.HTTPStatusError("503", request=httpx.Request("POST", "https://sensors/"), response=httpx.Response(503))
+    update = mocker.patch("app.actions.handlers.update_event_in_gundi", side_effect=[{}, down, {}, {}])
+    state_manager = mocker.patch("app.actions.handlers.state_manager")
+    state_buffer = StateWriteBuffer(state_manager, integration_id="int-2", action_id="pull_events")
 
+    emitted, _ = await _process_updated_event(
+        mocker.MagicMock(), er_event, state_record, integration_id="int-2", state_buffer=state_buffer,
+        include_attachments=False, semaphore=_asyncio.Semaphore(1),
+    )
 
-def test_extract_object_id_from_post_events_response():
-    """Pulls object_id out of the typical list-wrapped response, and degrades cleanly."""
-    assert _extract_object_id_from_post_events_response(
-        [{"object_id": "abc-123", "created_at": "..."}]
-    ) == "abc-123"
-    assert _extract_object_id_from_post_events_response(
-        {"object_id": "single-dict-fallback"}
-    ) == "single-dict-fallback"
-    assert _extract_object_id_from_post_events_response([]) is None
-    assert _extract_object_id_from_post_events_response(None) is None
-    assert _extract_object_id_from_post_events_response("not-json") is None
+    assert emitted == 1
+    marked = state_buffer._pending["er-uuid-2"]
+    assert marked["updated_at"] == "2026-06-02T00:00:00Z" and marked["outbox_pending_at"]
+    # What Gundi had before the queued updates, to diff against if they're lost
+    assert marked["outbox_base"] == {"state": "new", "priority": 100, "title": "Old title", "seen_note_ids": []}
+    assert await gundi_outbox.depth("int-2") == 1
+    state_manager.get_state.return_value = async_return(marked)
+    state_manager.set_state.return_value = async_return(None)
+    assert await drain_outbox() == 1
+    assert [c.kwargs["changes"] for c in update.call_args_list] == [
+        {"status": "active"}, {"priority": 200}, {"priority": 200},
+    ]
+    recorded = state_manager.set_state.call_args.kwargs["state"]
+    assert recorded["state"] == "active" and recorded["priority"] == 200
+    assert "outbox_pending_at" not in recorded and "outbox_base" not in recorded
 
 
 @pytest.mark.asyncio
@@ -916,7 +1138,7 @@ async def test_emit_event_updates_for_new_note(mocker):
             {"id": "note-b", "text": "fresh observation"},
         ],
     }
-    emitted, new_seen = await _emit_event_updates(
+    emitted, new_seen, unsent = await _emit_event_updates(
         er_event=er_event, state_record=state_record, integration_id="int-1"
     )
     assert emitted == 1
@@ -925,6 +1147,7 @@ async def test_emit_event_updates_for_new_note(mocker):
     assert call_kwargs["gundi_object_id"] == "gundi-obj-1"
     assert call_kwargs["changes"] == {"notes": [{"id": "note-b", "text": "fresh observation"}]}
     assert "note-a" in new_seen and "note-b" in new_seen
+    assert unsent == []
 
 
 @pytest.mark.asyncio
@@ -948,7 +1171,7 @@ async def test_emit_event_updates_for_field_changes(mocker):
         "title": "New title",    # changed
         "notes": [],
     }
-    emitted, _ = await _emit_event_updates(
+    emitted, _, _ = await _emit_event_updates(
         er_event=er_event, state_record=state_record, integration_id="int-2"
     )
     assert emitted == 3
@@ -980,7 +1203,7 @@ async def test_emit_event_updates_skips_when_nothing_changed(mocker):
         "title": "Snare check",
         "notes": [{"id": "note-x", "text": "still here"}],
     }
-    emitted, _ = await _emit_event_updates(
+    emitted, _, _ = await _emit_event_updates(
         er_event=er_event, state_record=state_record, integration_id="int-3"
     )
     assert emitted == 0
@@ -999,20 +1222,21 @@ async def test_pull_events_skips_event_when_updated_at_unchanged(
     first_event = events_batch_one[0]
     mock_state_manager = mocker.MagicMock()
 
-    async def fake_get_state(integration_id, action_id, source_id="no-source"):
-        if source_id == first_event["id"]:
-            return {
-                "gundi_object_id": "gundi-obj-existing",
-                "updated_at": first_event["updated_at"],
-                "state": first_event.get("state"),
-                "priority": first_event.get("priority"),
-                "title": first_event.get("title"),
-                "seen_note_ids": [],
-            }
-        return {"last_execution": "2023-11-17T11:20:00+0200"}
-
-    mock_state_manager.get_state.side_effect = fake_get_state
+    mock_state_manager.get_state.return_value = async_return(
+        {"last_execution": "2023-11-17T11:20:00+0200"}
+    )
+    mock_state_manager.get_states.return_value = async_return({
+        first_event["id"]: {
+            "gundi_object_id": "gundi-obj-existing",
+            "updated_at": first_event["updated_at"],
+            "state": first_event.get("state"),
+            "priority": first_event.get("priority"),
+            "title": first_event.get("title"),
+            "seen_note_ids": [],
+        }
+    })
     mock_state_manager.set_state.return_value = async_return(None)
+    mock_state_manager.set_states.return_value = async_return(None)
     # Single-event batch keeps the test focused.
     from app.actions.tests.conftest import AsyncIterator
     mock_erclient_class.return_value.get_events.return_value = AsyncIterator([[first_event]])
@@ -1139,6 +1363,7 @@ async def test_fetch_event_type_maps_merges_v1_and_v2(mocker):
         return []
 
     er_client.get_event_types = fake_get_event_types
+    er_client.get_event_categories = mocker.AsyncMock(return_value=[{"value": "other", "id": "cat-uuid-o"}])
     maps = await _fetch_event_type_maps(er_client)
     # Both versions contribute to display + id maps.
     assert maps.display_by_slug == {
@@ -1149,11 +1374,128 @@ async def test_fetch_event_type_maps_merges_v1_and_v2(mocker):
         "wildlife_sighting_rep": "v1-type-uuid",
         "coyote_carcass": "v2-type-uuid",
     }
-    # v1's nested category dict populates category_id_by_slug; the v2 fetch
-    # didn't need to fall back to get_event_categories.
+    # v1's nested category dict populates category_id_by_slug; the
+    # get_event_categories fallback (fetched concurrently) goes unused.
     assert maps.category_id_by_slug == {"wildlife": "cat-uuid-w"}
 
 
+@pytest.mark.asyncio
+async def test_get_event_type_maps_uses_cache_when_configured_slugs_resolve(mocker, mock_state_manager):
+    """Cached maps that resolve every configured slug skip the ER calls."""
+    from app.actions.handlers import _get_event_type_maps
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mock_state_manager.get_cached.return_value = async_return({
+        "display_by_slug": {"wildlife_sighting_rep": "Wildlife Sighting Report"},
+        "id_by_slug": {"wildlife_sighting_rep": "v1-type-uuid"},
+        "category_id_by_slug": {"wildlife": "cat-uuid-w"},
+    })
+    er_client = mocker.MagicMock()
+
+    maps = await _get_event_type_maps(
+        er_client, "er.example.org", "acct-1",
+        event_types=["wildlife_sighting_rep"], event_categories=["wildlife"],
+    )
+
+    assert maps.id_by_slug == {"wildlife_sighting_rep": "v1-type-uuid"}
+    mock_state_manager.get_cached.assert_called_once_with("event_type_maps.er.example.org.acct-1")
+    er_client.get_event_types.assert_not_called()
+    mock_state_manager.set_cached.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_event_type_maps_refreshes_on_configured_slug_miss(mocker, mock_state_manager):
+    """A configured slug missing from the cached maps (e.g. a type created since)
+    forces a fetch from ER, and the fresh maps replace the cached ones."""
+    from erclient import VERSION_1_0
+    from app import settings
+    from app.actions.handlers import _get_event_type_maps
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mock_state_manager.get_cached.return_value = async_return({
+        "display_by_slug": {}, "id_by_slug": {"old_type": "old-uuid"}, "category_id_by_slug": {"c": "c-uuid"},
+    })
+    er_client = mocker.MagicMock()
+
+    async def fake_get_event_types(version=VERSION_1_0, **kwargs):
+        if version == VERSION_1_0:
+            return [
+                {"value": "old_type", "display": "Old", "id": "old-uuid",
+                 "category": {"value": "c", "id": "c-uuid"}},
+                {"value": "new_type", "display": "New", "id": "new-uuid",
+                 "category": {"value": "c", "id": "c-uuid"}},
+            ]
+        return []
+
+    er_client.get_event_types = fake_get_event_types
+    er_client.get_event_categories = mocker.AsyncMock(return_value=[])
+
+    maps = await _get_event_type_maps(er_client, "er.example.org", "acct-1", event_types=["new_type"])
+
+    assert maps.id_by_slug["new_type"] == "new-uuid"
+    mock_state_manager.set_cached.assert_called_once_with(
+        "event_type_maps.er.example.org.acct-1",
+        {
+            "display_by_slug": {"old_type": "Old", "new_type": "New"},
+            "id_by_slug": {"old_type": "old-uuid", "new_type": "new-uuid"},
+            "category_id_by_slug": {"c": "c-uuid"},
+        },
+        ttl_seconds=settings.EVENT_TYPE_MAPS_CACHE_TTL,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_event_type_maps_does_not_cache_failed_fetch(mocker, mock_state_manager):
+    """Empty maps (every ER call failed) are not cached, so the next run retries."""
+    from app.actions.handlers import _get_event_type_maps
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mock_state_manager.get_cached.side_effect = RuntimeError("redis down")  # Best-effort read
+    er_client = mocker.MagicMock()
+
+    async def boom(**kwargs):
+        raise RuntimeError("ER down")
+
+    er_client.get_event_types = boom
+    er_client.get_event_categories = boom
+
+    maps = await _get_event_type_maps(er_client, "er.example.org", "acct-1")
+
+    assert maps.id_by_slug == {}
+    mock_state_manager.set_cached.assert_not_called()
+
+
+def test_er_account_id_tells_credentials_apart():
+    """Event-type maps are cached per ER account, identified without exposing its credentials."""
+    from app.actions.configurations import AuthenticateConfig
+    from app.actions.handlers import _er_account_id
+    alice = _er_account_id(AuthenticateConfig(username="alice", password="secret"))
+    assert alice == _er_account_id(AuthenticateConfig(username="alice", password="other"))
+    assert alice != _er_account_id(AuthenticateConfig(username="bob", password="secret"))
+    token = _er_account_id(AuthenticateConfig(token="t0k3n"))
+    assert token != _er_account_id(AuthenticateConfig(token="another"))
+    assert "t0k3n" not in token
+    assert token == _er_account_id(AuthenticateConfig(username="alice", token="t0k3n"))  # The token is used
+
+
+@pytest.mark.asyncio
+async def test_fetch_event_type_maps_requests_endpoints_concurrently(mocker):
+    """v1 types, v2 types and categories are in flight at the same time."""
+    in_flight = {"now": 0, "max": 0}
+
+    async def tracked(**kwargs):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await _asyncio.sleep(0)
+        in_flight["now"] -= 1
+        return []
+
+    er_client = mocker.MagicMock()
+    er_client.get_event_types = tracked
+    er_client.get_event_categories = tracked
+
+    await _fetch_event_type_maps(er_client)
+
+    assert in_flight["max"] == 3
+
+
 @pytest.mark.asyncio
 async def test_fetch_event_type_maps_falls_back_to_categories_endpoint(mocker):
     """If only v2 event types exist (no nested category UUIDs), the helper hits
@@ -1214,6 +1556,7 @@ async def test_fetch_event_type_maps_v1_succeeds_v2_fails(mocker):
         )
 
     er_client.get_event_types = fake_get_event_types
+    er_client.get_event_categories = mocker.AsyncMock(return_value=[])
     maps = await _fetch_event_type_maps(er_client)
     assert maps.id_by_slug == {"wildlife_sighting_rep": "v1-type-uuid"}
     assert maps.category_id_by_slug == {"wildlife": "cat-uuid-w"}
@@ -1271,7 +1614,7 @@ async def test_pull_events_falls_back_to_slug_when_event_types_unavailable(
     # The ER client raises on get_event_types but returns one titleless event
     # from get_events. The handler should swallow the first error, treat the
     # display map as empty, and fall back to the slug for the title.
-    async def boom():
+    async def boom(**kwargs):
         raise ERClientPermissionDenied(
             "ER Forbidden ON GET https://gundi-er.pamdas.org/api/v1.0/activity/events/eventtypes.",
             status_code=403,
@@ -1684,32 +2027,74 @@ def test_build_backfill_cursor_without_sources_uses_none_sentinel():
     assert cursor["sources"] == [None]
 
 
+def test_build_backfill_cursor_snapshots_known_ranges():
+    from app.actions.handlers import _build_backfill_cursor, _iter_subwindows, _unassigned_units
+    cursor = _build_backfill_cursor(
+        start="2025-01-01T00:00:00+00:00",
+        end="2025-01-04T00:00:00+00:00",
+        subwindow_days=1,
+        source_ids={"src-a", "src-b"},
+        source_ranges={
+            "src-a": [["2025-01-02T00:00:00+00:00", "2025-01-03T00:00:00+00:00"]],
+            "src-b": None,
+        },
+    )
+    # Unknown ranges aren't stored: that source is pulled in every window.
+    assert cursor["ranges"] == {"src-a": [["2025-01-02T00:00:00+00:00", "2025-01-03T00:00:00+00:00"]]}
+    subwindows = _iter_subwindows(cursor["start"], cursor["end"], cursor["subwindow_days"])
+    # src-a is unit 0, 2, 4 (windows 0, 1, 2); only window 1 overlaps its [lower, upper).
+    assert _unassigned_units(cursor, subwindows) == {0, 4}
+
+
 @pytest.mark.asyncio
 async def test_save_backfill_cursor_preserves_last_execution(mocker):
     from app.actions.handlers import _save_backfill_cursor
-    sm = mocker.patch("app.actions.handlers.state_manager")
-    sm.set_state.return_value = async_return_local(None)
+    from app.services.state import StateWriteBuffer
+    sm = mocker.MagicMock()
+    sm.set_states.return_value = async_return_local(None)
+    state_buffer = StateWriteBuffer(sm, integration_id="int-1", action_id="pull_observations")
     cursor = {"window_index": 1, "source_index": 0}
-    await _save_backfill_cursor("int-1", last_execution="2023-01-01T00:00:00+00:00", cursor=cursor)
-    saved = sm.set_state.call_args.kwargs["state"]
+    _save_backfill_cursor(state_buffer, last_execution="2023-01-01T00:00:00+00:00", cursor=cursor)
+    # Buffered: nothing is written until the flush.
+    sm.set_states.assert_not_called()
+    await state_buffer.flush()
+    saved = sm.set_states.call_args.kwargs["states"]["no-source"]
     assert saved == {"last_execution": "2023-01-01T00:00:00+00:00", "backfill": cursor}
 
 
 @pytest.mark.asyncio
 async def test_save_backfill_cursor_omits_absent_last_execution(mocker):
     from app.actions.handlers import _save_backfill_cursor
-    sm = mocker.patch("app.actions.handlers.state_manager")
-    sm.set_state.return_value = async_return_local(None)
+    from app.services.state import StateWriteBuffer
+    sm = mocker.MagicMock()
+    sm.set_states.return_value = async_return_local(None)
+    state_buffer = StateWriteBuffer(sm, integration_id="int-1", action_id="pull_observations")
     cursor = {"window_index": 0, "source_index": 0}
-    await _save_backfill_cursor("int-1", last_execution=None, cursor=cursor)
-    saved = sm.set_state.call_args.kwargs["state"]
-    assert saved == {"backfill": cursor}
+    _save_backfill_cursor(state_buffer, last_execution=None, cursor=cursor)
+    # The cursor is snapshotted: later in-place progress doesn't leak into it.
+    cursor["source_index"] = 1
+    await state_buffer.flush()
+    saved = sm.set_states.call_args.kwargs["states"]["no-source"]
+    assert saved == {"backfill": {"window_index": 0, "source_index": 0}}
     assert "last_execution" not in saved
 
 
+async def _drain_source_window(er_client, source, start, end, **kwargs):
+    """Run _pull_source_window with its own batcher and wait until everything it read was sent."""
+    from app.actions.handlers import _new_observation_batcher, _pull_source_window
+    batcher = _new_observation_batcher("int-1")
+    try:
+        count, receipt = await _pull_source_window(er_client, source, start, end, batcher=batcher, **kwargs)
+        await batcher.flush()
+        await receipt
+    finally:
+        await batcher.close()
+    return count
+
+
 @pytest.mark.asyncio
 async def test_pull_source_window_passes_source_and_window_to_er(mocker):
-    from app.actions.handlers import _pull_source_window, BATCH_SIZE
+    from app.actions.handlers import BATCH_SIZE
     from app.actions.tests.conftest import AsyncIterator
 
     er_client = mocker.MagicMock()
@@ -1719,9 +2104,8 @@ async def test_pull_source_window_passes_source_and_window_to_er(mocker):
     sent = mocker.patch("app.actions.handlers.send_observations_to_gundi")
     sent.return_value = async_return_local(None)
 
-    count = await _pull_source_window(
-        er_client, "src-1", "2025-01-01T00:00:00+00:00",
-        "2025-01-02T00:00:00+00:00", integration_id="int-1",
+    count = await _drain_source_window(
+        er_client, "src-1", "2025-01-01T00:00:00+00:00", "2025-01-02T00:00:00+00:00",
     )
 
     assert count == 1
@@ -1734,7 +2118,6 @@ async def test_pull_source_window_passes_source_and_window_to_er(mocker):
 
 @pytest.mark.asyncio
 async def test_pull_source_window_none_source_sends_no_source_id(mocker):
-    from app.actions.handlers import _pull_source_window
     from app.actions.tests.conftest import AsyncIterator
 
     er_client = mocker.MagicMock()
@@ -1744,14 +2127,114 @@ async def test_pull_source_window_none_source_sends_no_source_id(mocker):
     sent = mocker.patch("app.actions.handlers.send_observations_to_gundi")
     sent.return_value = async_return_local(None)
 
-    await _pull_source_window(
-        er_client, None, "2025-01-01T00:00:00+00:00",
-        "2025-01-02T00:00:00+00:00", integration_id="int-1",
+    await _drain_source_window(
+        er_client, None, "2025-01-01T00:00:00+00:00", "2025-01-02T00:00:00+00:00",
     )
 
     assert "source_id" not in er_client.get_observations.call_args.kwargs
 
 
+@pytest.mark.asyncio
+async def test_pull_source_window_fetches_next_page_while_sending(mocker):
+    """ER reads and Gundi sends overlap: the next page is fetched while the
+    previous batch is still being sent, and every observation is sent once."""
+    mocker.patch("app.actions.handlers.settings.OBSERVATION_BATCH_MAX_RECORDS", 1)
+    log = []
+
+    async def get_observations(**kwargs):
+        for page in range(3):
+            log.append(f"fetch {page}")
+            yield [{"id": f"o{page}", "source": "src-1", "recorded_at": "2025-01-01T00:00:00Z"}]
+
+    async def send(observations, integration_id):
+        log.append("send start")
+        for _ in range(5):
+            await _asyncio.sleep(0)
+        log.append("send end")
+
+    er_client = mocker.MagicMock()
+    er_client.get_observations = get_observations
+    sent = mocker.patch("app.actions.handlers.send_observations_to_gundi", side_effect=send)
+
+    count = await _drain_source_window(
+        er_client, "src-1", "2025-01-01T00:00:00+00:00", "2025-01-02T00:00:00+00:00",
+    )
+
+    assert count == 3
+    assert sent.call_count == 3
+    assert log.index("fetch 1") < log.index("send end")
+
+
+@pytest.mark.asyncio
+async def test_pull_source_window_merges_pages_into_one_batch(mocker):
+    """Small ER pages are accumulated into a single sensors-API request."""
+    async def get_observations(**kwargs):
+        for page in range(5):
+            yield [{"id": f"o{page}-{i}", "source": "src-1", "recorded_at": "2025-01-01T00:00:00Z"} for i in range(3)]
+
+    er_client = mocker.MagicMock()
+    er_client.get_observations = get_observations
+    sent = mocker.patch("app.actions.handlers.send_observations_to_gundi")
+    sent.return_value = async_return_local(None)
+
+    count = await _drain_source_window(
+        er_client, "src-1", "2025-01-01T00:00:00+00:00", "2025-01-02T00:00:00+00:00",
+    )
+
+    assert count == 15
+    assert sent.call_count == 1
+    assert len(sent.call_args.kwargs["observations"]) == 15
+
+
+@pytest.mark.asyncio
+async def test_pull_source_window_send_failure_fails_the_receipt(mocker):
+    """A failing Gundi send surfaces through the unit's receipt, so the unit
+    isn't recorded as done."""
+    mocker.patch("app.actions.handlers.settings.OBSERVATION_BATCH_MAX_RECORDS", 1)
+
+    async def get_observations(**kwargs):
+        for page in range(3):
+            yield [{"id": f"o{page}", "source": "src-1", "recorded_at": "2025-01-01T00:00:00Z"}]
+
+    er_client = mocker.MagicMock()
+    er_client.get_observations = get_observations
+    mocker.patch(
+        "app.actions.handlers.send_observations_to_gundi",
+        side_effect=RuntimeError("Gundi down"),
+    )
+
+    with pytest.raises(RuntimeError, match="Gundi down"):
+        await _drain_source_window(
+            er_client, "src-1", "2025-01-01T00:00:00+00:00", "2025-01-02T00:00:00+00:00",
+        )
+
+
+@pytest.mark.asyncio
+async def test_pull_source_window_keeps_undeliverable_batch_in_outbox(mocker, gundi_outbox):
+    """A send that keeps failing with a transient error doesn't fail the unit:
+    the batch goes to the outbox and is delivered from there later."""
+    from app.services.outbox import drain_outbox
+    from app.actions.tests.conftest import AsyncIterator
+    er_client = mocker.MagicMock()
+    er_client.get_observations.return_value = AsyncIterator([
+        [{"id": "o1", "source": "src-1", "recorded_at": "2025-01-01T00:00:00Z"}],
+    ])
+    send = mocker.patch(
+        "app.actions.handlers.send_observations_to_gundi",
+        side_effect=[httpx.ConnectError("Gundi down"), {}],
+    )
+
+    count = await _drain_source_window(
+        er_client, "src-1", "2025-01-01T00:00:00+00:00", "2025-01-02T00:00:00+00:00",
+    )
+
+    assert count == 1
+    assert await gundi_outbox.depth("int-1") == 1
+    assert await drain_outbox() == 1
+    assert await gundi_outbox.depth("int-1") == 0
+    assert send.call_args_list[0].kwargs == send.call_args_list[1].kwargs
+
+
 @pytest.mark.asyncio
 async def test_pull_observations_resumes_from_existing_cursor(
         mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
@@ -1797,44 +2280,42 @@ async def test_pull_observations_resumes_from_existing_cursor(
     assert response["status"] == "complete"
     # Resumed run never resolves sources from groups.
     mock_erclient_class.return_value.get_subjectgroups.assert_not_called()
-    # Final set_state advances the watermark to the window end.
-    final = mock_state_manager.set_state.call_args.kwargs["state"]
+    # The final flush advances the watermark to the window end.
+    final = mock_state_manager.set_states.call_args.kwargs["states"]["no-source"]
     assert final == {"last_execution": "2025-01-02T00:00:00+00:00"}
 
 
 @pytest.mark.asyncio
-async def test_pull_observations_yields_in_progress_when_budget_exceeded(
+async def test_pull_observations_runs_units_in_parallel(
         mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
         mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
         mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
 ):
-    """When the soft budget is already spent at the first unit, the run commits a
-    cursor and returns in_progress without fetching observations."""
+    """max_parallel_units bounds how many (source × sub-window) units run at once;
+    every unit still runs exactly once and the run completes."""
+    pull_obs_data = er_integration_v2_provider.get_action_config("pull_observations").data
+    pull_obs_data["max_parallel_units"] = 2
     cursor = {
-        "start": "2025-01-01T00:00:00+00:00",
-        "end": "2025-01-05T00:00:00+00:00",
-        "subwindow_days": 1,
-        "sources": ["src-a"],
-        "window_index": 0,
-        "source_index": 0,
-        "no_progress_count": 0,
+        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-03T00:00:00+00:00",
+        "subwindow_days": 1, "sources": ["src-a", "src-b", "src-c"],
+        "window_index": 0, "source_index": 0, "no_progress_count": 0,
     }
     mock_state_manager.get_state.return_value = async_return_local({
-        "last_execution": "2024-12-01T00:00:00+00:00",
-        "backfill": cursor,
+        "last_execution": "2024-12-01T00:00:00+00:00", "backfill": cursor,
     })
-    # Force "budget exceeded" at the first unit. Each call advances the clock by
-    # a full budget's worth, so whichever call the handler treats as
-    # start_monotonic, the very next budget check already exceeds the budget.
-    # A function (not a fixed-length list) avoids StopIteration if unrelated
-    # library code also calls time.monotonic during the run.
-    _mono = {"n": 0}
+    in_flight = {"now": 0, "max": 0}
+    units = []
 
-    def fake_monotonic():
-        _mono["n"] += 1
-        return _mono["n"] * 10 ** 9
+    async def get_observations(**kwargs):
+        units.append((kwargs["source_id"], kwargs["start"]))
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        for _ in range(3):
+            await _asyncio.sleep(0)
+        in_flight["now"] -= 1
+        yield [{"id": "o1", "source": kwargs["source_id"], "recorded_at": kwargs["start"]}]
 
-    mocker.patch("app.actions.handlers.time.monotonic", side_effect=fake_monotonic)
+    mock_erclient_class.return_value.get_observations = get_observations
 
     mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
@@ -1851,23 +2332,44 @@ async def test_pull_observations_yields_in_progress_when_budget_exceeded(
         action_id="pull_observations",
     )
 
-    assert response["status"] == "in_progress"
-    assert response["window_index"] == 0 and response["source_index"] == 0
-    mock_erclient_class.return_value.get_observations.assert_not_called()
-    # Cursor was persisted (set_state called with a "backfill" key).
-    saved = mock_state_manager.set_state.call_args.kwargs["state"]
-    assert "backfill" in saved
+    assert response["status"] == "complete"
+    assert response["observations_extracted"] == 6
+    assert in_flight["max"] == 2
+    assert len(units) == len(set(units)) == 6
+    final = mock_state_manager.set_states.call_args.kwargs["states"]["no-source"]
+    assert final == {"last_execution": "2025-01-03T00:00:00+00:00"}
 
 
 @pytest.mark.asyncio
-async def test_pull_observations_skips_when_lease_held(
+async def test_pull_observations_waits_for_cancelled_units_on_timeout(
         mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
         mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
         mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
 ):
-    """An overlapping invocation (lease already held) is a clean no-op: no cursor
-    read, no ER calls."""
-    mock_state_manager.set_if_absent.return_value = async_return_local(False)
+    """When the run is cancelled (hard timeout), the units still reading are
+    cancelled too and have finished unwinding by the time the run ends."""
+    pull_obs_data = er_integration_v2_provider.get_action_config("pull_observations").data
+    pull_obs_data["max_parallel_units"] = 2
+    cursor = {
+        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-02T00:00:00+00:00",
+        "subwindow_days": 1, "sources": ["src-a", "src-b"],
+        "window_index": 0, "source_index": 0, "no_progress_count": 0,
+    }
+    mock_state_manager.get_state.return_value = async_return_local({
+        "last_execution": "2024-12-01T00:00:00+00:00", "backfill": cursor,
+    })
+    unwound = []
+
+    async def get_observations(**kwargs):
+        try:
+            await _asyncio.Event().wait()
+        finally:
+            for _ in range(10):  # Cleanup taking a while
+                await _asyncio.sleep(0)
+            unwound.append(kwargs["source_id"])
+        yield []
+
+    mock_erclient_class.return_value.get_observations = get_observations
 
     mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
@@ -1879,48 +2381,40 @@ async def test_pull_observations_skips_when_lease_held(
     mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
     mocker.patch("app.services.gundi._get_gundi_api_key", mock_get_gundi_api_key)
 
-    response = await execute_action(
-        integration_id=str(er_integration_v2_provider.id),
-        action_id="pull_observations",
-    )
+    from app.actions.handlers import action_pull_observations
+    with pytest.raises(_asyncio.TimeoutError):
+        await _asyncio.wait_for(
+            action_pull_observations(
+                er_integration_v2_provider,
+                PullObservationsConfig.parse_obj(pull_obs_data),
+            ),
+            timeout=0.1,
+        )
 
-    assert response == {"skipped": True, "reason": "backfill_in_progress"}
-    mock_erclient_class.return_value.get_observations.assert_not_called()
-    mock_state_manager.get_state.assert_not_called()
+    assert sorted(unwound) == ["src-a", "src-b"]
 
 
 @pytest.mark.asyncio
-async def test_pull_observations_self_retriggers_when_enabled(
+async def test_pull_observations_resume_skips_units_completed_out_of_order(
         mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
         mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
         mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
 ):
-    """With continue_immediately on, an in_progress run re-triggers the next chunk."""
-    pull_obs_data = er_integration_v2_provider.get_action_config("pull_observations").data
-    pull_obs_data["continue_immediately"] = True
-
+    """Units recorded in done_units (completed beyond the cursor's frontier by a
+    parallel run that was interrupted) are not pulled again."""
     cursor = {
-        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-05T00:00:00+00:00",
-        "subwindow_days": 1, "sources": ["src-a"],
-        "window_index": 0, "source_index": 0, "no_progress_count": 0,
+        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-03T00:00:00+00:00",
+        "subwindow_days": 1, "sources": ["src-a", "src-b"],
+        # Frontier at unit 1 (window 0, src-b); unit 2 (window 1, src-a) already done.
+        "window_index": 0, "source_index": 1, "done_units": [2], "no_progress_count": 0,
     }
     mock_state_manager.get_state.return_value = async_return_local({
         "last_execution": "2024-12-01T00:00:00+00:00", "backfill": cursor,
     })
-    # time.monotonic is shared with action_runner, so the absolute call count
-    # before the handler's start_monotonic is irrelevant: advance 300s per call.
-    # start -> first budget check is +300s (< 432 budget, one unit runs), the
-    # next check is +600s (> budget) so the run yields in_progress.
-    mocker.patch(
-        "app.actions.handlers.time.monotonic",
-        side_effect=lambda *a, _n=[0]: (_n.__setitem__(0, _n[0] + 1) or _n[0] * 300.0),
-    )
     from app.actions.tests.conftest import AsyncIterator
     mock_erclient_class.return_value.get_observations.side_effect = (
-        lambda **kw: AsyncIterator([[{"id": "o1", "source": "src-a", "recorded_at": "2025-01-01T01:00:00Z"}]])
+        lambda **kw: AsyncIterator([[{"id": "o1", "source": kw["source_id"], "recorded_at": kw["start"]}]])
     )
-    mock_trigger = mocker.patch("app.actions.handlers.trigger_action")
-    mock_trigger.return_value = async_return_local(None)
 
     mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
@@ -1937,34 +2431,37 @@ async def test_pull_observations_self_retriggers_when_enabled(
         action_id="pull_observations",
     )
 
-    assert response["status"] == "in_progress"
-    mock_trigger.assert_called_once_with(str(er_integration_v2_provider.id), "pull_observations")
+    assert response["status"] == "complete"
+    pulled = [
+        (c.kwargs["source_id"], c.kwargs["start"])
+        for c in mock_erclient_class.return_value.get_observations.call_args_list
+    ]
+    assert pulled == [
+        ("src-b", "2025-01-01T00:00:00+00:00"),
+        ("src-b", "2025-01-02T00:00:00+00:00"),
+    ]
 
 
 @pytest.mark.asyncio
-async def test_pull_observations_self_retrigger_stops_after_no_progress_limit(
+async def test_pull_observations_batches_observations_across_sources(
         mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
         mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
         mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
 ):
-    """If consecutive runs make zero progress, self-re-trigger stops (runaway guard)."""
-    pull_obs_data = er_integration_v2_provider.get_action_config("pull_observations").data
-    pull_obs_data["continue_immediately"] = True
-
-    from app.actions.handlers import MAX_NO_PROGRESS_RETRIES
+    """Observations of several units go out in one sensors-API request, and a
+    unit whose batch fails to send is not counted as extracted."""
     cursor = {
-        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-05T00:00:00+00:00",
-        "subwindow_days": 1, "sources": ["src-a"],
-        "window_index": 0, "source_index": 0,
-        "no_progress_count": MAX_NO_PROGRESS_RETRIES - 1,  # one short of the limit
+        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-02T00:00:00+00:00",
+        "subwindow_days": 1, "sources": ["src-a", "src-b", "src-c"],
+        "window_index": 0, "source_index": 0, "no_progress_count": 0,
     }
     mock_state_manager.get_state.return_value = async_return_local({
         "last_execution": "2024-12-01T00:00:00+00:00", "backfill": cursor,
     })
-    # Budget exceeded immediately (no unit completes → no_progress_count increments to the limit).
-    mocker.patch("app.actions.handlers.time.monotonic", side_effect=lambda *a, _n=[0]: (_n.__setitem__(0, _n[0] + 1) or _n[0] * 10**9))
-    mock_trigger = mocker.patch("app.actions.handlers.trigger_action")
-    mock_trigger.return_value = async_return_local(None)
+    from app.actions.tests.conftest import AsyncIterator
+    mock_erclient_class.return_value.get_observations.side_effect = (
+        lambda **kw: AsyncIterator([[{"id": "o1", "source": kw["source_id"], "recorded_at": kw["start"]}]])
+    )
 
     mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
@@ -1981,9 +2478,247 @@ async def test_pull_observations_self_retrigger_stops_after_no_progress_limit(
         action_id="pull_observations",
     )
 
-    assert response["status"] == "in_progress"
-    mock_trigger.assert_not_called()
-
+    assert response["status"] == "complete"
+    assert response["observations_extracted"] == 3
+    post_observations = mock_gundi_sensors_client_class.return_value.post_observations
+    assert post_observations.call_count == 1
+    assert [o["additional"]["er_source_id"] for o in post_observations.call_args.kwargs["data"]] == [
+        "src-a", "src-b", "src-c",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pull_observations_skips_units_outside_assigned_ranges(
+        mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
+        mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
+        mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
+):
+    """A collar is only pulled in the windows where it was assigned to one of
+    the selected subjects; the other units cost no ER request."""
+    cursor = {
+        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-04T00:00:00+00:00",
+        "subwindow_days": 1, "sources": ["src-a", "src-b"],
+        "ranges": {"src-a": [["2025-01-02T12:00:00Z", None]]},
+        "window_index": 0, "source_index": 0, "no_progress_count": 0,
+    }
+    mock_state_manager.get_state.return_value = async_return_local({
+        "last_execution": "2024-12-01T00:00:00+00:00", "backfill": cursor,
+    })
+    from app.actions.tests.conftest import AsyncIterator
+    mock_erclient_class.return_value.get_observations.side_effect = (
+        lambda **kw: AsyncIterator([[{"id": "o1", "source": kw["source_id"], "recorded_at": kw["start"]}]])
+    )
+
+    mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.config_manager", mock_config_manager_er_provider)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.services.gundi.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    mocker.patch("app.services.gundi._get_gundi_api_key", mock_get_gundi_api_key)
+
+    response = await execute_action(
+        integration_id=str(er_integration_v2_provider.id),
+        action_id="pull_observations",
+    )
+
+    assert response["status"] == "complete"
+    pulled = [
+        (c.kwargs["source_id"], c.kwargs["start"])
+        for c in mock_erclient_class.return_value.get_observations.call_args_list
+    ]
+    # src-a was assigned from mid-window 1 on, src-b has no known ranges.
+    assert pulled == [
+        ("src-b", "2025-01-01T00:00:00+00:00"),
+        ("src-a", "2025-01-02T00:00:00+00:00"),
+        ("src-b", "2025-01-02T00:00:00+00:00"),
+        ("src-a", "2025-01-03T00:00:00+00:00"),
+        ("src-b", "2025-01-03T00:00:00+00:00"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pull_observations_yields_in_progress_when_budget_exceeded(
+        mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
+        mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
+        mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
+):
+    """When the soft budget is already spent at the first unit, the run commits a
+    cursor and returns in_progress without fetching observations."""
+    cursor = {
+        "start": "2025-01-01T00:00:00+00:00",
+        "end": "2025-01-05T00:00:00+00:00",
+        "subwindow_days": 1,
+        "sources": ["src-a"],
+        "window_index": 0,
+        "source_index": 0,
+        "no_progress_count": 0,
+    }
+    mock_state_manager.get_state.return_value = async_return_local({
+        "last_execution": "2024-12-01T00:00:00+00:00",
+        "backfill": cursor,
+    })
+    # Force "budget exceeded" at the first unit. Each call advances the clock by
+    # a full budget's worth, so the very next budget check after start_monotonic
+    # already exceeds the budget. Only the handlers' clock is faked; the event
+    # loop (and wait_for's hard timeout) keeps the real one.
+    _mono = {"n": 0}
+
+    def fake_monotonic():
+        _mono["n"] += 1
+        return _mono["n"] * 10 ** 9
+
+    mocker.patch("app.actions.handlers.time", monotonic=mocker.Mock(side_effect=fake_monotonic))
+
+    mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.config_manager", mock_config_manager_er_provider)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.services.gundi.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    mocker.patch("app.services.gundi._get_gundi_api_key", mock_get_gundi_api_key)
+
+    response = await execute_action(
+        integration_id=str(er_integration_v2_provider.id),
+        action_id="pull_observations",
+    )
+
+    assert response["status"] == "in_progress"
+    assert response["window_index"] == 0 and response["source_index"] == 0
+    mock_erclient_class.return_value.get_observations.assert_not_called()
+    # Cursor was persisted (flushed with a "backfill" key).
+    saved = mock_state_manager.set_states.call_args.kwargs["states"]["no-source"]
+    assert "backfill" in saved
+
+
+@pytest.mark.asyncio
+async def test_pull_observations_skips_when_lease_held(
+        mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
+        mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
+        mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
+):
+    """An overlapping invocation (lease already held) is a clean no-op: no cursor
+    read, no ER calls."""
+    mock_state_manager.set_if_absent.return_value = async_return_local(False)
+
+    mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.config_manager", mock_config_manager_er_provider)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.services.gundi.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    mocker.patch("app.services.gundi._get_gundi_api_key", mock_get_gundi_api_key)
+
+    response = await execute_action(
+        integration_id=str(er_integration_v2_provider.id),
+        action_id="pull_observations",
+    )
+
+    assert response == {"skipped": True, "reason": "backfill_in_progress"}
+    mock_erclient_class.return_value.get_observations.assert_not_called()
+    mock_state_manager.get_state.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pull_observations_self_retriggers_when_enabled(
+        mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
+        mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
+        mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
+):
+    """With continue_immediately on, an in_progress run re-triggers the next chunk."""
+    pull_obs_data = er_integration_v2_provider.get_action_config("pull_observations").data
+    pull_obs_data["continue_immediately"] = True
+
+    cursor = {
+        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-05T00:00:00+00:00",
+        "subwindow_days": 1, "sources": ["src-a"],
+        "window_index": 0, "source_index": 0, "no_progress_count": 0,
+    }
+    mock_state_manager.get_state.return_value = async_return_local({
+        "last_execution": "2024-12-01T00:00:00+00:00", "backfill": cursor,
+    })
+    # The handlers' clock advances 300s per call (the event loop keeps the real
+    # one). start -> first budget check is +300s (< 432 budget, one unit runs), the
+    # next check is +600s (> budget) so the run yields in_progress.
+    mocker.patch(
+        "app.actions.handlers.time",
+        monotonic=mocker.Mock(side_effect=lambda *a, _n=[0]: (_n.__setitem__(0, _n[0] + 1) or _n[0] * 300.0)),
+    )
+    from app.actions.tests.conftest import AsyncIterator
+    mock_erclient_class.return_value.get_observations.side_effect = (
+        lambda **kw: AsyncIterator([[{"id": "o1", "source": "src-a", "recorded_at": "2025-01-01T01:00:00Z"}]])
+    )
+    mock_trigger = mocker.patch("app.actions.handlers.trigger_action")
+    mock_trigger.return_value = async_return_local(None)
+
+    mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.config_manager", mock_config_manager_er_provider)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.services.gundi.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    mocker.patch("app.services.gundi._get_gundi_api_key", mock_get_gundi_api_key)
+
+    response = await execute_action(
+        integration_id=str(er_integration_v2_provider.id),
+        action_id="pull_observations",
+    )
+
+    assert response["status"] == "in_progress"
+    mock_trigger.assert_called_once_with(str(er_integration_v2_provider.id), "pull_observations")
+
+
+@pytest.mark.asyncio
+async def test_pull_observations_self_retrigger_stops_after_no_progress_limit(
+        mocker, mock_gundi_client_v2, mock_state_manager, mock_erclient_class,
+        mock_get_gundi_api_key, mock_gundi_sensors_client_class, er_integration_v2_provider,
+        mock_publish_event, mock_gundi_client_v2_class, mock_config_manager_er_provider
+):
+    """If consecutive runs make zero progress, self-re-trigger stops (runaway guard)."""
+    pull_obs_data = er_integration_v2_provider.get_action_config("pull_observations").data
+    pull_obs_data["continue_immediately"] = True
+
+    from app.actions.handlers import MAX_NO_PROGRESS_RETRIES
+    cursor = {
+        "start": "2025-01-01T00:00:00+00:00", "end": "2025-01-05T00:00:00+00:00",
+        "subwindow_days": 1, "sources": ["src-a"],
+        "window_index": 0, "source_index": 0,
+        "no_progress_count": MAX_NO_PROGRESS_RETRIES - 1,  # one short of the limit
+    }
+    mock_state_manager.get_state.return_value = async_return_local({
+        "last_execution": "2024-12-01T00:00:00+00:00", "backfill": cursor,
+    })
+    # Budget exceeded immediately (no unit completes → no_progress_count increments to the limit).
+    mocker.patch("app.actions.handlers.time", monotonic=mocker.Mock(side_effect=lambda *a, _n=[0]: (_n.__setitem__(0, _n[0] + 1) or _n[0] * 10**9)))
+    mock_trigger = mocker.patch("app.actions.handlers.trigger_action")
+    mock_trigger.return_value = async_return_local(None)
+
+    mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.config_manager", mock_config_manager_er_provider)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.services.gundi.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    mocker.patch("app.services.gundi._get_gundi_api_key", mock_get_gundi_api_key)
+
+    response = await execute_action(
+        integration_id=str(er_integration_v2_provider.id),
+        action_id="pull_observations",
+    )
+
+    assert response["status"] == "in_progress"
+    mock_trigger.assert_not_called()
+
 
 @pytest.mark.asyncio
 async def test_pull_observations_retrigger_failure_is_non_fatal(
@@ -2004,8 +2739,8 @@ async def test_pull_observations_retrigger_failure_is_non_fatal(
     mock_state_manager.get_state.return_value = async_return_local({
         "last_execution": "2024-12-01T00:00:00+00:00", "backfill": cursor,
     })
-    mocker.patch("app.actions.handlers.time.monotonic",
-                 side_effect=lambda *a, _n=[0]: (_n.__setitem__(0, _n[0] + 1) or _n[0] * 300.0))
+    mocker.patch("app.actions.handlers.time",
+                 monotonic=mocker.Mock(side_effect=lambda *a, _n=[0]: (_n.__setitem__(0, _n[0] + 1) or _n[0] * 300.0)))
     from app.actions.tests.conftest import AsyncIterator
     mock_erclient_class.return_value.get_observations.side_effect = (
         lambda **kw: AsyncIterator([[{"id": "o1", "source": "src-a", "recorded_at": "2025-01-01T01:00:00Z"}]])
@@ -2079,7 +2814,7 @@ async def test_pull_observations_unit_failure_is_logged_and_skipped(
     assert response["units_failed"] == 1
     assert response["observations_extracted"] == 1  # src-ok still forwarded
     # Watermark advanced to the window end despite the failed unit.
-    final = mock_state_manager.set_state.call_args.kwargs["state"]
+    final = mock_state_manager.set_states.call_args.kwargs["states"]["no-source"]
     assert final == {"last_execution": "2025-01-02T00:00:00+00:00"}
     # A partial-completion activity-log warning was emitted.
     titles = [c.kwargs.get("title", "") for c in mock_log_activity.call_args_list]
@@ -2102,6 +2837,9 @@ async def test_pull_observations_resume_round_trip_completes(
             return self.store.get((integration_id, action_id, source_id), {})
         async def set_state(self, integration_id, action_id, state, source_id="no-source"):
             self.store[(integration_id, action_id, source_id)] = state
+        async def set_states(self, integration_id, action_id, states):
+            for source_id, state in states.items():
+                self.store[(integration_id, action_id, source_id)] = state
         async def set_if_absent(self, integration_id, action_id, *, ttl_seconds, source_id="no-source"):
             return True
         async def delete_state(self, integration_id, action_id, source_id="no-source"):
@@ -2127,7 +2865,7 @@ async def test_pull_observations_resume_round_trip_completes(
     def fake_monotonic(*a):
         clock["t"] += 200.0
         return clock["t"]
-    mocker.patch("app.actions.handlers.time.monotonic", side_effect=fake_monotonic)
+    mocker.patch("app.actions.handlers.time", monotonic=mocker.Mock(side_effect=fake_monotonic))
 
     mocker.patch("app.services.action_runner._portal", mock_gundi_client_v2)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
@@ -2146,9 +2884,8 @@ async def test_pull_observations_resume_round_trip_completes(
     assert r1["status"] == "in_progress"
     assert ("backfill" in fake_sm.store.get((integration_id, "pull_observations", "no-source"), {}))
     assert r1["units_failed"] == 0
-    # Invocation 1 must have made progress but not finished all 3 windows — the
-    # exact yield index depends on incidental time.monotonic() calls (event loop,
-    # wait_for), so assert the robust invariant rather than a brittle exact index.
+    # Invocation 1 must have made progress but not finished all 3 windows —
+    # assert the robust invariant rather than a brittle exact yield index.
     assert 0 <= r1["window_index"] < 3
 
     # Keep resuming until complete (bounded loop so a bug can't hang the test).
@@ -2291,7 +3028,7 @@ async def test_pull_events_forwards_files_when_flag_enabled(
     mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
     mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
     # Never-seen event → new-event path.
-    mock_state_manager.get_state.return_value = async_return({})
+    mock_state_manager.get_states.return_value = async_return({})
 
     # One event carrying one file.
     file_response = mocker.MagicMock()
@@ -2331,9 +3068,384 @@ async def test_pull_events_forwards_files_when_flag_enabled(
     assert send_attachments_mock.await_args.kwargs["attachments"] == [("photo.jpg", b"jpegbytes")]
     assert result["attachments_forwarded"] == 1
     # seen_file_ids persisted so the file isn't re-sent next run.
-    saved_states = [c.kwargs for c in mock_state_manager.set_state.call_args_list]
-    per_event_state = next(s for s in saved_states if s.get("source_id") == "er-uuid-1")
-    assert per_event_state["state"]["seen_file_ids"] == ["f-1"]
+    per_event_state = mock_state_manager.set_states.call_args_list[0].kwargs["states"]["er-uuid-1"]
+    assert per_event_state["seen_file_ids"] == ["f-1"]
+
+
+@pytest.mark.asyncio
+async def test_pull_events_persists_forwarded_updates_when_page_fails(
+    mocker,
+    mock_erclient_class,
+    mock_state_manager,
+    mock_publish_event,
+    er_integration_v2_provider,
+):
+    """State recorded for updates already sent is flushed even if a later call in
+    the same page fails, so those updates aren't emitted again next run."""
+    from app.actions.handlers import action_pull_events
+    from app.actions.configurations import PullEventsConfig
+    from app.actions.tests.conftest import AsyncIterator
+
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mock_state_manager.get_states.return_value = async_return({
+        "er-uuid-seen": {
+            "gundi_object_id": "gundi-obj-1",
+            "updated_at": "2026-07-29T00:00:00Z",
+            "title": "Old title",
+            "seen_note_ids": [],
+        },
+    })
+    erclient_instance = mock_erclient_class.return_value.__aenter__.return_value
+    erclient_instance.get_events.return_value = AsyncIterator([[
+        {"id": "er-uuid-seen", "updated_at": "2026-07-30T00:00:00Z", "title": "New title"},
+        {"id": "er-uuid-new", "updated_at": "2026-07-30T00:00:00Z", "title": "Fresh"},
+    ]])
+    update_mock = mocker.patch("app.actions.handlers.update_event_in_gundi", mocker.AsyncMock())
+    mocker.patch(
+        "app.actions.handlers.send_events_to_gundi",
+        mocker.AsyncMock(side_effect=RuntimeError("sensors API down")),
+    )
+
+    config = PullEventsConfig(start_datetime="2026-01-01T00:00:00Z")
+    with pytest.raises(RuntimeError):
+        await action_pull_events(er_integration_v2_provider, config)
+
+    update_mock.assert_awaited_once()
+    flushed = mock_state_manager.set_states.call_args.kwargs["states"]
+    assert flushed["er-uuid-seen"]["title"] == "New title"
+    assert "er-uuid-new" not in flushed
+    assert "no-source" not in flushed  # Neither checkpoint nor watermark advanced
+
+
+@pytest.mark.asyncio
+async def test_pull_events_watermark_stays_at_events_waiting_in_the_outbox(
+    mocker,
+    mock_erclient_class,
+    mock_state_manager,
+    mock_publish_event,
+    er_integration_v2_provider,
+    gundi_outbox,
+):
+    """The outbox is local to the instance: the watermark doesn't move past an
+    event kept there, so it's read again if the outbox is lost."""
+    from app.actions.handlers import action_pull_events
+    from app.actions.configurations import PullEventsConfig
+    from app.actions.tests.conftest import AsyncIterator
+
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mock_state_manager.get_states.return_value = async_return({})
+    erclient_instance = mock_erclient_class.return_value.__aenter__.return_value
+    erclient_instance.get_events.return_value = AsyncIterator([[
+        {"id": "er-uuid-1", "updated_at": "2026-07-30T00:00:00Z", "title": "Kept"},
+        {"id": "er-uuid-2", "updated_at": "2026-07-31T00:00:00Z", "title": "Kept too"},
+    ]])
+    down = httpx.HTTPStatusError("503", request=httpx.Request("POST", "https://sensors/"), response=httpx.Response(503))
+    mocker.patch("app.actions.handlers.send_events_to_gundi", mocker.AsyncMock(side_effect=down))
+
+    config = PullEventsConfig(start_datetime="2026-01-01T00:00:00Z")
+    response = await action_pull_events(er_integration_v2_provider, config)
+
+    assert response["status"] == "complete" and response["outbox_depth"] == 1
+    final = mock_state_manager.set_states.call_args.kwargs["states"]["no-source"]
+    assert final == {"last_execution": "2026-07-30T00:00:00Z"}
+
+
+@pytest.mark.asyncio
+async def test_pull_events_resends_updates_whose_outbox_marker_expired(
+    mocker,
+    mock_erclient_class,
+    mock_state_manager,
+    mock_publish_event,
+    er_integration_v2_provider,
+):
+    """Updates queued in an outbox that never delivered them (e.g. it was lost)
+    are sent again once the event's marker expires, diffed against what Gundi
+    had before them."""
+    import time
+    from app.actions.handlers import action_pull_events
+    from app.actions.configurations import PullEventsConfig
+    from app.actions.tests.conftest import AsyncIterator
+
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mock_state_manager.get_states.return_value = async_return({
+        "er-uuid-1": {
+            "gundi_object_id": "gundi-obj-1", "updated_at": "2026-07-30T00:00:00Z",
+            "state": "active", "priority": 100, "title": "New title", "seen_note_ids": [],
+            "outbox_pending_at": time.time() - 2 * 24 * 3600,
+            "outbox_base": {"state": "active", "priority": 100, "title": "Old title", "seen_note_ids": []},
+        },
+    })
+    erclient_instance = mock_erclient_class.return_value.__aenter__.return_value
+    erclient_instance.get_events.return_value = AsyncIterator([[
+        {"id": "er-uuid-1", "updated_at": "2026-07-30T00:00:00Z", "state": "active", "priority": 100,
+         "title": "New title"},
+    ]])
+    update = mocker.patch("app.actions.handlers.update_event_in_gundi", mocker.AsyncMock())
+
+    config = PullEventsConfig(start_datetime="2026-01-01T00:00:00Z")
+    response = await action_pull_events(er_integration_v2_provider, config)
+
+    assert response["updates_emitted"] == 1
+    assert update.call_args.kwargs["changes"] == {"title": "New title"}
+    recorded = mock_state_manager.set_states.call_args_list[0].kwargs["states"]["er-uuid-1"]
+    assert "outbox_pending_at" not in recorded and "outbox_base" not in recorded
+
+
+@pytest.mark.asyncio
+async def test_pull_events_failing_state_flush_does_not_mask_the_run_error(
+    mocker,
+    mock_erclient_class,
+    mock_state_manager,
+    mock_publish_event,
+    er_integration_v2_provider,
+):
+    """If saving the state also fails while a run is failing, the run's own
+    error is the one raised (the flush error is only logged)."""
+    from app.actions.handlers import action_pull_events
+    from app.actions.configurations import PullEventsConfig
+    from app.actions.tests.conftest import AsyncIterator
+
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mock_state_manager.get_states.return_value = async_return({
+        "er-uuid-seen": {
+            "gundi_object_id": "gundi-obj-1",
+            "updated_at": "2026-07-29T00:00:00Z",
+            "title": "Old title",
+            "seen_note_ids": [],
+        },
+    })
+    mock_state_manager.set_states.side_effect = ConnectionError("Redis down")
+    erclient_instance = mock_erclient_class.return_value.__aenter__.return_value
+    erclient_instance.get_events.return_value = AsyncIterator([[
+        {"id": "er-uuid-seen", "updated_at": "2026-07-30T00:00:00Z", "title": "New title"},
+        {"id": "er-uuid-new", "updated_at": "2026-07-30T00:00:00Z", "title": "Fresh"},
+    ]])
+    mocker.patch("app.actions.handlers.update_event_in_gundi", mocker.AsyncMock())
+    mocker.patch(
+        "app.actions.handlers.send_events_to_gundi",
+        mocker.AsyncMock(side_effect=RuntimeError("sensors API down")),
+    )
+
+    config = PullEventsConfig(start_datetime="2026-01-01T00:00:00Z")
+    with pytest.raises(RuntimeError, match="sensors API down"):
+        await action_pull_events(er_integration_v2_provider, config)
+
+    mock_state_manager.set_states.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_pull_events_updates_events_concurrently_keeping_per_event_order(
+    mocker,
+    mock_erclient_class,
+    mock_state_manager,
+    mock_publish_event,
+    er_integration_v2_provider,
+):
+    """Updates of different events overlap (bounded by max_concurrent_updates)
+    while each event's own updates are sent in order; counters stay exact."""
+    from app.actions.handlers import action_pull_events
+    from app.actions.configurations import PullEventsConfig
+    from app.actions.tests.conftest import AsyncIterator
+
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    event_ids = [f"er-uuid-{i}" for i in range(6)]
+    mock_state_manager.get_states.return_value = async_return({
+        event_id: {
+            "gundi_object_id": f"gundi-{event_id}",
+            "updated_at": "2026-07-29T00:00:00Z",
+            "state": "new",
+            "title": "Old title",
+            "seen_note_ids": [],
+        }
+        for event_id in event_ids
+    })
+    erclient_instance = mock_erclient_class.return_value.__aenter__.return_value
+    erclient_instance.get_events.return_value = AsyncIterator([[
+        {
+            "id": event_id,
+            "updated_at": "2026-07-30T00:00:00Z",
+            "state": "active",  # changed
+            "title": "Old title",
+            "notes": [{"id": f"note-{event_id}", "text": "seen it"}],  # new
+        }
+        for event_id in event_ids
+    ]])
+
+    in_flight = {"now": 0, "max": 0}
+    sent = []
+
+    async def fake_update(gundi_object_id, changes, integration_id):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await _asyncio.sleep(0.01)
+        sent.append((gundi_object_id, next(iter(changes))))
+        in_flight["now"] -= 1
+
+    mocker.patch("app.actions.handlers.update_event_in_gundi", side_effect=fake_update)
+
+    config = PullEventsConfig(start_datetime="2026-01-01T00:00:00Z", max_concurrent_updates=3)
+    result = await action_pull_events(er_integration_v2_provider, config)
+
+    assert 1 < in_flight["max"] <= 3
+    for event_id in event_ids:
+        # Per event: the note first, then the field change.
+        assert [field for obj, field in sent if obj == f"gundi-{event_id}"] == ["notes", "status"]
+    assert result["events_updated"] == 6
+    assert result["updates_emitted"] == 12
+    flushed = mock_state_manager.set_states.call_args_list[0].kwargs["states"]
+    assert set(flushed) - {"no-source"} == set(event_ids)
+
+
+@pytest.mark.asyncio
+async def test_pull_events_yields_on_budget_with_checkpoint_and_retriggers(
+    mocker,
+    mock_erclient_class,
+    mock_state_manager,
+    mock_publish_event,
+    er_integration_v2_provider,
+):
+    """A pull that runs out of budget checkpoints the completed pages (highest
+    updated_at plus the ids sharing it), keeps the watermark, and re-triggers."""
+    from app.actions.handlers import action_pull_events
+    from app.actions.configurations import PullEventsConfig
+    from app.actions.tests.conftest import AsyncIterator
+
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    send_events_mock = mocker.patch(
+        "app.actions.handlers.send_events_to_gundi",
+        mocker.AsyncMock(return_value=[{"object_id": "g-1"}, {"object_id": "g-2"}]),
+    )
+    # The budget runs out once the first page has been posted.
+    mocker.patch(
+        "app.actions.handlers.time",
+        monotonic=mocker.Mock(side_effect=lambda *a: 10.0 ** 9 if send_events_mock.await_count else 0.0),
+    )
+    mock_trigger = mocker.patch("app.actions.handlers.trigger_action")
+    mock_trigger.return_value = async_return_local(None)
+    erclient_instance = mock_erclient_class.return_value.__aenter__.return_value
+    erclient_instance.get_events.return_value = AsyncIterator([
+        [
+            {"id": "er-1", "updated_at": "2026-07-30T00:00:00Z", "title": "One"},
+            {"id": "er-2", "updated_at": "2026-07-30T00:00:00Z", "title": "Two"},
+        ],
+        [{"id": "er-3", "updated_at": "2026-07-31T00:00:00Z", "title": "Three"}],
+    ])
+
+    config = PullEventsConfig(start_datetime="2026-01-01T00:00:00Z", continue_immediately=True)
+    result = await action_pull_events(er_integration_v2_provider, config)
+
+    assert result["status"] == "in_progress"
+    assert result["events_extracted"] == 2
+    assert result["checkpoint"] == "2026-07-30T00:00:00Z"
+    saved = mock_state_manager.set_states.call_args.kwargs["states"]["no-source"]
+    assert saved["last_execution"] == "2023-11-17T11:20:00+0200"  # Watermark kept
+    assert saved["checkpoint"] == {
+        "filter_date_field": "updated_at",
+        "after": "2026-07-30T00:00:00Z",
+        "after_ids": ["er-1", "er-2"],
+        "no_progress_count": 0,
+    }
+    mock_trigger.assert_called_once_with(str(er_integration_v2_provider.id), "pull_events")
+
+
+@pytest.mark.asyncio
+async def test_pull_events_resumes_from_checkpoint(
+    mocker,
+    mock_erclient_class,
+    mock_state_manager,
+    mock_publish_event,
+    er_integration_v2_provider,
+):
+    """A resumed pull starts at the checkpoint, skips the events completed at
+    exactly that value, and on completion replaces the checkpoint by the watermark."""
+    from app.actions.handlers import action_pull_events
+    from app.actions.configurations import PullEventsConfig
+    from app.actions.tests.conftest import AsyncIterator
+
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    send_events_mock = mocker.patch(
+        "app.actions.handlers.send_events_to_gundi",
+        mocker.AsyncMock(return_value=[{"object_id": "g-2"}, {"object_id": "g-3"}]),
+    )
+    mock_state_manager.get_state.return_value = async_return_local({
+        "last_execution": "2026-01-01T00:00:00Z",
+        "checkpoint": {
+            "filter_date_field": "updated_at",
+            "after": "2026-07-30T00:00:00Z",
+            "after_ids": ["er-1"],
+            "no_progress_count": 0,
+        },
+    })
+    erclient_instance = mock_erclient_class.return_value.__aenter__.return_value
+    erclient_instance.get_events.return_value = AsyncIterator([[
+        {"id": "er-1", "updated_at": "2026-07-30T00:00:00Z", "title": "Done"},
+        {"id": "er-2", "updated_at": "2026-07-30T00:00:00Z", "title": "Tied, not done"},
+        {"id": "er-3", "updated_at": "2026-07-31T00:00:00Z", "title": "Later"},
+    ]])
+
+    config = PullEventsConfig(start_datetime="2025-01-01T00:00:00Z", force_run_since_start=True)
+    result = await action_pull_events(er_integration_v2_provider, config)
+
+    er_filter = json.loads(erclient_instance.get_events.call_args.kwargs["filter"])
+    assert er_filter["update_date"]["lower"] == "2026-07-30T00:00:00Z"
+    posted = send_events_mock.await_args.kwargs["events"]
+    assert [e["title"] for e in posted] == ["Tied, not done", "Later"]
+    assert result["status"] == "complete"
+    final = mock_state_manager.set_states.call_args.kwargs["states"]["no-source"]
+    assert set(final) == {"last_execution"}
+
+
+@pytest.mark.asyncio
+async def test_pull_events_skips_quietly_when_lease_held(
+    mocker,
+    mock_erclient_class,
+    mock_state_manager,
+    mock_publish_event,
+    er_integration_v2_provider,
+):
+    from app.actions.handlers import action_pull_events
+    from app.actions.configurations import PullEventsConfig
+
+    mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
+    mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
+    mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
+    mock_state_manager.set_if_absent.return_value = async_return_local(False)
+
+    config = PullEventsConfig(start_datetime="2026-01-01T00:00:00Z")
+    result = await action_pull_events(er_integration_v2_provider, config)
+
+    assert result == {"skipped": True, "reason": "pull_in_progress"}
+    assert mock_state_manager.set_if_absent.call_args.kwargs["action_id"] == "pull_events"
+    mock_state_manager.get_state.assert_not_called()
+    mock_state_manager.delete_state.assert_not_called()
+
+
+def test_advance_events_checkpoint_keeps_ids_tied_at_highest_value():
+    from app.actions.handlers import _advance_events_checkpoint
+
+    checkpoint = {"after": "2026-07-30T00:00:00+00:00", "after_ids": ["er-0"]}
+    _advance_events_checkpoint(checkpoint, [
+        {"id": "er-1", "updated_at": "2026-07-30T00:00:00Z"},  # Ties (other notation)
+        {"id": "er-2", "updated_at": "2026-07-31T02:00:00+02:00"},
+        {"id": "er-3", "updated_at": "2026-07-31T00:00:00Z"},  # Same instant as er-2
+        {"id": "er-4"},  # No value: ignored
+    ], "updated_at")
+
+    assert checkpoint == {"after": "2026-07-31T02:00:00+02:00", "after_ids": ["er-2", "er-3"]}
 
 
 @pytest.mark.asyncio
@@ -2351,7 +3463,7 @@ async def test_pull_events_ignores_files_when_flag_disabled(
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
     mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
-    mock_state_manager.get_state.return_value = async_return({})
+    mock_state_manager.get_states.return_value = async_return({})
 
     erclient_instance = mock_erclient_class.return_value.__aenter__.return_value
     erclient_instance.get_file = mocker.AsyncMock()
@@ -2400,12 +3512,14 @@ async def test_pull_events_forwards_late_added_file_on_seen_event(
     mocker.patch("app.actions.handlers.AsyncERClient", mock_erclient_class)
     mocker.patch("app.actions.handlers.state_manager", mock_state_manager)
     # Previously-seen event: f-1 already forwarded; ER shows a new f-2.
-    mock_state_manager.get_state.return_value = async_return({
-        "gundi_object_id": "gundi-obj-1",
-        "updated_at": "2026-07-29T00:00:00Z",
-        "title": "Rhino carcass",
-        "seen_note_ids": [],
-        "seen_file_ids": ["f-1"],
+    mock_state_manager.get_states.return_value = async_return({
+        "er-uuid-1": {
+            "gundi_object_id": "gundi-obj-1",
+            "updated_at": "2026-07-29T00:00:00Z",
+            "title": "Rhino carcass",
+            "seen_note_ids": [],
+            "seen_file_ids": ["f-1"],
+        },
     })
 
     file_response = mocker.MagicMock()
@@ -2441,9 +3555,8 @@ async def test_pull_events_forwards_late_added_file_on_seen_event(
     send_attachments_mock.assert_awaited_once()
     assert send_attachments_mock.await_args.kwargs["attachments"] == [("second.jpg", b"newbytes")]
     assert result["attachments_forwarded"] == 1
-    saved_states = [c.kwargs for c in mock_state_manager.set_state.call_args_list]
-    per_event_state = next(s for s in saved_states if s.get("source_id") == "er-uuid-1")
-    assert per_event_state["state"]["seen_file_ids"] == ["f-1", "f-2"]
+    per_event_state = mock_state_manager.set_states.call_args_list[0].kwargs["states"]["er-uuid-1"]
+    assert per_event_state["seen_file_ids"] == ["f-1", "f-2"]
 
 
 # ---------------------------------------------------------------------------
@@ -2528,9 +3641,9 @@ async def test_pull_source_window_enriches_via_resolver(mocker):
     resolver.resolve.return_value = ResolvedSource(
         external_source_id="SERIAL-9", source_name="Tau", subject_type="elephant")
 
-    count = await handlers._pull_source_window(
+    count = await _drain_source_window(
         er, "src-1", "2026-06-01T00:00:00+00:00", "2026-06-02T00:00:00+00:00",
-        integration_id="int-1", resolver=resolver,
+        resolver=resolver,
     )
     assert count == 1
     resolver.ensure.assert_awaited_once_with({"src-1"})    # exact source-UUID set computed correctly
@@ -0,0 +1,100 @@
+# app/actions/tests/test_observation_batcher.py
+import asyncio
+
+import pytest
+
+from app.actions.observation_batcher import ObservationBatcher
+
+
+def _batcher(sent, **limits):
+    async def send(observations):
+        sent.append(list(observations))
+
+    options = dict(max_records=1000, max_bytes=1024 * 1024, max_delay_seconds=60, max_concurrent_sends=2)
+    options.update(limits)
+    return ObservationBatcher(send, **options)
+
+
+def _observations(n, prefix="o"):
+    return [{"id": f"{prefix}{i}"} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_batcher_merges_adds_until_the_record_limit():
+    sent = []
+    batcher = _batcher(sent, max_records=5)
+    first = await batcher.add(_observations(3, "a"))
+    second = await batcher.add(_observations(3, "b"))
+    await batcher.flush()
+    await asyncio.gather(first, second)
+
+    assert [len(batch) for batch in sent] == [5, 1]
+    assert [o["id"] for o in sent[0]] == ["a0", "a1", "a2", "b0", "b1"]
+
+
+@pytest.mark.asyncio
+async def test_batcher_cuts_batches_at_the_byte_limit():
+    sent = []
+    # Each {"id": "oN"} is 13 bytes of JSON: three fit in 40 bytes, four don't.
+    batcher = _batcher(sent, max_bytes=40)
+    receipt = await batcher.add(_observations(7))
+    await batcher.flush()
+    await receipt
+
+    assert [len(batch) for batch in sent] == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_batcher_sends_a_partial_batch_after_the_delay():
+    sent = []
+    batcher = _batcher(sent, max_delay_seconds=0.01)
+    receipt = await batcher.add(_observations(2))
+
+    assert await asyncio.wait_for(receipt, timeout=1) == [2]
+    assert [len(batch) for batch in sent] == [2]
+
+
+@pytest.mark.asyncio
+async def test_batcher_receipt_waits_for_every_batch_holding_its_records():
+    release = asyncio.Event()
+    sent = []
+
+    async def send(observations):
+        if observations[0]["id"] == "o0":
+            await release.wait()  # The first batch is slow
+        sent.append(observations[0]["id"])
+
+    batcher = ObservationBatcher(send, max_records=2, max_bytes=1024, max_delay_seconds=60, max_concurrent_sends=2)
+    receipt = await batcher.add(_observations(4))
+    await asyncio.sleep(0)
+
+    assert sent == ["o2"] and not receipt.done()
+    release.set()
+    assert await receipt == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_batcher_send_failure_fails_the_receipts_of_that_batch_only():
+    async def send(observations):
+        if observations[0]["id"].startswith("bad"):
+            raise RuntimeError("Gundi down")
+
+    batcher = ObservationBatcher(send, max_records=2, max_bytes=1024, max_delay_seconds=60, max_concurrent_sends=2)
+    good = await batcher.add(_observations(2, "good"))
+    bad = await batcher.add(_observations(2, "bad"))
+
+    await good
+    with pytest.raises(RuntimeError, match="Gundi down"):
+        await bad
+
+
+@pytest.mark.asyncio
+async def test_batcher_close_cancels_pending_receipts():
+    sent = []
+    batcher = _batcher(sent)
+    receipt = await batcher.add(_observations(2))
+    await batcher.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await receipt
+    assert sent == []
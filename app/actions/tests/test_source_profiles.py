@@ -104,6 +104,38 @@ def test_resolve_overlapping_picks_latest_starting():
     assert r.source_name == "New"
 
 
+def test_resolve_index_matches_linear_scan_on_random_histories():
+    """The interval index picks the same subject as scanning every assignment
+    (covering, latest-starting wins, first listed on a tie), including at the
+    exact boundaries."""
+    import random
+    from datetime import timedelta
+    rng = random.Random(7)
+    base = _dt("2026-01-01T00:00:00")
+    for _ in range(200):
+        assignments = []
+        for n in range(rng.randint(0, 6)):
+            lower = base + timedelta(days=rng.randint(0, 30))
+            upper = None if rng.random() < 0.3 else lower + timedelta(days=rng.randint(1, 10))
+            assignments.append(Assignment(lower=lower, upper=upper, subject_name=f"s{n}"))
+        p = SourceProfile(manufacturer_id="S", assignments=assignments)
+        for day in range(-1, 42):
+            when = base + timedelta(days=day)
+            covering = [a for a in assignments if a.covers(when)]
+            expected = max(covering, key=lambda a: a.lower).subject_name if covering else None
+            assert resolve_source(p, "abc-123", when).source_name == expected
+
+
+def test_resolve_reuses_one_resolved_source_per_assignment():
+    p = SourceProfile(manufacturer_id="S", assignments=[
+        Assignment(lower=_dt("2026-01-01T00:00:00"), upper=None, subject_name="Tau"),
+    ])
+    first = resolve_source(p, "abc-123", _dt("2026-02-01T00:00:00"))
+    assert resolve_source(p, "abc-123", _dt("2026-05-01T00:00:00")) is first
+    # Naive datetimes are still treated as UTC.
+    assert resolve_source(p, "abc-123", _naive("2026-05-01T00:00:00")) is first
+
+
 def test_assignment_covers_none_when():
     """Assignment.covers(None) must return False, never raise TypeError."""
     a = Assignment(lower=_dt("2026-01-01T00:00:00"), upper=None, subject_name="X")
@@ -119,6 +151,8 @@ def test_resolve_source_none_recorded_at():
     assert r == ResolvedSource(external_source_id="S", source_name=None, subject_type=None)
 
 
+import asyncio
+
 import pytest
 from app.actions.source_profiles import SourceProfileResolver
 
@@ -378,3 +412,75 @@ async def test_resolver_handles_real_er_shapes_with_z_timestamps(mocker):
     assert res.external_source_id == "2356469"
     assert res.source_name == "South Sudan JTEBB71J-104001956"
     assert res.subject_type == "vehicle"
+
+
+@pytest.mark.asyncio
+async def test_ensure_builds_profiles_concurrently(mocker):
+    """Profiles of different sources are built at the same time, not one by one."""
+    er = _FakeER()
+    mocker.patch.object(er, "get_source_assignments", return_value=[])
+    in_flight = 0
+    peak = 0
+
+    async def slow_detail(source_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return {"manufacturer_id": f"S-{source_id}"}
+
+    mocker.patch.object(er, "get_source_by_manufacturer_id", side_effect=slow_detail)
+    r = SourceProfileResolver(er)
+    await r.ensure([f"src-{i}" for i in range(20)])
+
+    from app.actions.source_profiles import PROFILE_BUILD_CONCURRENCY
+    assert peak == PROFILE_BUILD_CONCURRENCY
+    assert r.resolve("src-3", _dt("2026-06-01T00:00:00")).external_source_id == "S-src-3"
+
+
+@pytest.mark.asyncio
+async def test_ensure_reuses_profiles_cached_in_redis(mocker):
+    """A profile cached by an earlier run (or replica) is not fetched from ER
+    again; freshly built ones are written back with the TTL."""
+    mocker.patch("app.actions.source_profiles.settings.SOURCE_PROFILE_CACHE_TTL", 600)
+    er = _FakeER()
+    state_manager = mocker.MagicMock()
+    state_manager.get_cached_many = mocker.AsyncMock(return_value={
+        "source_profile.int-1.src-cached": {
+            "manufacturer_id": "CACHED-1",
+            "assignments": [{"lower": "2026-01-01T00:00:00+00:00", "upper": None,
+                             "subject_name": "Kito", "subject_type": "elephant"}],
+        },
+        "source_profile.int-1.src-1": None,
+    })
+    state_manager.set_cached_many = mocker.AsyncMock()
+    r = SourceProfileResolver(er, integration_id="int-1", state_manager=state_manager)
+
+    await r.ensure(["src-1", "src-cached"])
+
+    assert er.source_detail_calls == ["src-1"]
+    cached = r.resolve("src-cached", _dt("2026-06-01T00:00:00"))
+    assert cached.external_source_id == "CACHED-1" and cached.source_name == "Kito"
+    written = state_manager.set_cached_many.call_args.args[0]
+    assert list(written) == ["source_profile.int-1.src-1"]
+    assert written["source_profile.int-1.src-1"]["manufacturer_id"] == "SERIAL-9"
+    assert state_manager.set_cached_many.call_args.kwargs == {"ttl_seconds": 600}
+
+
+@pytest.mark.asyncio
+async def test_ensure_does_not_cache_profiles_of_failed_assignment_chunks(mocker):
+    """Without its assignments a profile is incomplete: it's used for this run
+    but not cached for the next ones."""
+    mocker.patch("app.actions.source_profiles.settings.SOURCE_PROFILE_CACHE_TTL", 600)
+    er = _FakeER()
+    mocker.patch.object(er, "get_source_assignments", side_effect=RuntimeError("boom"))
+    state_manager = mocker.MagicMock()
+    state_manager.get_cached_many = mocker.AsyncMock(return_value={})
+    state_manager.set_cached_many = mocker.AsyncMock()
+    r = SourceProfileResolver(er, integration_id="int-1", state_manager=state_manager)
+
+    await r.ensure(["src-1"])
+
+    assert r.resolve("src-1", _dt("2026-06-01T00:00:00")).external_source_id == "SERIAL-9"
+    state_manager.set_cached_many.assert_not_called()
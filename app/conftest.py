@@ -55,6 +55,69 @@ def async_return(result):
     return f
 
 
+@pytest.fixture(autouse=True)
+def reset_gundi_sender_cache():
+    # API keys, sender clients and send schedulers are cached per integration at module level;
+    # start every test from an empty cache so per-test mocks are used.
+    from app.services import gundi
+    gundi._api_keys.clear()
+    gundi._api_key_fetches.clear()
+    gundi._sender_clients.clear()
+    gundi._send_schedulers.clear()
+    yield
+    gundi._api_keys.clear()
+    gundi._api_key_fetches.clear()
+    gundi._sender_clients.clear()
+    gundi._send_schedulers.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_integration_cache():
+    # Built integrations are cached in process memory; tests reuse the same ids.
+    from app.services import config_manager
+    config_manager._integration_cache.clear()
+    config_manager._integration_cache_generations.clear()
+    config_manager._reloads.clear()
+    yield
+    config_manager._integration_cache.clear()
+    config_manager._integration_cache_generations.clear()
+    config_manager._reloads.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_admission_scheduler():
+    # The admission scheduler is shared per process; start every test with free slots.
+    from app.services import admission
+    admission._admission_scheduler = None
+    yield
+    admission._admission_scheduler = None
+
+
+@pytest.fixture(autouse=True)
+def reset_pubsub_publisher():
+    # The publisher (and publish queue) is shared per process and bound to the
+    # event loop that opened it; every test opens its own.
+    from app.services import activity_logger
+    activity_logger._publisher = None
+    activity_logger._publisher_session = None
+    activity_logger._publish_queue = None
+    yield
+    activity_logger._publisher = None
+    activity_logger._publisher_session = None
+    activity_logger._publish_queue = None
+
+
+@pytest.fixture(autouse=True)
+def gundi_outbox(tmp_path, monkeypatch):
+    # Every test gets its own, empty outbox database.
+    from app.services import outbox
+    monkeypatch.setattr(settings, "GUNDI_OUTBOX_PATH", str(tmp_path / "gundi-outbox.sqlite3"))
+    outbox._outbox = None
+    yield outbox.get_outbox()
+    outbox.get_outbox().close()
+    outbox._outbox = None
+
+
 @pytest.fixture
 def mock_integration_state():
     return {"last_execution": "2024-01-29T11:20:00+0200"}
@@ -77,6 +140,9 @@ def mock_redis(mocker, mock_integration_state):
     redis_client.__aenter__.return_value = redis_client
     redis_client.__aexit__.return_value = None
     redis_client.pipeline.return_value = redis_client
+    redis_client.lock.return_value.acquire.return_value = async_return(True)
+    redis_client.lock.return_value.release.return_value = async_return(None)
+    redis_client.lock.return_value.locked.return_value = async_return(False)
     redis.Redis.return_value = redis_client
     return redis
 
@@ -96,6 +162,9 @@ def mock_redis_empty(mocker, mock_integration_state):
     redis_client.__aenter__.return_value = redis_client
     redis_client.__aexit__.return_value = None
     redis_client.pipeline.return_value = redis_client
+    redis_client.lock.return_value.acquire.return_value = async_return(True)
+    redis_client.lock.return_value.release.return_value = async_return(None)
+    redis_client.lock.return_value.locked.return_value = async_return(False)
     redis.Redis.return_value = redis_client
     return redis
 
@@ -115,6 +184,9 @@ def mock_redis_with_integration_config(mocker, integration_v2_as_json):
     redis_client.__aenter__.return_value = redis_client
     redis_client.__aexit__.return_value = None
     redis_client.pipeline.return_value = redis_client
+    redis_client.lock.return_value.acquire.return_value = async_return(True)
+    redis_client.lock.return_value.release.return_value = async_return(None)
+    redis_client.lock.return_value.locked.return_value = async_return(False)
     redis.Redis.return_value = redis_client
     return redis
 
@@ -134,6 +206,9 @@ def mock_redis_with_action_config(mocker, pull_observations_config_as_json):
     redis_client.__aenter__.return_value = redis_client
     redis_client.__aexit__.return_value = None
     redis_client.pipeline.return_value = redis_client
+    redis_client.lock.return_value.acquire.return_value = async_return(True)
+    redis_client.lock.return_value.release.return_value = async_return(None)
+    redis_client.lock.return_value.locked.return_value = async_return(False)
     redis.Redis.return_value = redis_client
     return redis
 
@@ -155,6 +230,9 @@ def mock_redis_with_webhook_config(mocker, integration_v2_with_webhook):
     redis_client.__aenter__.return_value = redis_client
     redis_client.__aexit__.return_value = None
     redis_client.pipeline.return_value = redis_client
+    redis_client.lock.return_value.acquire.return_value = async_return(True)
+    redis_client.lock.return_value.release.return_value = async_return(None)
+    redis_client.lock.return_value.locked.return_value = async_return(False)
     redis.Redis.return_value = redis_client
     return redis
 
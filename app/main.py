@@ -1,19 +1,25 @@
+import asyncio
 import base64
 import json
 import logging
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, status, BackgroundTasks
+from fastapi import FastAPI, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from app.routers import actions, webhooks, config_events
 import app.settings as settings
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 
 from app.services.action_runner import execute_action, _portal
 from app.services.self_registration import register_integration_in_gundi
 from app.services.webhooks import close_diagnostic_client
+from app.services.gundi import close_sender_clients
+from app.services.config_manager import start_config_cache_warm_up, stop_config_cache_warm_up
+from app.services.outbox import start_outbox_drainer, stop_outbox_drainer
+from app.services.activity_logger import get_publisher, close_publisher, start_publish_queue, stop_publish_queue
 
 
 # For running behind a proxy, we'll want to configure the root path for OpenAPI browser.
@@ -26,10 +32,19 @@ async def lifespan(app: FastAPI):
     if settings.REGISTER_ON_START:
         await register_integration_in_gundi(gundi_client=_portal)
         # ToDo: set env var to false in GCP after registration
+    get_publisher()  # Open the shared PubSub publisher up front
+    start_publish_queue()
+    start_outbox_drainer()
+    start_config_cache_warm_up()  # In the background, so it doesn't delay readiness
     yield
     # Shutdown Hook
+    await stop_config_cache_warm_up()
+    await stop_publish_queue()  # Publishes what's still queued
+    await stop_outbox_drainer()
     await _portal.close()
     await close_diagnostic_client()
+    await close_sender_clients()
+    await close_publisher()
 
 
 app = FastAPI(
@@ -53,6 +68,9 @@ app.add_middleware(
 
 logger = logging.getLogger(__name__)
 
+# Runs of POST / messages processed in the background (referenced so they aren't garbage-collected)
+_background_runs = set()
+
 
 @app.get(
     "/",
@@ -72,7 +90,6 @@ def read_root(
 )
 async def execute(
     request: Request,
-    background_tasks: BackgroundTasks
 ):
     json_data = await request.json()
     logger.debug(f"JSON: {json_data}")
@@ -84,20 +101,32 @@ async def execute(
     # to automated, so scheduled pulls on destination-only integrations skip
     # quietly instead of erroring.
     if settings.PROCESS_PUBSUB_MESSAGES_IN_BACKGROUND:
-        background_tasks.add_task(
-            execute_action,
+        # The message is acked once the run has a slot (or ended before needing
+        # one), so a run rejected for lack of a slot is still redelivered.
+        admitted = asyncio.get_running_loop().create_future()
+        run = asyncio.create_task(execute_action(
             integration_id=json_payload.get("integration_id"),
             action_id=json_payload.get("action_id"),
             config_overrides=json_payload.get("config_overrides"),
             triggered_by=json_payload.get("triggered_by"),
-        )
+            admitted=admitted,
+        ))
+        _background_runs.add(run)
+        run.add_done_callback(_background_runs.discard)
+        await asyncio.wait([admitted, run], return_when=asyncio.FIRST_COMPLETED)
+        if not run.done():
+            return {}
+        result = run.result()
     else:
-        await execute_action(
+        result = await execute_action(
             integration_id=json_payload.get("integration_id"),
             action_id=json_payload.get("action_id"),
             config_overrides=json_payload.get("config_overrides"),
             triggered_by=json_payload.get("triggered_by"),
         )
+    # Only an action rejected for lack of a free slot is worth redelivering
+    if isinstance(result, JSONResponse) and result.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+        return result
     return {}
 
 
@@ -133,6 +162,9 @@ async def push_data(
         metadata=attributes
     )
 
+# Prometheus metrics (e.g. the action admission queue's depth and wait times)
+app.mount("/metrics", make_asgi_app())
+
 app.include_router(
     actions.router, prefix="/v1/actions", tags=["actions"], responses={}
 )
@@ -17,6 +17,7 @@ from fastapi.responses import JSONResponse
 from gundi_core.events import IntegrationActionFailed, ActionExecutionFailed, LogLevel
 
 from app.actions.core import PullActionConfiguration
+from .admission import AdmissionTimeoutError, get_admission_scheduler, run_deadline
 from .config_manager import IntegrationConfigurationManager
 from .state import IntegrationStateManager
 from .activity_logger import publish_event, log_action_activity
@@ -188,8 +189,11 @@ async def _skip_invalid_config(integration_id, action_id, *, error):
 
 async def execute_action(
         integration_id: str, action_id: Optional[str] = None, config_overrides: dict = None,
-        data: dict = None, metadata: dict = None, triggered_by: Optional[str] = None
+        data: dict = None, metadata: dict = None, triggered_by: Optional[str] = None,
+        admitted: Optional[asyncio.Future] = None
 ):
+    # ``admitted`` (if given) is resolved once the run gets a slot and its handler starts
+    received_at = time.monotonic()  # MAX_ACTION_EXECUTION_TIME counts from here, waiting for a slot included
     try:  # Get the integration details to pass it to the action handler
         integration = await config_manager.get_integration_details(integration_id)
     except Exception as e:
@@ -235,8 +239,9 @@ async def execute_action(
     is_manual = (triggered_by or "").strip().lower() == ActionTrigger.MANUAL.value
     skippable_pull = is_pull_action and not is_manual
 
-    # Get the configuration needed to execute the action
-    action_config = await config_manager.get_action_configuration(integration_id, action_id)
+    # Get the configuration needed to execute the action, from the integration
+    # loaded above (usually served from the in-process cache)
+    action_config = integration.get_action_config(action_id)
     if not action_config and not config_overrides:
         if skippable_pull:
             return _skip_quietly(
@@ -254,7 +259,8 @@ async def execute_action(
         )
 
     try:  # Parse the action configuration
-        config_data = action_config.data if action_config else {}
+        # A copy: the cached integration (and its configs) is shared by every run
+        config_data = dict(action_config.data) if action_config else {}
         if config_overrides:
             config_data.update(config_overrides)
         parsed_config = config_model.parse_obj(config_data)
@@ -283,8 +289,7 @@ async def execute_action(
         except pydantic.ValidationError as e:
             return await _handle_error(e, integration_id, action_id, data, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
-    try:  # Execute the action handler with a timeout
-        start_time = time.monotonic()
+    try:  # Execute the action handler with a timeout, once there's a slot for it (see admission.py)
         handler_kwargs = {
             "integration": integration,
             "action_config": parsed_config,
@@ -293,9 +298,27 @@ async def execute_action(
             handler_kwargs["data"] = parsed_data
         if metadata is not None:
             handler_kwargs["metadata"] = metadata
-        result = await asyncio.wait_for(
-            handler(**handler_kwargs),
-            timeout=settings.MAX_ACTION_EXECUTION_TIME
+        remaining = settings.MAX_ACTION_EXECUTION_TIME - (time.monotonic() - received_at)
+        async with get_admission_scheduler().admit(
+                integration_id, action_id, timeout=max(0.0, min(settings.ACTIONS_MAX_QUEUE_WAIT_SECONDS, remaining))
+        ):
+            if admitted is not None and not admitted.done():
+                admitted.set_result(None)
+            start_time = time.monotonic()
+            timeout = settings.MAX_ACTION_EXECUTION_TIME - (start_time - received_at)
+            # Handlers that yield before the hard timeout size their budget from what's left
+            with run_deadline(start_time + timeout):
+                result = await asyncio.wait_for(handler(**handler_kwargs), timeout=timeout)
+    except AdmissionTimeoutError as e:
+        # Overloaded: a 503 lets PubSub redeliver the message later instead of
+        # it waiting here past its ack deadline (and running twice).
+        logger.warning(f"Rejecting action '{action_id}' for integration '{integration_id}': {e}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(settings.ACTIONS_MAX_QUEUE_WAIT_SECONDS)},
+            content=jsonable_encoder({"detail": {
+                "integration_id": integration_id, "action_id": action_id, "error": str(e),
+            }}),
         )
     except asyncio.TimeoutError:
         return await _handle_error(
@@ -33,7 +33,8 @@ async def trigger_action(integration_id: str, action_id: str, config=None):
         if not settings.INTEGRATION_COMMANDS_TOPIC:
             error_msg = "Please set INTEGRATION_COMMANDS_TOPIC in the environment to trigger actions from the integration."
             raise ValueError(error_msg)
-        return await publish_event(run_action_command, settings.INTEGRATION_COMMANDS_TOPIC)
+        # Commands are published right away, not through the activity-event queue
+        return await publish_event(run_action_command, settings.INTEGRATION_COMMANDS_TOPIC, wait=True)
 
 
 class CrontabSchedule(BaseModel):
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import logging
+from typing import List, Optional
 
 import aiohttp
 import stamina
@@ -32,6 +33,52 @@ from app.services.errors import format_error_message
 logger = logging.getLogger(__name__)
 
 
+PUBSUB_MAX_CONNECTIONS = 10  # pooled connections of the shared publisher
+PUBLISH_BATCH_MAX_MESSAGES = 100  # events per PubSub publish request from the queue
+PUBLISH_BATCH_MAX_BYTES = 9 * 1024 * 1024  # size of a publish request from the queue (PubSub's limit is 10 MB)
+PUBLISH_FLUSH_INTERVAL_SECONDS = 0.5  # how long the queue collects events before publishing
+PUBLISH_DRAIN_TIMEOUT_SECONDS = 10.0  # how long shutdown waits for queued events
+
+# One publisher per process: its session pools connections and its token is
+# fetched once and refreshed before it expires, instead of per event.
+_publisher: Optional[pubsub.PublisherClient] = None
+_publisher_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_publisher() -> pubsub.PublisherClient:
+    global _publisher, _publisher_session
+    if _publisher is None:
+        _publisher_session = aiohttp.ClientSession(
+            raise_for_status=True,
+            timeout=aiohttp.ClientTimeout(total=20.0),
+            connector=aiohttp.TCPConnector(limit=PUBSUB_MAX_CONNECTIONS),
+        )
+        _publisher = pubsub.PublisherClient(session=_publisher_session)
+    return _publisher
+
+
+async def close_publisher() -> None:
+    """Close the shared PubSub publisher (on service shutdown)."""
+    global _publisher, _publisher_session
+    _publisher = None
+    if _publisher_session is not None:
+        await _publisher_session.close()
+        _publisher_session = None
+
+
+class PublishRejectedError(Exception):
+    """PubSub rejected a publish request (a 4xx, e.g. too large): sending it again as is won't help."""
+
+
+def _encode_event(event: SystemEventBaseModel) -> bytes:
+    return json.dumps(event.dict(), default=str).encode("utf-8")
+
+
+def _publish_request_size(event: SystemEventBaseModel) -> int:
+    """Bytes an event adds to a publish request: its data base64-encoded, plus some JSON framing."""
+    return 4 * ((len(_encode_event(event)) + 2) // 3) + 64
+
+
 # Publish events for other services or system components
 @stamina.retry(
     on=(aiohttp.ClientError, asyncio.TimeoutError),
@@ -40,29 +87,180 @@ logger = logging.getLogger(__name__)
     wait_max=60,
     wait_jitter=5.0
 )
-async def publish_event(event: SystemEventBaseModel, topic_name: str):
-    timeout_settings = aiohttp.ClientTimeout(total=20.0)
-    async with aiohttp.ClientSession(
-        raise_for_status=True, timeout=timeout_settings
-    ) as session:
-        client = pubsub.PublisherClient(session=session)
-        # Get the topic
-        topic = client.topic_path(settings.GCP_PROJECT_ID, topic_name)
-        # Prepare the payload
-        binary_payload = json.dumps(event.dict(), default=str).encode("utf-8")
-        messages = [pubsub.PubsubMessage(binary_payload)]
-        logger.debug(f"Sending event {event} to PubSub topic {topic_name}..")
-        try:  # Send to pubsub
-            response = await client.publish(topic, messages)
+async def publish_events(events: List[SystemEventBaseModel], topic_name: str):
+    """Publish several events to one topic in a single PubSub request."""
+    client = get_publisher()
+    # Get the topic
+    topic = client.topic_path(settings.GCP_PROJECT_ID, topic_name)
+    # Prepare the payload
+    messages = [pubsub.PubsubMessage(_encode_event(event)) for event in events]
+    logger.debug(f"Sending {len(events)} events to PubSub topic {topic_name}..")
+    try:  # Send to pubsub
+        response = await client.publish(topic, messages)
+    except aiohttp.ClientResponseError as e:
+        if 400 <= e.status < 500 and e.status != 429:
+            # Not retried: the same request would be rejected again
+            raise PublishRejectedError(f"PubSub rejected {len(events)} events for topic {topic_name}: {e}") from e
+        logger.exception(
+            f"Error publishing system events to topic {topic_name}: {e}. This will be retried."
+        )
+        raise e
+    except Exception as e:
+        logger.exception(
+            f"Error publishing system events to topic {topic_name}: {e}. This will be retried."
+        )
+        raise e
+    else:
+        logger.debug(f"{len(events)} system events published successfully.")
+        logger.debug(f"GCP PubSub response: {response}")
+        return response
+
+
+async def publish_event(event: SystemEventBaseModel, topic_name: str, *, wait: bool = False):
+    """Publish an event.
+
+    While the publish queue is running (see ``start_publish_queue``) the event
+    is only queued and published in the background, so callers don't wait for
+    PubSub. Pass ``wait=True`` for events that must be published before the
+    caller goes on (e.g. commands); it also returns the PubSub response.
+    """
+    if _publish_queue is not None and not wait:
+        await _publish_queue.put(event, topic_name)
+        return None
+    return await publish_events([event], topic_name)
+
+
+class EventPublishQueue:
+    """Bounded in-process queue of events, published by a background flusher.
+
+    The flusher collects events for up to ``flush_interval`` seconds and
+    publishes them with one multi-message request per topic (at most
+    ``max_batch`` messages and about ``max_batch_bytes`` each). When ``max_size``
+    events are waiting, ``put`` either drops the new event
+    (``block_when_full=False``) or waits for room. A request PubSub rejects is
+    split in halves and sent again, so only the events it can't take are
+    dropped. Events that still fail after the publish retries are logged and
+    dropped.
+    """
+
+    def __init__(self, *, max_size: int, block_when_full: bool, max_batch: int, flush_interval: float,
+                 max_batch_bytes: int = PUBLISH_BATCH_MAX_BYTES):
+        self.block_when_full = block_when_full
+        self.max_batch = max_batch
+        self.max_batch_bytes = max_batch_bytes
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = asyncio.Queue(maxsize=max_size)
+        self._closed = False
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, event: SystemEventBaseModel, topic_name: str):
+        if self._closed:
+            raise RuntimeError("The publish queue is closed")
+        if self.block_when_full:
+            await self._queue.put((event, topic_name))
+            return
+        try:
+            self._queue.put_nowait((event, topic_name))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Activity event queue is full; dropping {type(event).__name__} ({self.dropped} dropped so far).")
+
+    async def close(self, timeout: float):
+        """Publish what's queued (for up to ``timeout`` seconds) and stop the flusher."""
+        self._closed = True
+        if self._task is None:
+            return
+
+        async def drain():
+            # Queuing the sentinel waits for room too (e.g. if publishing is stuck), so it's within the timeout
+            await self._queue.put(None)  # Everything queued before it is flushed first
+            await self._task
+
+        try:
+            await asyncio.wait_for(drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Gave up publishing {self._queue.qsize()} queued activity events on shutdown.")
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            await asyncio.sleep(self.flush_interval)  # Let more events arrive
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._publish(batch)
+
+    async def _publish(self, batch):
+        by_topic = {}
+        for event, topic_name in batch:
+            by_topic.setdefault(topic_name, []).append(event)
+        for topic_name, events in by_topic.items():
+            for chunk in self._chunks(events):
+                await self._publish_chunk(chunk, topic_name)
+
+    def _chunks(self, events):
+        """Split events into publish requests of at most max_batch messages and max_batch_bytes."""
+        chunk, chunk_bytes = [], 0
+        for event in events:
+            size = _publish_request_size(event)
+            if chunk and (len(chunk) == self.max_batch or chunk_bytes + size > self.max_batch_bytes):
+                yield chunk
+                chunk, chunk_bytes = [], 0
+            chunk.append(event)
+            chunk_bytes += size
+        if chunk:
+            yield chunk
+
+    async def _publish_chunk(self, chunk, topic_name):
+        try:
+            await publish_events(chunk, topic_name)
+        except PublishRejectedError as e:
+            if len(chunk) == 1:
+                logger.error(f"Dropping an activity event for topic {topic_name}: {e}")
+                return
+            # Find the events it can't take (e.g. one too large) instead of dropping them all
+            middle = len(chunk) // 2
+            await self._publish_chunk(chunk[:middle], topic_name)
+            await self._publish_chunk(chunk[middle:], topic_name)
         except Exception as e:
-            logger.exception(
-                f"Error publishing system event to topic {topic_name}: {e}. This will be retried."
-            )
-            raise e
-        else:
-            logger.debug(f"System event {event} published successfully.")
-            logger.debug(f"GCP PubSub response: {response}")
-            return response
+            logger.error(f"Dropping {len(chunk)} activity events for topic {topic_name}: {e}")
+
+
+_publish_queue: Optional[EventPublishQueue] = None
+
+
+def start_publish_queue():
+    """Start publishing events in the background (on service startup)."""
+    global _publish_queue
+    if _publish_queue is None:
+        _publish_queue = EventPublishQueue(
+            max_size=settings.ACTIVITY_EVENTS_QUEUE_SIZE,
+            block_when_full=settings.ACTIVITY_EVENTS_QUEUE_FULL_POLICY == "block",
+            max_batch=PUBLISH_BATCH_MAX_MESSAGES,
+            flush_interval=PUBLISH_FLUSH_INTERVAL_SECONDS,
+        )
+        _publish_queue.start()
+
+
+async def stop_publish_queue():
+    """Drain the publish queue and go back to publishing inline (on service shutdown)."""
+    global _publish_queue
+    queue, _publish_queue = _publish_queue, None
+    if queue is not None:
+        await queue.close(timeout=PUBLISH_DRAIN_TIMEOUT_SECONDS)
 
 
 async def log_activity(integration_id: str, action_id: str, title: str, level="INFO", config_data: dict = None, data: dict = None):
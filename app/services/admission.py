@@ -0,0 +1,252 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+from prometheus_client import Counter, Gauge, Histogram
+from app import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Labelled by action only: integrations are too many to be metric labels
+ACTIONS_QUEUED = Gauge(
+    "gundi_actions_queued", "Action executions waiting for a slot in this process.", ["action_id"]
+)
+ACTIONS_RUNNING = Gauge(
+    "gundi_actions_running", "Action executions running in this process.", ["action_id"]
+)
+ACTION_QUEUE_WAIT = Histogram(
+    "gundi_action_queue_wait_seconds", "Time action executions waited for a slot.", ["action_id"],
+    buckets=(0.01, 0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600),
+)
+ACTIONS_REJECTED = Counter(
+    "gundi_actions_rejected", "Action executions that gave up waiting for a slot.", ["action_id"]
+)
+
+# Set inside an admitted run. An action run inline from another (TRIGGER_ACTIONS_ALWAYS_SYNC)
+# uses its parent's slot, as waiting for one of its own could deadlock.
+_in_admitted_run = contextvars.ContextVar("in_admitted_run", default=False)
+# time.monotonic() at which the running action hits its hard timeout
+_run_deadline = contextvars.ContextVar("run_deadline", default=None)
+
+
+class AdmissionTimeoutError(Exception):
+    """An action execution waited for a slot longer than it was allowed to."""
+
+
+class ActionAdmissionScheduler:
+    """Decides which action executions may run now in this process.
+
+    An execution runs only while there are fewer than ``max_running`` running
+    in total, fewer than ``max_per_integration`` of its integration (unless
+    that's 0, for no cap), and fewer than its action's cap in
+    ``max_per_action`` (actions not listed there have only the other caps).
+    Otherwise it waits in its integration's queue, for up to the ``timeout``
+    given to ``admit()``.
+
+    Queued integrations take turns as slots free up: the one served least
+    recently goes first (round robin), so one
+    integration with many pending runs (e.g. a backfill) waits behind its own
+    runs, not in front of everyone else's. Within an integration, runs start
+    in arrival order, except that a run held back by its action's cap doesn't
+    block runs of other actions.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_running: int,
+        max_per_integration: int,
+        max_per_action: Optional[Dict[str, int]] = None,
+    ):
+        self.max_running = max_running
+        self.max_per_integration = max_per_integration
+        self.max_per_action = dict(max_per_action or {})
+        self._running = 0
+        self._running_per_integration = defaultdict(int)
+        self._running_per_action = defaultdict(int)
+        # integration_id -> deque of (action_id, future), in arrival order
+        self._queues: Dict[str, deque] = {}
+        # integration_id -> when it last got a slot (a counter), for integrations running or queued
+        self._last_served: Dict[str, int] = {}
+        self._turn = 0
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @asynccontextmanager
+    async def admit(self, integration_id: str, action_id: str, *, timeout: Optional[float] = None):
+        """Wait for a slot to run the action for the integration, and hold it inside the block.
+
+        Raises AdmissionTimeoutError if no slot frees up within ``timeout`` seconds.
+        """
+        if _in_admitted_run.get():
+            yield
+            return
+        integration_id = str(integration_id)
+        try:
+            waited = await self._acquire(integration_id, action_id, timeout)
+        except AdmissionTimeoutError:
+            ACTIONS_REJECTED.labels(action_id).inc()
+            raise
+        ACTION_QUEUE_WAIT.labels(action_id).observe(waited)
+        if waited >= 1:
+            logger.info(
+                f"Action '{action_id}' for integration '{integration_id}' waited {waited:.1f}s for a slot "
+                f"({self.queue_depth} still queued)."
+            )
+        token = _in_admitted_run.set(True)
+        try:
+            yield
+        finally:
+            _in_admitted_run.reset(token)
+            self._release(integration_id, action_id)
+
+    def _can_run(self, integration_id: str, action_id: str) -> bool:
+        return (
+            self._running < self.max_running
+            and (not self.max_per_integration or self._running_per_integration[integration_id] < self.max_per_integration)
+            and self._running_per_action[action_id] < self.max_per_action.get(action_id, self.max_running)
+        )
+
+    def _start(self, integration_id: str, action_id: str):
+        self._running += 1
+        self._running_per_integration[integration_id] += 1
+        self._running_per_action[action_id] += 1
+        self._turn += 1
+        self._last_served[integration_id] = self._turn
+        ACTIONS_RUNNING.labels(action_id).inc()
+
+    async def _acquire(self, integration_id: str, action_id: str, timeout: Optional[float]) -> float:
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(integration_id, deque()).append((action_id, waiter))
+        ACTIONS_QUEUED.labels(action_id).inc()
+        self._dispatch()  # Admitted right away if there's a slot for it
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():  # Admitted just as the time ran out
+                return time.monotonic() - started
+            waiter.cancel()
+            self._forget(integration_id, action_id, waiter)
+            raise AdmissionTimeoutError(
+                f"No slot for action '{action_id}' of integration '{integration_id}' within {timeout:.0f}s"
+            )
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(integration_id, action_id)  # Admitted just before it was cancelled
+            else:
+                waiter.cancel()
+                self._forget(integration_id, action_id, waiter)
+            raise
+        return time.monotonic() - started
+
+    def _forget(self, integration_id: str, action_id: str, waiter: asyncio.Future):
+        queue = self._queues.get(integration_id)
+        if queue is None:
+            return
+        try:
+            queue.remove((action_id, waiter))
+        except ValueError:
+            return
+        ACTIONS_QUEUED.labels(action_id).dec()
+        if not queue:
+            del self._queues[integration_id]
+            self._forget_turn(integration_id)
+        self._dispatch()  # It may have held back others of its integration
+
+    def _forget_turn(self, integration_id: str):
+        if integration_id not in self._queues and integration_id not in self._running_per_integration:
+            self._last_served.pop(integration_id, None)
+
+    def _release(self, integration_id: str, action_id: str):
+        self._running -= 1
+        self._running_per_integration[integration_id] -= 1
+        if not self._running_per_integration[integration_id]:
+            del self._running_per_integration[integration_id]
+            self._forget_turn(integration_id)
+        self._running_per_action[action_id] -= 1
+        if not self._running_per_action[action_id]:
+            del self._running_per_action[action_id]
+        ACTIONS_RUNNING.labels(action_id).dec()
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit queued runs while there are slots, least recently served integration first."""
+        while self._running < self.max_running:
+            next_run = None
+            for integration_id in list(self._queues):
+                queue = self._queues[integration_id]
+                for entry in list(queue):
+                    action_id, waiter = entry
+                    if waiter.done():  # Cancelled while queued
+                        queue.remove(entry)
+                        ACTIONS_QUEUED.labels(action_id).dec()
+                    elif self._can_run(integration_id, action_id):
+                        last_served = self._last_served.get(integration_id, 0)
+                        if next_run is None or last_served < next_run[0]:
+                            next_run = (last_served, integration_id, entry)
+                        break
+                if not queue:
+                    del self._queues[integration_id]
+                    self._forget_turn(integration_id)
+            if next_run is None:
+                return
+            _, integration_id, entry = next_run
+            queue = self._queues[integration_id]
+            queue.remove(entry)
+            if not queue:
+                del self._queues[integration_id]
+            action_id, waiter = entry
+            ACTIONS_QUEUED.labels(action_id).dec()
+            self._start(integration_id, action_id)
+            waiter.set_result(None)
+
+
+@contextmanager
+def run_deadline(deadline: float):
+    """Within the block, ``run_time_left()`` counts down to ``deadline`` (a ``time.monotonic()`` value).
+
+    A run started inline from another keeps its parent's deadline if that's earlier.
+    """
+    parent = _run_deadline.get()
+    token = _run_deadline.set(deadline if parent is None else min(deadline, parent))
+    try:
+        yield
+    finally:
+        _run_deadline.reset(token)
+
+
+def run_time_left() -> float:
+    """Seconds before the running action hits its hard timeout.
+
+    That's less than MAX_ACTION_EXECUTION_TIME when the run waited for a slot.
+    Outside a run (e.g. a handler called directly) it's MAX_ACTION_EXECUTION_TIME.
+    """
+    deadline = _run_deadline.get()
+    if deadline is None:
+        return float(settings.MAX_ACTION_EXECUTION_TIME)
+    return max(0.0, deadline - time.monotonic())
+
+
+_admission_scheduler: Optional[ActionAdmissionScheduler] = None
+
+
+def get_admission_scheduler() -> ActionAdmissionScheduler:
+    global _admission_scheduler
+    if _admission_scheduler is None:
+        _admission_scheduler = ActionAdmissionScheduler(
+            max_running=settings.ACTIONS_MAX_CONCURRENCY,
+            max_per_integration=settings.ACTIONS_MAX_CONCURRENCY_PER_INTEGRATION,
+            max_per_action=settings.ACTIONS_MAX_CONCURRENCY_PER_ACTION,
+        )
+    return _admission_scheduler
@@ -20,6 +20,7 @@ config_manager = IntegrationConfigurationManager()
 
 async def handle_integration_created_event(event: IntegrationCreated):
     await config_manager.set_integration(integration=event.payload)
+    config_manager.invalidate_cached_integration(event.payload.id)
 
 
 async def handle_integration_updated_event(event: IntegrationUpdated):
@@ -29,10 +30,12 @@ async def handle_integration_updated_event(event: IntegrationUpdated):
         if hasattr(integration, key):
             setattr(integration, key, value)
     await config_manager.set_integration(integration=integration)
+    config_manager.invalidate_cached_integration(event_data.id)
 
 
 async def handle_integration_deleted_event(event: IntegrationDeleted):
     await config_manager.delete_integration(integration_id=event.payload.id)
+    config_manager.invalidate_cached_integration(event.payload.id)
 
 
 async def handle_action_config_created_event(event: ActionConfigCreated):
@@ -42,6 +45,7 @@ async def handle_action_config_created_event(event: ActionConfigCreated):
         action_id=action_config.action.value,
         config=action_config
     )
+    config_manager.invalidate_cached_integration(action_config.integration)
 
 
 async def handle_action_config_updated_event(event: ActionConfigUpdated):
@@ -52,6 +56,17 @@ async def handle_action_config_updated_event(event: ActionConfigUpdated):
         integration_id=integration_id,
         action_id=action_id
     )
+    if action_config is None:
+        # Cached as not configured (it was loaded before this config existed):
+        # drop that and load the config from Gundi, which already has the change.
+        await config_manager.delete_action_configuration(
+            integration_id=integration_id,
+            action_id=action_id
+        )
+        if await config_manager.get_action_configuration(integration_id=integration_id, action_id=action_id) is None:
+            logger.warning(f"Action '{action_id}' of integration {integration_id} has no configuration in Gundi either.")
+        config_manager.invalidate_cached_integration(integration_id)
+        return
     for key, value in event_data.changes.items():
         setattr(action_config, key, value)
     await config_manager.set_action_configuration(
@@ -59,6 +74,7 @@ async def handle_action_config_updated_event(event: ActionConfigUpdated):
         action_id=action_id,
         config=action_config
     )
+    config_manager.invalidate_cached_integration(integration_id)
 
 
 async def handle_action_config_deleted_event(event: ActionConfigDeleted):
@@ -69,6 +85,7 @@ async def handle_action_config_deleted_event(event: ActionConfigDeleted):
         integration_id=integration_id,
         action_id=action_id
     )
+    config_manager.invalidate_cached_integration(integration_id)
 
 
 event_handlers = {
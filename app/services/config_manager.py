@@ -1,17 +1,48 @@
+import asyncio
 import json
-from typing import Optional
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 import stamina
 import httpx
 import redis.asyncio as redis
+from redis.exceptions import LockError
 from gundi_core.schemas.v2 import Integration, IntegrationSummary, IntegrationActionConfiguration, WebhookConfiguration
 from gundi_client_v2 import GundiClient
 from app import settings
 
 
-# Cached marker meaning "this integration has no webhook configuration", so a
-# cold cache doesn't trigger a Gundi API reload on every webhook-config lookup.
+logger = logging.getLogger(__name__)
+
+
+# Cached marker meaning "this integration has no webhook configuration" (or no
+# configuration for this action), so a cold cache doesn't trigger a Gundi API
+# reload on every lookup of a config that doesn't exist.
 _NO_WEBHOOK_CONFIG_SENTINEL = "null"
+_NO_ACTION_CONFIG_SENTINEL = _NO_WEBHOOK_CONFIG_SENTINEL
+
+
+RELOAD_LOCK_TTL_SECONDS = 30      # a replica's claim on reloading an integration from Gundi
+RELOAD_LOCK_WAIT_SECONDS = 10     # how long other replicas wait for that reload before doing their own
+RELOAD_LOCK_POLL_SECONDS = 0.2
+WARM_UP_PAGE_SIZE = 100           # integrations listed per portal request during the startup warm-up
+
+# In-flight reloads from Gundi per integration, so concurrent cache misses in
+# this process share one portal request
+_reloads: Dict[str, asyncio.Future] = {}
+# Fully built Integration objects, shared by every manager in the process so
+# the config-events consumer's invalidations reach the action runner's reads:
+# integration_id -> (integration, expires_at on time.monotonic()), least recently used first
+_integration_cache: "OrderedDict[str, Tuple[Integration, float]]" = OrderedDict()
+# Bumped on every invalidation, so a read that raced with one doesn't cache stale data
+_integration_cache_generations: Dict[str, int] = {}
+_warm_up: Optional[asyncio.Task] = None
+
+
+def _is_absence_sentinel(data) -> bool:
+    return data in (_NO_WEBHOOK_CONFIG_SENTINEL, _NO_WEBHOOK_CONFIG_SENTINEL.encode())
 
 
 class IntegrationConfigurationManager:
@@ -32,26 +63,146 @@ class IntegrationConfigurationManager:
     def _get_webhook_config_key(self, integration_id: str) -> str:
         return f"integrationconfig.{integration_id}.webhook"
 
+    def _get_reload_lock_key(self, integration_id: str) -> str:
+        return f"integration_reload_lock.{integration_id}"
+
     async def _reload_integration_from_gundi(self, integration_id: str, ttl=None) -> Integration:
+        """Reload the integration from Gundi into the cache, once for all concurrent callers.
+
+        Callers in this process share one in-flight reload. Across replicas, a
+        Redis lock lets one of them call the portal while the others wait for
+        its result to appear in the cache (for up to RELOAD_LOCK_WAIT_SECONDS,
+        after which they reload themselves).
+        """
+        integration_id = str(integration_id)
+        reload = _reloads.get(integration_id)
+        if reload is None:
+            reload = asyncio.ensure_future(self._reload_integration_once(integration_id, ttl))
+            _reloads[integration_id] = reload
+
+            def _forget(done, integration_id=integration_id):
+                if _reloads.get(integration_id) is done:
+                    del _reloads[integration_id]
+            reload.add_done_callback(_forget)
+        # Shielded: a cancelled caller must not cancel the reload others wait on
+        return await asyncio.shield(reload)
+
+    async def _reload_integration_once(self, integration_id: str, ttl=None) -> Integration:
+        lock = self.db_client.lock(self._get_reload_lock_key(integration_id), timeout=RELOAD_LOCK_TTL_SECONDS)
+        try:
+            acquired = await lock.acquire(blocking=False)
+        except redis.RedisError as e:  # The lock is an optimization; reload without it
+            logger.warning(f"Couldn't take the reload lock of integration {integration_id}: {e}")
+            return await self._fetch_integration_from_gundi(integration_id, ttl)
+        if not acquired:
+            # Another replica is reloading it: wait for its result in the cache
+            deadline = time.monotonic() + RELOAD_LOCK_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(RELOAD_LOCK_POLL_SECONDS)
+                if integration := await self._read_cached_integration_details(integration_id):
+                    return integration
+                if not await lock.locked():
+                    break  # It gave up (or expired) without caching the integration
+            logger.info(f"Reloading integration {integration_id} from Gundi after waiting for another replica.")
+            return await self._fetch_integration_from_gundi(integration_id, ttl)
+        try:
+            return await self._fetch_integration_from_gundi(integration_id, ttl)
+        finally:
+            try:
+                await lock.release()
+            except (redis.RedisError, LockError) as e:
+                logger.warning(f"Couldn't release the reload lock of integration {integration_id}: {e}")
+
+    async def _fetch_integration_from_gundi(self, integration_id: str, ttl=None) -> Integration:
         key = self._get_integration_key(integration_id)
         async with GundiClient() as gundi:
             async for attempt in stamina.retry_context(on=httpx.HTTPError, wait_initial=1.0, wait_jitter=5.0,  wait_max=32.0):
                 with attempt:
                     integration_details = await gundi.get_integration_details(integration_id)
-            integration = IntegrationSummary.from_integration(integration_details)
-            await self.db_client.set(key, integration.json(), ttl)
-            # Save configurations for individual actions
-            for config in integration_details.configurations:
-                config_key = self._get_action_config_key(integration_id, config.action.value)
-                await self.db_client.set(config_key, config.json(), ttl)
-            # Save the webhook configuration — or a sentinel marking its absence, so
-            # integrations without one don't reload from the Gundi API on every lookup
-            webhook_key = self._get_webhook_config_key(integration_id)
-            if webhook_configuration := integration_details.webhook_configuration:
-                await self.db_client.set(webhook_key, webhook_configuration.json(), ttl)
-            else:
-                await self.db_client.set(webhook_key, _NO_WEBHOOK_CONFIG_SENTINEL, ttl)
-            return integration_details
+        integration = IntegrationSummary.from_integration(integration_details)
+        values = {key: integration.json()}
+        # Save configurations for individual actions, and mark the actions
+        # of the type that aren't configured
+        for action in integration_details.type.actions:
+            values[self._get_action_config_key(integration_id, action.value)] = _NO_ACTION_CONFIG_SENTINEL
+        for config in integration_details.configurations:
+            values[self._get_action_config_key(integration_id, config.action.value)] = config.json()
+        # Save the webhook configuration — or a sentinel marking its absence, so
+        # integrations without one don't reload from the Gundi API on every lookup
+        webhook_configuration = integration_details.webhook_configuration
+        values[self._get_webhook_config_key(integration_id)] = (
+            webhook_configuration.json() if webhook_configuration else _NO_WEBHOOK_CONFIG_SENTINEL
+        )
+        # All keys in one MULTI/EXEC round trip, so readers never see a partial reload
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                async with self.db_client.pipeline(transaction=True) as pipe:
+                    for cache_key, value in values.items():
+                        pipe.set(cache_key, value, ttl)
+                    await pipe.execute()
+        return integration_details
+
+    async def _list_integration_ids(self, integration_type: str) -> List[str]:
+        """IDs of the integrations of the given type, following the portal's pagination.
+
+        The portal is asked to filter by type, but each item's type slug is
+        checked too, so nothing else is loaded if it doesn't.
+        """
+        integration_ids = []
+        skipped = 0
+        async with GundiClient() as gundi:
+            url = f"{gundi.integrations_endpoint}/"
+            params = {"type": integration_type, "page_size": WARM_UP_PAGE_SIZE}
+            while url:
+                async for attempt in stamina.retry_context(on=httpx.HTTPError, wait_initial=1.0, wait_jitter=5.0,  wait_max=32.0):
+                    with attempt:
+                        response = await gundi._get(url, params=params)
+                        response.raise_for_status()
+                data = response.json()
+                if isinstance(data, list):  # Not paginated
+                    results, url = data, None
+                else:
+                    results, url = data.get("results", []), data.get("next")
+                params = None  # The next page's URL carries the query
+                for integration in results:
+                    type_ = integration.get("type")
+                    if not isinstance(type_, dict) or type_.get("value") != integration_type:
+                        skipped += 1
+                        continue
+                    integration_ids.append(str(integration["id"]))
+        if skipped:
+            logger.warning(
+                f"Config cache warm-up skipped {skipped} integrations listed by the portal that aren't of type '{integration_type}'."
+            )
+        return integration_ids
+
+    async def warm_up_cache(self, integration_type: str, *, concurrency: int) -> int:
+        """Load every integration of the type that isn't cached in Redis yet, at most
+        ``concurrency`` at a time. Returns how many were loaded from Gundi.
+
+        Meant to run once on startup, so the first scheduled runs after a deploy
+        don't all miss the cache at once. Failures are logged and skipped; those
+        integrations are loaded on first use as usual.
+        """
+        integration_ids = await self._list_integration_ids(integration_type)
+        slots = asyncio.Semaphore(concurrency)
+
+        async def warm_up_integration(integration_id: str) -> bool:
+            async with slots:
+                try:
+                    if await self._read_cached_integration_details(integration_id) is not None:
+                        return False
+                    await self._reload_integration_from_gundi(integration_id)
+                except Exception as e:
+                    logger.warning(f"Couldn't warm up the config cache of integration {integration_id}: {e}")
+                    return False
+                return True
+
+        loaded = await asyncio.gather(*(warm_up_integration(i) for i in integration_ids))
+        logger.info(
+            f"Config cache warm-up: {sum(loaded)} of {len(integration_ids)} '{integration_type}' integrations loaded from Gundi."
+        )
+        return sum(loaded)
 
     async def get_action_configuration(self, integration_id: str, action_id: str, ttl=None) -> Optional[IntegrationActionConfiguration]:
         key = self._get_action_config_key(integration_id, action_id)
@@ -59,6 +210,8 @@ class IntegrationConfigurationManager:
             with attempt:
                 data = await self.db_client.get(key)
         if data:
+            if _is_absence_sentinel(data):
+                return None  # cached absence — this action isn't configured
             return IntegrationActionConfiguration.parse_raw(data)
         # If not found in the redis db, try reloading data from Gundi API
         integration_details = await self._reload_integration_from_gundi(integration_id, ttl)
@@ -70,7 +223,7 @@ class IntegrationConfigurationManager:
             with attempt:
                 data = await self.db_client.get(key)
         if data:
-            if data in (_NO_WEBHOOK_CONFIG_SENTINEL, _NO_WEBHOOK_CONFIG_SENTINEL.encode()):
+            if _is_absence_sentinel(data):
                 return None  # cached absence — this integration has no webhook config
             return WebhookConfiguration.parse_raw(data)
         # If not found in the redis db, try reloading data from Gundi API
@@ -114,14 +267,72 @@ class IntegrationConfigurationManager:
             with attempt:
                 await self.db_client.delete(key)
 
+    def invalidate_cached_integration(self, integration_id: str):
+        """Drop the in-process copy of the integration (e.g. after a config event)."""
+        integration_id = str(integration_id)
+        _integration_cache.pop(integration_id, None)
+        _integration_cache_generations[integration_id] = _integration_cache_generations.get(integration_id, 0) + 1
+
     async def get_integration_details(self, integration_id: str, ttl=None) -> Integration:
-        integration_summary = await self.get_integration(integration_id, ttl)
-        configurations = []
-        for action in integration_summary.type.actions:
-            config = await self.get_action_configuration(integration_id, action.value, ttl)
-            if config:
-                configurations.append(config)
-        webhook_configuration = await self.get_webhook_configuration(integration_id, ttl)
+        """Return the integration with all its configurations.
+
+        Integrations read recently are served from an in-process cache
+        (``INTEGRATION_CACHE_TTL`` seconds, ``INTEGRATION_CACHE_MAX_SIZE``
+        entries) without touching Redis; treat the returned object as
+        read-only, as it's shared between callers. Config events invalidate
+        it (see config_events_consumer).
+        """
+        integration_id = str(integration_id)
+        cached = _integration_cache.get(integration_id)
+        if cached and cached[1] > time.monotonic():
+            _integration_cache.move_to_end(integration_id)
+            return cached[0]
+        generation = _integration_cache_generations.get(integration_id, 0)
+        integration = await self._read_integration_details(integration_id, ttl)
+        if settings.INTEGRATION_CACHE_TTL > 0 and _integration_cache_generations.get(integration_id, 0) == generation:
+            _integration_cache[integration_id] = (integration, time.monotonic() + settings.INTEGRATION_CACHE_TTL)
+            _integration_cache.move_to_end(integration_id)
+            while len(_integration_cache) > settings.INTEGRATION_CACHE_MAX_SIZE:
+                _integration_cache.popitem(last=False)
+        return integration
+
+    async def _read_integration_details(self, integration_id: str, ttl=None) -> Integration:
+        """Read the integration with all its configurations from Redis, or if any
+        of them isn't cached, reload the whole integration from Gundi once."""
+        integration = await self._read_cached_integration_details(integration_id)
+        if integration is None:
+            integration = await self._reload_integration_from_gundi(integration_id, ttl)
+        return integration
+
+    async def _read_cached_integration_details(self, integration_id: str) -> Optional[Integration]:
+        """Read the integration with all its configurations from Redis; None if any key is missing.
+
+        One GET for the summary, then one MGET for the configs of all its actions
+        and its webhook config.
+        """
+        key = self._get_integration_key(integration_id)
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                integration_data = await self.db_client.get(key)
+        if not integration_data:
+            return None
+        integration_summary = IntegrationSummary.parse_raw(integration_data)
+        config_keys = [
+            self._get_action_config_key(integration_id, action.value) for action in integration_summary.type.actions
+        ]
+        config_keys.append(self._get_webhook_config_key(integration_id))
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                *action_configs_data, webhook_config_data = await self.db_client.mget(config_keys)
+        if webhook_config_data is None or any(data is None for data in action_configs_data):
+            return None
+        configurations = [
+            IntegrationActionConfiguration.parse_raw(data)
+            for data in action_configs_data if not _is_absence_sentinel(data)
+        ]
+        webhook_configuration = (
+            None if _is_absence_sentinel(webhook_config_data) else WebhookConfiguration.parse_raw(webhook_config_data)
+        )
         return Integration(
             id=integration_summary.id,
             name=integration_summary.name,
@@ -133,4 +344,35 @@ class IntegrationConfigurationManager:
             additional=integration_summary.additional,
             configurations=configurations,
             webhook_configuration=webhook_configuration
-        )
\ No newline at end of file
+        )
+
+
+async def _warm_up_config_cache():
+    try:
+        await IntegrationConfigurationManager().warm_up_cache(
+            settings.INTEGRATION_TYPE_SLUG, concurrency=settings.CONFIG_CACHE_WARM_UP_CONCURRENCY
+        )
+    except Exception:
+        logger.exception("Error warming up the config cache.")
+
+
+def start_config_cache_warm_up():
+    """Start pre-loading this type's integrations into the config cache in the
+    background (on service startup), if enabled."""
+    global _warm_up
+    if not settings.CONFIG_CACHE_WARM_UP_ON_START or not settings.INTEGRATION_TYPE_SLUG:
+        return
+    if _warm_up is None or _warm_up.done():
+        _warm_up = asyncio.create_task(_warm_up_config_cache())
+
+
+async def stop_config_cache_warm_up():
+    """Cancel the warm-up if it's still running (on service shutdown)."""
+    global _warm_up
+    if _warm_up is not None:
+        _warm_up.cancel()
+        try:
+            await _warm_up
+        except asyncio.CancelledError:
+            pass
+        _warm_up = None
@@ -1,8 +1,60 @@
+import asyncio
 import datetime
-from typing import List
+import json
+import time
+from typing import Dict, List, Optional, Tuple
 import httpx
 import stamina
-from gundi_client_v2.client import GundiClient, GundiDataSenderClient
+from gundi_client_v2.client import GundiClient, GundiDataSenderClient as _GundiDataSenderClient
+from app import settings
+from app.services.send_scheduler import SendScheduler
+
+
+class GundiDataSenderClient(_GundiDataSenderClient):
+    """GundiDataSenderClient that sends through a shared, long-lived httpx client.
+
+    The base client opens a new httpx.AsyncClient (and TLS connection) for every
+    request; this one reuses the connection pool of ``session`` across batches.
+    """
+
+    def __init__(self, integration_api_key: str = None, *, session: httpx.AsyncClient, **kwargs):
+        super().__init__(integration_api_key=integration_api_key, **kwargs)
+        self._session = session
+
+    async def _post_data(self, data: List[dict] = None, endpoint: str = None, attachments: List[tuple] = None) -> dict:
+        request = dict(
+            url=f"{self.sensors_api_endpoint}/{endpoint}/",
+            headers={"apikey": self._api_key},
+        )
+        if data:
+            request["json"] = [json.loads(json.dumps(r, default=str)) for r in data]
+        if attachments:
+            request["files"] = [
+                ('file', (filename, image_binary)) for filename, image_binary in attachments
+            ]
+        response = await self._session.post(**request)
+        response.raise_for_status()
+        return response.json()
+
+    async def _update_data(self, data: dict = None, endpoint: str = None) -> dict:
+        response = await self._session.patch(
+            url=f"{self.sensors_api_endpoint}/{endpoint}/",
+            headers={"apikey": self._api_key},
+            json=json.loads(json.dumps(data, default=str)),
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+# Per-integration API keys: integration_id -> (api_key, expires_at on time.monotonic())
+_api_keys: Dict[str, Tuple[str, float]] = {}
+# In-flight key fetches, so concurrent callers share one portal request
+_api_key_fetches: Dict[str, asyncio.Future] = {}
+# Sender clients, one per integration (keyed with the API key they were built with)
+_sender_clients: Dict[str, Tuple[str, GundiDataSenderClient]] = {}
+_sender_session: Optional[httpx.AsyncClient] = None
+# Sensors-API send schedulers (adaptive concurrency + Retry-After), one per integration
+_send_schedulers: Dict[str, SendScheduler] = {}
 
 
 @stamina.retry(on=httpx.HTTPError, wait_initial=10.0, wait_jitter=10.0, wait_max=300.0)
@@ -13,15 +65,97 @@ async def _get_gundi_api_key(integration_id):
         )
 
 
+async def _get_cached_api_key(integration_id):
+    """Return the integration's API key, fetching it at most once per TTL.
+
+    Concurrent callers on a miss share a single in-flight fetch.
+    """
+    cached = _api_keys.get(integration_id)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    fetch = _api_key_fetches.get(integration_id)
+    if fetch is None:
+        fetch = asyncio.ensure_future(_get_gundi_api_key(integration_id=integration_id))
+        _api_key_fetches[integration_id] = fetch
+
+        def _forget(done, integration_id=integration_id):
+            if _api_key_fetches.get(integration_id) is done:
+                del _api_key_fetches[integration_id]
+        fetch.add_done_callback(_forget)
+    # Shielded: a cancelled caller must not cancel the fetch others wait on
+    api_key = await asyncio.shield(fetch)
+    if api_key and settings.GUNDI_API_KEY_CACHE_TTL > 0:
+        _api_keys[integration_id] = (api_key, time.monotonic() + settings.GUNDI_API_KEY_CACHE_TTL)
+    return api_key
+
+
+def _invalidate_api_key(integration_id):
+    """Forget the integration's API key and sender client (e.g. after a 401)."""
+    _api_keys.pop(integration_id, None)
+    _sender_clients.pop(integration_id, None)
+
+
+def _get_sender_session() -> httpx.AsyncClient:
+    global _sender_session
+    if _sender_session is None:
+        _sender_session = httpx.AsyncClient(timeout=120)
+    return _sender_session
+
+
+def _get_send_scheduler(integration_id) -> SendScheduler:
+    scheduler = _send_schedulers.get(integration_id)
+    if scheduler is None:
+        scheduler = SendScheduler(
+            initial_window=settings.SENSORS_API_INITIAL_CONCURRENCY,
+            max_window=settings.SENSORS_API_MAX_CONCURRENCY,
+        )
+        _send_schedulers[integration_id] = scheduler
+    return scheduler
+
+
+async def close_sender_clients() -> None:
+    """Close the shared sender connection pool and drop cached keys, clients and schedulers."""
+    global _sender_session
+    _api_keys.clear()
+    _sender_clients.clear()
+    _send_schedulers.clear()
+    if _sender_session is not None:
+        await _sender_session.aclose()
+        _sender_session = None
+
+
 async def _get_sensors_api_client(integration_id):
-    gundi_api_key = await _get_gundi_api_key(integration_id=integration_id)
+    gundi_api_key = await _get_cached_api_key(integration_id=integration_id)
     assert gundi_api_key, f"Cannot get a valid API Key for integration {integration_id}"
+    cached = _sender_clients.get(integration_id)
+    if cached and cached[0] == gundi_api_key:
+        return cached[1]
     sensors_api_client = GundiDataSenderClient(
-        integration_api_key=gundi_api_key
+        integration_api_key=gundi_api_key,
+        session=_get_sender_session(),
     )
+    _sender_clients[integration_id] = (gundi_api_key, sensors_api_client)
     return sensors_api_client
 
 
+async def _call_sensors_api(integration_id, method, **kwargs):
+    """Call a sender client method through the integration's send scheduler;
+    on a 401 refresh the API key and try once more.
+
+    A 401 means the cached key was rotated or revoked in the portal.
+    """
+    scheduler = _get_send_scheduler(integration_id)
+    sensors_api_client = await _get_sensors_api_client(integration_id=integration_id)
+    try:
+        return await scheduler.call(lambda: getattr(sensors_api_client, method)(**kwargs))
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != httpx.codes.UNAUTHORIZED:
+            raise
+        _invalidate_api_key(integration_id)
+    sensors_api_client = await _get_sensors_api_client(integration_id=integration_id)
+    return await scheduler.call(lambda: getattr(sensors_api_client, method)(**kwargs))
+
+
 @stamina.retry(on=httpx.HTTPError, wait_initial=10.0, wait_jitter=10.0, wait_max=300.0)
 async def send_events_to_gundi(events: List[dict], **kwargs) -> dict:
     """
@@ -47,8 +181,7 @@ async def send_events_to_gundi(events: List[dict], **kwargs) -> dict:
     """
     integration_id = kwargs.get("integration_id")
     assert integration_id, "integration_id is required"
-    sensors_api_client = await _get_sensors_api_client(integration_id=str(integration_id))
-    return await sensors_api_client.post_events(data=events)
+    return await _call_sensors_api(str(integration_id), "post_events", data=events)
 
 
 @stamina.retry(on=httpx.HTTPError, wait_initial=10.0, wait_jitter=10.0, wait_max=300.0)
@@ -74,8 +207,7 @@ async def update_event_in_gundi(gundi_object_id: str, changes: dict, **kwargs) -
     """
     integration_id = kwargs.get("integration_id")
     assert integration_id, "integration_id is required"
-    sensors_api_client = await _get_sensors_api_client(integration_id=str(integration_id))
-    return await sensors_api_client.update_event(event_id=gundi_object_id, data=changes)
+    return await _call_sensors_api(str(integration_id), "update_event", event_id=gundi_object_id, data=changes)
 
 
 @stamina.retry(on=httpx.HTTPError, wait_initial=10.0, wait_jitter=10.0, wait_max=300.0)
@@ -92,8 +224,9 @@ async def send_event_attachments_to_gundi(event_id: str, attachments: List[tuple
     """
     integration_id = kwargs.get("integration_id")
     assert integration_id, "integration_id is required"
-    sensors_api_client = await _get_sensors_api_client(integration_id=str(integration_id))
-    return await sensors_api_client.post_event_attachments(event_id=event_id, attachments=attachments)
+    return await _call_sensors_api(
+        str(integration_id), "post_event_attachments", event_id=event_id, attachments=attachments
+    )
 
 
 @stamina.retry(on=httpx.HTTPError, wait_initial=10.0, wait_jitter=10.0, wait_max=300.0)
@@ -122,8 +255,7 @@ async def send_observations_to_gundi(observations: List[dict], **kwargs) -> dict
     """
     integration_id = kwargs.get("integration_id")
     assert integration_id, "integration_id is required"
-    sensors_api_client = await _get_sensors_api_client(integration_id=str(integration_id))
-    return await sensors_api_client.post_observations(data=observations)
+    return await _call_sensors_api(str(integration_id), "post_observations", data=observations)
 
 
 @stamina.retry(on=httpx.HTTPError, wait_initial=10.0, wait_jitter=10.0, wait_max=300.0)
@@ -160,5 +292,4 @@ async def send_messages_to_gundi(messages: List[dict], **kwargs) -> dict:
     """
     integration_id = kwargs.get("integration_id")
     assert integration_id, "integration_id is required"
-    sensors_api_client = await _get_sensors_api_client(integration_id=str(integration_id))
-    return await sensors_api_client.post_messages(data=messages)
+    return await _call_sensors_api(str(integration_id), "post_messages", data=messages)
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+import httpx
+from app import settings
+
+logger = logging.getLogger(__name__)
+
+
+OUTBOX_DRAIN_BATCH = 50           # items delivered per drain pass
+OUTBOX_BACKOFF_INITIAL = 60.0     # seconds before the first redelivery of an item
+OUTBOX_BACKOFF_MAX = 60.0 * 60    # longest wait between redeliveries of an item
+
+
+def is_transient_send_error(error: BaseException) -> bool:
+    """Whether a failed sensors-API send is worth keeping for redelivery.
+
+    Connection problems, 429s and 5xx are outages that pass; any other 4xx means
+    the request itself is wrong and would fail again.
+    """
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == httpx.codes.TOO_MANY_REQUESTS or status >= 500
+    return False
+
+
+class GundiOutbox:
+    """Disk-backed (SQLite) queue of sensors-API sends that could not be delivered.
+
+    Items are keyed by integration and ``kind``; a kind names the delivery
+    function (see ``outbox_delivery``) that sends the item's JSON payload.
+    SQLite calls are blocking, so they run in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " integration_id TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS outbox_integration ON outbox (integration_id)")
+            self._db = db
+        return self._db
+
+    def _execute(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    async def put(self, integration_id: str, kind: str, payload: dict, *, delay: float = 0.0):
+        now = time.time()
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO outbox (integration_id, kind, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+            (str(integration_id), kind, json.dumps(payload, default=str), now + delay, now),
+        )
+
+    async def depth(self, integration_id: str) -> int:
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT COUNT(*) FROM outbox WHERE integration_id = ?", (str(integration_id),)
+        )
+        return rows[0][0]
+
+    async def due(self, limit: int) -> List[dict]:
+        """The oldest items whose next delivery attempt is due.
+
+        Items of one integration and kind are delivered in order: an item isn't
+        due while an older one of its integration and kind is still backing off.
+        """
+        now = time.time()
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT id, integration_id, kind, payload, attempts FROM outbox"
+            " WHERE next_attempt_at <= ? AND NOT EXISTS ("
+            "  SELECT 1 FROM outbox AS older WHERE older.integration_id = outbox.integration_id"
+            "  AND older.kind = outbox.kind AND older.id < outbox.id AND older.next_attempt_at > ?)"
+            " ORDER BY id LIMIT ?",
+            (now, now, limit),
+        )
+        return [
+            {"id": id_, "integration_id": integration_id, "kind": kind, "payload": json.loads(payload), "attempts": attempts}
+            for id_, integration_id, kind, payload, attempts in rows
+        ]
+
+    async def delete(self, item_id: int):
+        await asyncio.to_thread(self._execute, "DELETE FROM outbox WHERE id = ?", (item_id,))
+
+    async def reschedule(self, item_id: int, *, attempts: int, delay: float):
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE outbox SET attempts = ?, next_attempt_at = ? WHERE id = ?",
+            (attempts, time.time() + delay, item_id),
+        )
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# kind -> async deliver(integration_id, payload); registered by the actions that enqueue that kind
+_deliveries: Dict[str, Callable[[str, dict], Awaitable]] = {}
+_outbox: Optional[GundiOutbox] = None
+_drainer: Optional[asyncio.Task] = None
+
+
+def outbox_delivery(kind: str):
+    """Register the function that redelivers outbox items of ``kind``."""
+    def decorator(func):
+        _deliveries[kind] = func
+        return func
+    return decorator
+
+
+def get_outbox() -> GundiOutbox:
+    global _outbox
+    if _outbox is None:
+        _outbox = GundiOutbox(settings.GUNDI_OUTBOX_PATH)
+    return _outbox
+
+
+async def enqueue(integration_id: str, kind: str, payload: dict):
+    """Keep a send that failed with a transient error for later delivery."""
+    await get_outbox().put(integration_id, kind, payload)
+
+
+async def outbox_depth(integration_id: str) -> int:
+    """Number of the integration's sends waiting in the outbox."""
+    return await get_outbox().depth(integration_id)
+
+
+async def drain_outbox(limit: int = OUTBOX_DRAIN_BATCH) -> int:
+    """Try to deliver the due outbox items once. Returns how many were delivered.
+
+    An item that fails transiently again is retried later with exponential
+    backoff; one that fails permanently (e.g. a 400) is dropped and logged.
+    """
+    outbox = get_outbox()
+    delivered = 0
+    held_back = set()  # (integration_id, kind) with an item that failed in this pass
+    for item in await outbox.due(limit):
+        deliver = _deliveries.get(item["kind"])
+        if deliver is None:
+            continue  # Its action isn't loaded in this process
+        key = (item["integration_id"], item["kind"])
+        if key in held_back:
+            continue  # Keep its items in order
+        try:
+            await deliver(item["integration_id"], item["payload"])
+        except Exception as e:
+            if not is_transient_send_error(e):
+                logger.error(
+                    f"Dropping outbox item {item['id']} ({item['kind']}) of integration {item['integration_id']}: {e}",
+                    extra={"attention_needed": True},
+                )
+                await outbox.delete(item["id"])
+                continue
+            attempts = item["attempts"] + 1
+            delay = min(OUTBOX_BACKOFF_INITIAL * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX)
+            logger.warning(
+                f"Outbox item {item['id']} ({item['kind']}) of integration {item['integration_id']} "
+                f"failed again ({e}); next attempt in {delay:.0f}s."
+            )
+            await outbox.reschedule(item["id"], attempts=attempts, delay=delay)
+            held_back.add(key)
+            continue
+        await outbox.delete(item["id"])
+        delivered += 1
+    return delivered
+
+
+async def _drain_forever():
+    while True:
+        try:
+            while await drain_outbox() == OUTBOX_DRAIN_BATCH:
+                pass  # More may be due
+        except Exception:
+            logger.exception("Error draining the Gundi outbox.")
+        await asyncio.sleep(settings.GUNDI_OUTBOX_DRAIN_INTERVAL_SECONDS)
+
+
+def start_outbox_drainer():
+    """Start the background task that drains the outbox (on service startup)."""
+    global _drainer
+    if _drainer is None or _drainer.done():
+        _drainer = asyncio.create_task(_drain_forever())
+
+
+async def stop_outbox_drainer():
+    """Stop the drainer and close the outbox database (on service shutdown)."""
+    global _drainer, _outbox
+    if _drainer is not None:
+        _drainer.cancel()
+        try:
+            await _drainer
+        except asyncio.CancelledError:
+            pass
+        _drainer = None
+    if _outbox is not None:
+        _outbox.close()
+        _outbox = None
@@ -0,0 +1,147 @@
+import asyncio
+import email.utils
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+THROTTLE_BACKOFF_MAX = 30.0   # Longest wait between throttled attempts when the API sends no Retry-After
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (delta-seconds or HTTP-date), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class SendScheduler:
+    """Admits requests to the Gundi sensors API through an AIMD concurrency window.
+
+    The window grows by about one request per round trip while responses are
+    2xx (additive increase), and halves on an explicit congestion signal: a
+    429 or 503, a timeout or a connection error (multiplicative decrease), at
+    most once per round of requests. Slow responses alone don't shrink it, as
+    latency varies with the endpoint and batch size. A ``Retry-After`` on a
+    429/503 pauses every send through the scheduler until it has passed.
+
+    ``call()`` also retries throttled (429/503) requests itself, up to
+    ``max_throttle_attempts``, waiting ``Retry-After`` or a short backoff
+    instead of the callers' much longer retry policy. Any other error, or a
+    throttle that outlasts those attempts, is raised to the caller.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_window: float,
+        max_window: float,
+        min_window: float = 1.0,
+        max_throttle_attempts: int = 5,
+    ):
+        self.min_window = min_window
+        self.max_window = max_window
+        self.window = min(max(initial_window, min_window), max_window)
+        self.max_throttle_attempts = max_throttle_attempts
+        self._in_flight = 0
+        self._resume_at = 0.0  # time.monotonic() before which nothing is sent (Retry-After)
+        self._last_decrease = 0.0
+        self._waiters = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self.window)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def call(self, send: Callable[[], Awaitable]):
+        attempt = 0
+        while True:
+            attempt += 1
+            await self._acquire()
+            started = time.monotonic()
+            try:
+                result = await send()
+            except httpx.HTTPStatusError as e:
+                self._release()
+                status = e.response.status_code
+                if status not in (httpx.codes.TOO_MANY_REQUESTS, httpx.codes.SERVICE_UNAVAILABLE):
+                    raise
+                retry_after = parse_retry_after(e.response)
+                self._on_congestion(started, retry_after=retry_after)
+                if attempt >= self.max_throttle_attempts:
+                    raise
+                logger.warning(
+                    f"Sensors API throttled the request ({status}), attempt {attempt}/{self.max_throttle_attempts}. "
+                    f"Concurrency window: {self.limit}."
+                )
+                if retry_after is None:
+                    await asyncio.sleep(min(2.0 ** (attempt - 1), THROTTLE_BACKOFF_MAX))
+            except httpx.TransportError:  # Timeouts and connection errors
+                self._release()
+                self._on_congestion(started)
+                raise
+            except BaseException:
+                self._release()
+                raise
+            else:
+                self._release()
+                self._on_success()
+                return result
+
+    async def _acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def _release(self):
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        # Waiters re-check the window themselves, so waking them all is safe
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _on_success(self):
+        self.window = min(self.max_window, self.window + 1.0 / self.window)
+        self._wake()
+
+    def _on_congestion(self, started: float, retry_after: Optional[float] = None):
+        if retry_after is not None:
+            self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+        # Requests already in flight when the window shrank report the same congestion; count it once
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.window = max(self.min_window, self.window / 2)
@@ -2,6 +2,7 @@ import json
 import stamina
 import httpx
 import redis.asyncio as redis
+from typing import Dict, Iterable, Optional
 from app import settings
 
 
@@ -20,6 +21,24 @@ class IntegrationStateManager:
         value = json.loads(json_value) if json_value else {}
         return value
 
+    async def get_states(self, integration_id: str, action_id: str, source_ids: Iterable[str]) -> Dict[str, dict]:
+        """Fetch the state of many sources of one action in a single MGET round trip.
+
+        Returns a dict keyed by source_id. Sources without a stored state map to
+        an empty dict, exactly as get_state() would return for them.
+        """
+        source_ids = list(dict.fromkeys(source_ids))  # Dedupe, keep order
+        if not source_ids:
+            return {}
+        keys = [f"integration_state.{integration_id}.{action_id}.{source_id}" for source_id in source_ids]
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                json_values = await self.db_client.mget(keys)
+        return {
+            source_id: json.loads(json_value) if json_value else {}
+            for source_id, json_value in zip(source_ids, json_values)
+        }
+
     async def set_state(self, integration_id: str, action_id: str, state: dict, source_id: str = "no-source"):
         for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
             with attempt:
@@ -28,6 +47,21 @@ class IntegrationStateManager:
                     json.dumps(state, default=str)
                 )
 
+    async def set_states(self, integration_id: str, action_id: str, states: Dict[str, dict]):
+        """Write the state of many sources of one action in a single MSET round trip.
+
+        MSET is atomic in Redis, so readers see either none or all of the states.
+        """
+        if not states:
+            return
+        mapping = {
+            f"integration_state.{integration_id}.{action_id}.{source_id}": json.dumps(state, default=str)
+            for source_id, state in states.items()
+        }
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                await self.db_client.mset(mapping)
+
     async def set_if_absent(
         self, integration_id: str, action_id: str, *, ttl_seconds: int, source_id: str = "no-source"
     ) -> bool:
@@ -55,8 +89,92 @@ class IntegrationStateManager:
                     f"integration_state.{integration_id}.{action_id}.{source_id}"
                 )
 
+    async def get_cached(self, key: str) -> Optional[dict]:
+        """Read a shared cache entry (not tied to one integration). Returns None on a miss."""
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                json_value = await self.db_client.get(f"cache.{key}")
+        return json.loads(json_value) if json_value else None
+
+    async def set_cached(self, key: str, value: dict, *, ttl_seconds: int):
+        """Write a shared cache entry that expires after ttl_seconds."""
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                await self.db_client.set(f"cache.{key}", json.dumps(value, default=str), ex=ttl_seconds)
+
+    async def get_cached_many(self, keys: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Read many shared cache entries in a single MGET round trip.
+
+        Returns a dict keyed like ``keys``; misses map to None.
+        """
+        keys = list(dict.fromkeys(keys))  # Dedupe, keep order
+        if not keys:
+            return {}
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                json_values = await self.db_client.mget([f"cache.{key}" for key in keys])
+        return {
+            key: json.loads(json_value) if json_value else None
+            for key, json_value in zip(keys, json_values)
+        }
+
+    async def set_cached_many(self, values: Dict[str, dict], *, ttl_seconds: int):
+        """Write many shared cache entries, each expiring after ttl_seconds, in one pipelined round trip."""
+        if not values:
+            return
+        for attempt in stamina.retry_context(on=redis.RedisError, attempts=5, wait_initial=1.0, wait_max=30, wait_jitter=3.0):
+            with attempt:
+                async with self.db_client.pipeline(transaction=False) as pipe:
+                    for key, value in values.items():
+                        pipe.set(f"cache.{key}", json.dumps(value, default=str), ex=ttl_seconds)
+                    await pipe.execute()
+
     def __str__(self):
         return f"IntegrationStateManager(host={self.db_client.host}, port={self.db_client.port}, db={self.db_client.db})"
 
     def __repr__(self):
         return self.__str__()
+
+
+class StateWriteBuffer:
+    """Write-behind buffer for the states of one integration action.
+
+    set_state() only records the latest state per source in memory; flush()
+    writes everything pending with a single IntegrationStateManager.set_states()
+    call. Callers flush at their own checkpoints (e.g. page or unit boundaries,
+    and before returning), so Redis latency is paid once per checkpoint instead
+    of once per record. Anything recorded after the work it describes (e.g. a
+    Gundi post) keeps the at-least-once ordering: a crash before the flush only
+    means that work is redone.
+    """
+
+    def __init__(self, state_manager: IntegrationStateManager, integration_id: str, action_id: str):
+        self.state_manager = state_manager
+        self.integration_id = integration_id
+        self.action_id = action_id
+        self._pending: Dict[str, dict] = {}
+
+    def set_state(self, state: dict, source_id: str = "no-source"):
+        self._pending[source_id] = state  # Last write per source wins
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            await self.state_manager.set_states(
+                integration_id=self.integration_id,
+                action_id=self.action_id,
+                states=pending,
+            )
+        except Exception:
+            # Keep the states (unless newer ones were recorded meanwhile) so a later flush retries them
+            self._pending = {**pending, **self._pending}
+            raise
+
+    def get(self, source_id: str = "no-source") -> Optional[dict]:
+        """The state recorded for ``source_id`` since the last flush, if any."""
+        return self._pending.get(source_id)
+
+    def __len__(self):
+        return len(self._pending)
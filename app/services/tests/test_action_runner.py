@@ -19,6 +19,23 @@ from app.services.errors import IntegrationAuthError
 api_client = TestClient(app)
 
 
+@pytest.fixture
+def serve_action_config(mock_config_manager, integration_v2):
+    """Make the integration served by ``mock_config_manager`` carry the given
+    config data for an action (or no config for it, with ``data=None``)."""
+    def serve(action_id, data):
+        base = integration_v2.configurations[0]
+        configurations = [c for c in integration_v2.configurations if c.action.value != action_id]
+        if data is not None:
+            configurations.append(
+                base.copy(update={"action": base.action.copy(update={"value": action_id}), "data": data})
+            )
+        mock_config_manager.get_integration_details.return_value = async_return(
+            integration_v2.copy(update={"configurations": configurations})
+        )
+    return serve
+
+
 def _published_events_of_type(mock_publish_event, event_type):
     """Collect events of a given type passed to a mocked publish_event.
 
@@ -67,7 +84,8 @@ async def test_execute_pull_action_from_pubsub(
 @pytest.mark.asyncio
 async def test_execute_push_action_from_pubsub(
         mocker, mock_gundi_client_v2, mock_publish_event, mock_action_handlers, mock_config_manager,
-        pubsub_message_request_headers, run_push_action_pubsub_payload, mock_push_observations_handler
+        pubsub_message_request_headers, run_push_action_pubsub_payload, mock_push_observations_handler,
+        integration_v2, serve_action_config,
 ):
     mocker.patch("app.services.action_runner.action_handlers", mock_action_handlers)
     mocker.patch("app.actions.action_handlers", mock_action_handlers)
@@ -75,6 +93,7 @@ async def test_execute_push_action_from_pubsub(
     mocker.patch("app.services.action_runner.config_manager", mock_config_manager)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    serve_action_config("push_observations", integration_v2.configurations[0].data)
 
     response = api_client.post(
         "/push-data",
@@ -163,6 +182,9 @@ async def test_execute_action_from_api_with_config_overrides(
     for k, v in config_overrides.items():
         config = mock_action_handler.call_args.kwargs["action_config"]
         assert getattr(config, k) == v
+    # The config comes from the (shared, cached) integration, which the overrides leave untouched
+    assert not mock_config_manager.get_action_configuration.called
+    assert integration_v2.get_action_config("pull_observations").data.get("lookback_days") != 3
 
 
 @pytest.mark.asyncio
@@ -225,7 +247,7 @@ async def test_manual_pull_action_with_invalid_config_still_errors(
 @pytest.mark.asyncio
 async def test_triggered_by_marker_is_case_insensitive(
         mocker, mock_gundi_client_v2, integration_v2, mock_config_manager,
-        mock_publish_event, mock_action_handlers, pubsub_message_request_headers,
+        mock_publish_event, mock_action_handlers, serve_action_config, pubsub_message_request_headers,
 ):
     # A mixed-case "MANUAL" marker must be honored as a manual run (strict), not
     # silently fall through to the automated default. With an invalid config that
@@ -235,9 +257,7 @@ async def test_triggered_by_marker_is_case_insensitive(
     mocker.patch("app.services.action_runner.config_manager", mock_config_manager)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
-    bad_config = mocker.MagicMock()
-    bad_config.data = {"lookback_days": "two"}  # should be an integer
-    mock_config_manager.get_action_configuration.return_value = async_return(bad_config)
+    serve_action_config("pull_observations", {"lookback_days": "two"})  # should be an integer
     encoded = base64.b64encode(json.dumps({
         "integration_id": str(integration_v2.id),
         "action_id": "pull_observations",
@@ -259,7 +279,7 @@ async def test_triggered_by_marker_is_case_insensitive(
 @pytest.mark.asyncio
 async def test_scheduled_pull_action_with_invalid_config_is_skipped(
         mocker, mock_gundi_client_v2, mock_config_manager, mock_publish_event,
-        mock_action_handlers, mock_state_manager, pubsub_message_request_headers,
+        mock_action_handlers, serve_action_config, mock_state_manager, pubsub_message_request_headers,
         run_pull_action_pubsub_payload,
 ):
     # A scheduled (PubSub, no triggered_by → automated) pull whose stored config
@@ -272,9 +292,7 @@ async def test_scheduled_pull_action_with_invalid_config_is_skipped(
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
     mock_state_manager.set_if_absent.return_value = async_return(True)  # window open
-    bad_config = mocker.MagicMock()
-    bad_config.data = {"lookback_days": "two"}  # should be an integer
-    mock_config_manager.get_action_configuration.return_value = async_return(bad_config)
+    serve_action_config("pull_observations", {"lookback_days": "two"})  # should be an integer
 
     response = api_client.post(
         "/", headers=pubsub_message_request_headers, json=run_pull_action_pubsub_payload,
@@ -293,7 +311,7 @@ async def test_scheduled_pull_action_with_invalid_config_is_skipped(
 @pytest.mark.asyncio
 async def test_scheduled_pull_action_invalid_config_warning_is_throttled(
         mocker, mock_gundi_client_v2, mock_config_manager, mock_publish_event,
-        mock_action_handlers, mock_state_manager, pubsub_message_request_headers,
+        mock_action_handlers, serve_action_config, mock_state_manager, pubsub_message_request_headers,
         run_pull_action_pubsub_payload,
 ):
     # When the throttle window is closed (set_if_absent → False), the skip is
@@ -306,9 +324,7 @@ async def test_scheduled_pull_action_invalid_config_warning_is_throttled(
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
     mock_state_manager.set_if_absent.return_value = async_return(False)  # window closed
-    bad_config = mocker.MagicMock()
-    bad_config.data = {"lookback_days": "two"}
-    mock_config_manager.get_action_configuration.return_value = async_return(bad_config)
+    serve_action_config("pull_observations", {"lookback_days": "two"})
 
     response = api_client.post(
         "/", headers=pubsub_message_request_headers, json=run_pull_action_pubsub_payload,
@@ -324,7 +340,7 @@ async def test_scheduled_pull_action_invalid_config_warning_is_throttled(
 @pytest.mark.asyncio
 async def test_scheduled_pull_action_invalid_config_skip_survives_throttle_failure(
         mocker, mock_gundi_client_v2, mock_config_manager, mock_publish_event,
-        mock_action_handlers, mock_state_manager, pubsub_message_request_headers,
+        mock_action_handlers, serve_action_config, mock_state_manager, pubsub_message_request_headers,
         run_pull_action_pubsub_payload,
 ):
     # If the throttle store (Redis) is unavailable, the skip must not crash the
@@ -337,9 +353,7 @@ async def test_scheduled_pull_action_invalid_config_skip_survives_throttle_failu
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
     mock_state_manager.set_if_absent.side_effect = Exception("redis unavailable")
-    bad_config = mocker.MagicMock()
-    bad_config.data = {"lookback_days": "two"}
-    mock_config_manager.get_action_configuration.return_value = async_return(bad_config)
+    serve_action_config("pull_observations", {"lookback_days": "two"})
 
     response = api_client.post(
         "/", headers=pubsub_message_request_headers, json=run_pull_action_pubsub_payload,
@@ -358,7 +372,7 @@ async def test_scheduled_pull_action_invalid_config_skip_survives_throttle_failu
 @pytest.mark.asyncio
 async def test_scheduled_pull_action_with_missing_config_is_skipped(
         mocker, mock_gundi_client_v2, mock_config_manager, mock_publish_event,
-        mock_action_handlers, pubsub_message_request_headers, run_pull_action_pubsub_payload,
+        mock_action_handlers, serve_action_config, pubsub_message_request_headers, run_pull_action_pubsub_payload,
 ):
     # Destination-only integrations have pull actions scheduled type-wide but no
     # pull config at all — an expected, quiet no-op: local log only, NO portal
@@ -368,7 +382,7 @@ async def test_scheduled_pull_action_with_missing_config_is_skipped(
     mocker.patch("app.services.action_runner.config_manager", mock_config_manager)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
-    mock_config_manager.get_action_configuration.return_value = async_return(None)
+    serve_action_config("pull_observations", None)
 
     response = api_client.post(
         "/", headers=pubsub_message_request_headers, json=run_pull_action_pubsub_payload,
@@ -384,7 +398,7 @@ async def test_scheduled_pull_action_with_missing_config_is_skipped(
 @pytest.mark.asyncio
 async def test_scheduled_pull_action_skipped_when_run_on_schedule_disabled(
         mocker, mock_gundi_client_v2, mock_config_manager, mock_publish_event,
-        mock_action_handlers, pubsub_message_request_headers, run_pull_action_pubsub_payload,
+        mock_action_handlers, serve_action_config, pubsub_message_request_headers, run_pull_action_pubsub_payload,
 ):
     # A valid config with run_on_schedule off pauses scheduled execution — also
     # a quiet, local-log-only skip with no portal activity-feed event.
@@ -393,9 +407,7 @@ async def test_scheduled_pull_action_skipped_when_run_on_schedule_disabled(
     mocker.patch("app.services.action_runner.config_manager", mock_config_manager)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
-    paused_config = mocker.MagicMock()
-    paused_config.data = {"lookback_days": 10, "run_on_schedule": False}
-    mock_config_manager.get_action_configuration.return_value = async_return(paused_config)
+    serve_action_config("pull_observations", {"lookback_days": 10, "run_on_schedule": False})
 
     response = api_client.post(
         "/", headers=pubsub_message_request_headers, json=run_pull_action_pubsub_payload,
@@ -411,7 +423,7 @@ async def test_scheduled_pull_action_skipped_when_run_on_schedule_disabled(
 @pytest.mark.asyncio
 async def test_manual_pull_action_runs_even_when_run_on_schedule_disabled(
         mocker, mock_gundi_client_v2, integration_v2, mock_config_manager,
-        mock_publish_event, mock_action_handlers,
+        mock_publish_event, mock_action_handlers, serve_action_config,
 ):
     # The pause toggle only gates scheduled runs — a manual /execute still runs.
     mocker.patch("app.services.action_runner.action_handlers", mock_action_handlers)
@@ -419,9 +431,7 @@ async def test_manual_pull_action_runs_even_when_run_on_schedule_disabled(
     mocker.patch("app.services.action_runner.config_manager", mock_config_manager)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
-    paused_config = mocker.MagicMock()
-    paused_config.data = {"lookback_days": 10, "run_on_schedule": False}
-    mock_config_manager.get_action_configuration.return_value = async_return(paused_config)
+    serve_action_config("pull_observations", {"lookback_days": 10, "run_on_schedule": False})
 
     response = api_client.post(
         "/v1/actions/execute/",
@@ -439,7 +449,7 @@ async def test_manual_pull_action_runs_even_when_run_on_schedule_disabled(
 @pytest.mark.asyncio
 async def test_non_pull_action_still_errors_on_invalid_config(
         mocker, mock_gundi_client_v2, integration_v2, mock_config_manager,
-        mock_publish_event, mock_action_handlers,
+        mock_publish_event, mock_action_handlers, serve_action_config,
 ):
     # The skip-on-invalid behavior is scoped to pull actions only — a non-pull
     # (here InternalActionConfiguration) action with a bad config still 422s.
@@ -448,9 +458,7 @@ async def test_non_pull_action_still_errors_on_invalid_config(
     mocker.patch("app.services.action_runner.config_manager", mock_config_manager)
     mocker.patch("app.services.activity_logger.publish_event", mock_publish_event)
     mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
-    bad_config = mocker.MagicMock()
-    bad_config.data = {"start_datetime": "not-a-datetime", "end_datetime": "also-bad"}
-    mock_config_manager.get_action_configuration.return_value = async_return(bad_config)
+    serve_action_config("pull_observations_by_date", {"start_datetime": "not-a-datetime", "end_datetime": "also-bad"})
 
     response = api_client.post(
         "/v1/actions/execute/",
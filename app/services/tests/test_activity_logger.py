@@ -11,7 +11,8 @@ from gundi_core.events import (
     IntegrationWebhookFailed
 )
 from app import settings
-from app.services.activity_logger import publish_event, activity_logger, webhook_activity_logger, log_activity
+from app.services.activity_logger import publish_event, activity_logger, webhook_activity_logger, log_activity, \
+    close_publisher
 from app.services.errors import IntegrationAuthError
 from app.webhooks import GenericJsonPayload, GenericJsonTransformConfig
 
@@ -34,6 +35,7 @@ async def test_publish_event(
         event=system_event,
         topic_name=settings.INTEGRATION_EVENTS_TOPIC
     )
+    await close_publisher()
 
     assert response == gcp_pubsub_publish_response
     assert mock_pubsub_client.PublisherClient.called
@@ -46,6 +48,161 @@ async def test_publish_event(
     )
 
 
+@pytest.mark.asyncio
+async def test_publish_event_reuses_one_publisher(
+        mocker, mock_pubsub_client, action_started_event, action_complete_event
+):
+    mocker.patch("app.services.activity_logger.pubsub", mock_pubsub_client)
+
+    for event in (action_started_event, action_complete_event, action_complete_event):
+        await publish_event(event=event, topic_name=settings.INTEGRATION_EVENTS_TOPIC)
+    await close_publisher()
+
+    assert mock_pubsub_client.PublisherClient.call_count == 1
+    assert mock_pubsub_client.PublisherClient.return_value.publish.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_queued_events_are_published_in_batches_per_topic(
+        mocker, action_started_event, action_complete_event
+):
+    from app.services import activity_logger
+    publish_events = mocker.patch("app.services.activity_logger.publish_events", return_value={})
+    mocker.patch("app.services.activity_logger.PUBLISH_FLUSH_INTERVAL_SECONDS", 0)
+    activity_logger.start_publish_queue()
+
+    await publish_event(event=action_started_event, topic_name="events-topic")
+    await publish_event(event=action_complete_event, topic_name="events-topic")
+    await publish_event(event=action_started_event, topic_name="other-topic")
+    assert not publish_events.called  # Nothing waits for PubSub
+    await activity_logger.stop_publish_queue()
+
+    assert publish_events.call_args_list == [
+        mocker.call([action_started_event, action_complete_event], "events-topic"),
+        mocker.call([action_started_event], "other-topic"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_publish_queue_drops_events_when_full(mocker, action_started_event):
+    from app.services.activity_logger import EventPublishQueue
+    publish_events = mocker.patch("app.services.activity_logger.publish_events", return_value={})
+    queue = EventPublishQueue(max_size=2, block_when_full=False, max_batch=100, flush_interval=0)
+
+    for _ in range(3):
+        await queue.put(action_started_event, "events-topic")
+    queue.start()
+    await queue.close(timeout=1)
+
+    assert queue.dropped == 1
+    assert publish_events.call_args.args == ([action_started_event] * 2, "events-topic")
+
+
+@pytest.mark.asyncio
+async def test_publish_queue_blocks_when_full_and_splits_large_batches(mocker, action_started_event):
+    from app.services.activity_logger import EventPublishQueue
+    publish_events = mocker.patch("app.services.activity_logger.publish_events", return_value={})
+    queue = EventPublishQueue(max_size=2, block_when_full=True, max_batch=2, flush_interval=0)
+    queue.start()
+
+    for _ in range(5):
+        await queue.put(action_started_event, "events-topic")
+    await queue.close(timeout=1)
+
+    assert queue.dropped == 0
+    assert sum(len(c.args[0]) for c in publish_events.call_args_list) == 5
+    assert all(len(c.args[0]) <= 2 for c in publish_events.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_publish_queue_bounds_the_size_of_each_request(mocker, action_started_event):
+    from app.services.activity_logger import EventPublishQueue, _publish_request_size
+    publish_events = mocker.patch("app.services.activity_logger.publish_events", return_value={})
+    queue = EventPublishQueue(
+        max_size=10, block_when_full=False, max_batch=100, flush_interval=0,
+        max_batch_bytes=2 * _publish_request_size(action_started_event),
+    )
+
+    for _ in range(5):
+        await queue.put(action_started_event, "events-topic")
+    queue.start()
+    await queue.close(timeout=1)
+
+    assert [len(c.args[0]) for c in publish_events.call_args_list] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_publish_queue_splits_a_rejected_request_to_drop_only_what_pubsub_refuses(
+        mocker, action_started_event, action_complete_event
+):
+    from app.services.activity_logger import EventPublishQueue, PublishRejectedError
+    published = []
+
+    async def publish(events, topic_name):
+        if action_complete_event in events:  # e.g. a message too large for PubSub
+            raise PublishRejectedError("400 Bad Request")
+        published.extend(events)
+
+    mocker.patch("app.services.activity_logger.publish_events", side_effect=publish)
+    queue = EventPublishQueue(max_size=10, block_when_full=False, max_batch=100, flush_interval=0)
+
+    for event in [action_started_event] * 3 + [action_complete_event] + [action_started_event] * 2:
+        await queue.put(event, "events-topic")
+    queue.start()
+    await queue.close(timeout=1)
+
+    assert published == [action_started_event] * 5
+
+
+@pytest.mark.asyncio
+async def test_publish_events_does_not_retry_a_rejected_request(mocker, mock_pubsub_client, action_started_event):
+    import aiohttp
+    from app.services.activity_logger import PublishRejectedError, publish_events
+    mocker.patch("app.services.activity_logger.pubsub", mock_pubsub_client)
+    publish = mock_pubsub_client.PublisherClient.return_value.publish
+    publish.side_effect = aiohttp.ClientResponseError(mocker.MagicMock(), (), status=400)
+
+    with pytest.raises(PublishRejectedError):
+        await publish_events([action_started_event], settings.INTEGRATION_EVENTS_TOPIC)
+    await close_publisher()
+
+    assert publish.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_publish_queue_close_gives_up_when_publishing_is_stuck(mocker, action_started_event):
+    import asyncio
+    from app.services.activity_logger import EventPublishQueue
+    async def publish_forever(*args):
+        await asyncio.Event().wait()
+
+    mocker.patch("app.services.activity_logger.publish_events", side_effect=publish_forever)
+    queue = EventPublishQueue(max_size=1, block_when_full=False, max_batch=100, flush_interval=0)
+    queue.start()
+    await queue.put(action_started_event, "events-topic")
+    await asyncio.sleep(0.01)  # The flusher takes it and gets stuck publishing it
+    await queue.put(action_started_event, "events-topic")  # The queue is full now
+
+    await asyncio.wait_for(queue.close(timeout=0.05), 1)
+
+    assert queue._task.done()
+
+
+@pytest.mark.asyncio
+async def test_publish_event_with_wait_bypasses_the_queue(mocker, action_started_event, gcp_pubsub_publish_response):
+    from app.services import activity_logger
+    publish_events = mocker.patch(
+        "app.services.activity_logger.publish_events", return_value=gcp_pubsub_publish_response
+    )
+    activity_logger.start_publish_queue()
+
+    response = await publish_event(action_started_event, "commands-topic", wait=True)
+
+    assert response == gcp_pubsub_publish_response
+    publish_events.assert_called_once_with([action_started_event], "commands-topic")
+    await activity_logger.stop_publish_queue()
+
+
 @pytest.mark.asyncio
 async def test_activity_logger_decorator(
         mocker, mock_publish_event, integration_v2, pull_observations_config
@@ -0,0 +1,245 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import ActionAdmissionScheduler, AdmissionTimeoutError
+
+
+async def _run(scheduler, integration_id, action_id, started, release):
+    async with scheduler.admit(integration_id, action_id):
+        started.append((integration_id, action_id))
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_running_actions_are_capped_in_total_and_per_integration():
+    scheduler = ActionAdmissionScheduler(max_running=3, max_per_integration=2)
+    started, release = [], asyncio.Event()
+
+    runs = [asyncio.create_task(_run(scheduler, "a", "pull_events", started, release)) for _ in range(3)]
+    runs += [asyncio.create_task(_run(scheduler, "b", "pull_events", started, release)) for _ in range(2)]
+    await _settle()
+
+    assert started == [("a", "pull_events"), ("a", "pull_events"), ("b", "pull_events")]
+    assert scheduler.running == 3
+    assert scheduler.queue_depth == 2
+    release.set()
+    await asyncio.gather(*runs)
+    assert scheduler.running == 0
+    assert scheduler.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_integrations_take_turns():
+    scheduler = ActionAdmissionScheduler(max_running=1, max_per_integration=1)
+    order, gates = [], {}
+
+    async def run(integration_id, n):
+        async with scheduler.admit(integration_id, "pull_observations"):
+            order.append(f"{integration_id}{n}")
+            await gates[f"{integration_id}{n}"].wait()
+
+    names = [("a", n) for n in range(3)] + [("b", n) for n in range(2)]
+    gates.update({f"{i}{n}": asyncio.Event() for i, n in names})
+    runs = [asyncio.create_task(run(i, n)) for i, n in names]
+    await _settle()
+    for _ in names:
+        gates[order[-1]].set()
+        await _settle()
+    await asyncio.gather(*runs)
+
+    # The backfilling integration "a" doesn't hold "b" back until it's done
+    assert order == ["a0", "b0", "a1", "b1", "a2"]
+
+
+@pytest.mark.asyncio
+async def test_action_cap_does_not_block_other_actions_of_the_integration():
+    scheduler = ActionAdmissionScheduler(
+        max_running=4, max_per_integration=4, max_per_action={"pull_observations": 1}
+    )
+    started, release = [], asyncio.Event()
+
+    runs = [
+        asyncio.create_task(_run(scheduler, "a", action_id, started, release))
+        for action_id in ("pull_observations", "pull_observations", "pull_events")
+    ]
+    await _settle()
+
+    assert started == [("a", "pull_observations"), ("a", "pull_events")]
+    release.set()
+    await asyncio.gather(*runs)
+    assert len(started) == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = ActionAdmissionScheduler(max_running=1, max_per_integration=1)
+    started, release = [], asyncio.Event()
+    running = asyncio.create_task(_run(scheduler, "a", "pull_events", started, release))
+    waiting = asyncio.create_task(_run(scheduler, "b", "pull_events", started, release))
+    await _settle()
+    assert scheduler.queue_depth == 1
+
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert scheduler.queue_depth == 0
+    release.set()
+    await running
+
+    assert started == [("a", "pull_events")]
+    assert scheduler.running == 0
+
+
+def test_admission_metrics_are_exposed():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    response = TestClient(app).get("/metrics/")
+
+    assert response.status_code == 200
+    assert "gundi_action_queue_wait_seconds" in response.text
+
+
+@pytest.mark.asyncio
+async def test_nested_run_uses_its_parents_slot():
+    scheduler = ActionAdmissionScheduler(max_running=1, max_per_integration=1)
+
+    async with scheduler.admit("a", "pull_events"):
+        async with scheduler.admit("a", "pull_events"):  # e.g. a re-trigger run inline
+            assert scheduler.running == 1
+
+    assert scheduler.running == 0
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_a_slot_times_out():
+    scheduler = ActionAdmissionScheduler(max_running=1, max_per_integration=1)
+    started, release = [], asyncio.Event()
+    running = asyncio.create_task(_run(scheduler, "a", "pull_events", started, release))
+    await _settle()
+
+    with pytest.raises(AdmissionTimeoutError):
+        async with scheduler.admit("b", "pull_events", timeout=0.01):
+            pass
+
+    assert scheduler.queue_depth == 0
+    release.set()
+    await running
+    assert scheduler.running == 0
+
+
+@pytest.mark.asyncio
+async def test_no_per_integration_cap_by_default():
+    scheduler = ActionAdmissionScheduler(max_running=3, max_per_integration=0)
+    started, release = [], asyncio.Event()
+
+    runs = [asyncio.create_task(_run(scheduler, "a", "pull_events", started, release)) for _ in range(3)]
+    await _settle()
+
+    assert len(started) == 3
+    release.set()
+    await asyncio.gather(*runs)
+
+
+@pytest.mark.asyncio
+async def test_execute_action_is_rejected_when_no_slot_frees_up_in_time(
+        mocker, mock_gundi_client_v2, mock_config_manager, mock_publish_event, mock_action_handlers,
+        integration_v2,
+):
+    from app.services import admission
+    from app.services.action_runner import execute_action
+    mocker.patch("app.services.action_runner.action_handlers", mock_action_handlers)
+    mocker.patch("app.services.action_runner.config_manager", mock_config_manager)
+    mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    mocker.patch("app.services.action_runner.settings.ACTIONS_MAX_QUEUE_WAIT_SECONDS", 0)
+    scheduler = admission._admission_scheduler = ActionAdmissionScheduler(max_running=1, max_per_integration=0)
+    release = asyncio.Event()
+    other = asyncio.create_task(_run(scheduler, "other", "pull_observations", [], release))  # Takes the only slot
+    await _settle()
+
+    response = await execute_action(integration_id=str(integration_v2.id), action_id="pull_observations")
+
+    release.set()
+    await other
+    assert response.status_code == 503
+    mock_action_handler, _, _ = mock_action_handlers["pull_observations"]
+    assert not mock_action_handler.called
+
+
+@pytest.mark.asyncio
+async def test_background_message_is_acked_only_once_its_run_is_admitted(mocker):
+    import base64
+    import json
+    from fastapi import status
+    from fastapi.responses import JSONResponse
+    from app import main
+    mocker.patch("app.main.settings.PROCESS_PUBSUB_MESSAGES_IN_BACKGROUND", True)
+    message = {"integration_id": "a", "action_id": "pull_events"}
+    request = mocker.MagicMock()
+    request.json = mocker.AsyncMock(return_value={
+        "message": {"data": base64.b64encode(json.dumps(message).encode()).decode()}
+    })
+    release = asyncio.Event()
+
+    async def admitted_run(admitted, **kwargs):
+        admitted.set_result(None)
+        await release.wait()
+        return {}
+
+    async def rejected_run(admitted, **kwargs):
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={})
+
+    mocker.patch("app.main.execute_action", side_effect=admitted_run)
+    assert await main.execute(request) == {}  # Acked while the run goes on
+    assert len(main._background_runs) == 1
+    release.set()
+    await asyncio.gather(*main._background_runs)
+
+    mocker.patch("app.main.execute_action", side_effect=rejected_run)
+    response = await main.execute(request)
+    assert response.status_code == 503  # Redelivered by PubSub
+
+
+def test_run_time_left_counts_down_to_the_earliest_deadline():
+    import time
+    from app import settings
+    from app.services.admission import run_deadline, run_time_left
+
+    assert run_time_left() == settings.MAX_ACTION_EXECUTION_TIME  # Outside a run
+    with run_deadline(time.monotonic() + 100):
+        assert 99 < run_time_left() <= 100
+        with run_deadline(time.monotonic() + 500):  # A run started inline keeps its parent's deadline
+            assert run_time_left() <= 100
+    assert run_time_left() == settings.MAX_ACTION_EXECUTION_TIME
+
+
+@pytest.mark.asyncio
+async def test_handler_budget_excludes_the_wait_for_a_slot(
+        mocker, mock_gundi_client_v2, mock_config_manager, mock_publish_event, mock_action_handlers,
+        integration_v2,
+):
+    from app import settings
+    from app.services import admission
+    from app.services.action_runner import execute_action
+    mocker.patch("app.services.action_runner.action_handlers", mock_action_handlers)
+    mocker.patch("app.services.action_runner.config_manager", mock_config_manager)
+    mocker.patch("app.services.action_runner.publish_event", mock_publish_event)
+    scheduler = admission._admission_scheduler = ActionAdmissionScheduler(max_running=1, max_per_integration=0)
+    release = asyncio.Event()
+    other = asyncio.create_task(_run(scheduler, "other", "pull_observations", [], release))  # Takes the only slot
+    await _settle()
+    time_left = []
+    mock_action_handler, _, _ = mock_action_handlers["pull_observations"]
+    mock_action_handler.side_effect = lambda **kwargs: time_left.append(admission.run_time_left())
+
+    run = asyncio.create_task(execute_action(integration_id=str(integration_v2.id), action_id="pull_observations"))
+    await asyncio.sleep(0.2)
+    release.set()
+    await asyncio.gather(run, other)
+
+    assert time_left[0] < settings.MAX_ACTION_EXECUTION_TIME - 0.2
@@ -23,6 +23,7 @@ async def test_process_event_integration_created_from_pubsub(
 
     assert response.status_code == 200
     assert mock_config_manager.set_integration.called
+    mock_config_manager.invalidate_cached_integration.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -42,6 +43,7 @@ async def test_process_event_integration_updated_from_pubsub(
     assert response.status_code == 200
     assert mock_config_manager.get_integration.called
     assert mock_config_manager.set_integration.called
+    mock_config_manager.invalidate_cached_integration.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -60,6 +62,7 @@ async def test_process_event_integration_deleted_from_pubsub(
 
     assert response.status_code == 200
     assert mock_config_manager.delete_integration.called
+    mock_config_manager.invalidate_cached_integration.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -78,6 +81,7 @@ async def test_process_event_action_config_created_from_pubsub(
 
     assert response.status_code == 200
     assert mock_config_manager.set_action_configuration.called
+    mock_config_manager.invalidate_cached_integration.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -97,6 +101,33 @@ async def test_process_event_action_config_updated_from_pubsub(
     assert response.status_code == 200
     assert mock_config_manager.get_action_configuration.called
     assert mock_config_manager.set_action_configuration.called
+    mock_config_manager.invalidate_cached_integration.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_process_event_action_config_updated_when_cached_as_not_configured(
+        mocker, mock_gundi_client_v2, mock_publish_event, mock_action_handlers, mock_config_manager,
+        pubsub_message_request_headers, action_config_updated_event_as_pubsub_message, integration_v2
+):
+    from app.conftest import async_return
+    mocker.patch("app.services.config_events_consumer.config_manager", mock_config_manager)
+    # The first read finds the "not configured" marker; after dropping it, the config is loaded from Gundi
+    mock_config_manager.get_action_configuration.side_effect = [
+        async_return(None), async_return(integration_v2.configurations[0]),
+    ]
+
+    response = api_client.post(
+        "/config-events/",
+        headers=pubsub_message_request_headers,
+        json=action_config_updated_event_as_pubsub_message,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+    assert mock_config_manager.delete_action_configuration.called
+    assert mock_config_manager.get_action_configuration.call_count == 2
+    assert not mock_config_manager.set_action_configuration.called
+    mock_config_manager.invalidate_cached_integration.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -115,4 +146,5 @@ async def test_process_event_action_config_deleted_from_pubsub(
 
     assert response.status_code == 200
     assert mock_config_manager.delete_action_configuration.called
+    mock_config_manager.invalidate_cached_integration.assert_called_once()
 
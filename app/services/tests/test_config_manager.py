@@ -2,6 +2,7 @@ import pytest
 
 from gundi_core.schemas.v2 import IntegrationSummary, IntegrationActionConfiguration, Integration, WebhookConfiguration
 from app.services.config_manager import IntegrationConfigurationManager
+from app.conftest import async_return
 
 
 @pytest.mark.asyncio
@@ -107,10 +108,89 @@ async def test_get_integration_details_with_empty_redis_db(
     assert isinstance(integration, Integration)
     assert len(integration.configurations) == len(integration_v2.configurations)
     assert integration.id == integration_v2.id
-    mock_gundi_client_v2_class.return_value.get_integration_details.assert_called_with(integration_id)
+    # A cold cache costs one reload from Gundi, not one per action
+    mock_gundi_client_v2_class.return_value.get_integration_details.assert_called_once_with(integration_id)
+    mock_redis_empty.Redis.return_value.get.assert_called_once_with(f"integration.{integration_id}")
     for config in integration_v2.configurations:
         action_id = config.action.value
-        mock_redis_empty.Redis.return_value.get.assert_any_call(f"integrationconfig.{integration_id}.{action_id}")
+        mock_redis_empty.Redis.return_value.set.assert_any_call(
+            f"integrationconfig.{integration_id}.{action_id}", config.json(), None
+        )
+
+
+def _cache_integration(redis_client, integration, *, missing_action=None):
+    """Make the mocked Redis hold the integration summary and the values MGET returns for its configs."""
+    configs = {c.action.value: c.json() for c in integration.configurations}
+    redis_client.get.return_value = async_return(IntegrationSummary.from_integration(integration).json())
+    values = [
+        None if action.value == missing_action else configs.get(action.value, "null")
+        for action in integration.type.actions
+    ]
+    values.append(integration.webhook_configuration.json() if integration.webhook_configuration else "null")
+    redis_client.mget.return_value = async_return(values)
+
+
+@pytest.mark.asyncio
+async def test_get_integration_details_reads_all_configs_in_one_round_trip(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    redis_client = mock_redis_empty.Redis.return_value
+    _cache_integration(redis_client, integration_v2)
+    config_manager = IntegrationConfigurationManager()
+    integration_id = str(integration_v2.id)
+
+    integration = await config_manager.get_integration_details(integration_id)
+
+    assert integration.id == integration_v2.id
+    assert {c.action.value for c in integration.configurations} == {
+        c.action.value for c in integration_v2.configurations
+    }
+    assert integration.webhook_configuration is None
+    redis_client.get.assert_called_once_with(f"integration.{integration_id}")
+    redis_client.mget.assert_called_once_with(
+        [f"integrationconfig.{integration_id}.{a.value}" for a in integration_v2.type.actions]
+        + [f"integrationconfig.{integration_id}.webhook"]
+    )
+    assert not mock_gundi_client_v2_class.return_value.get_integration_details.called
+
+
+@pytest.mark.asyncio
+async def test_get_integration_details_reloads_once_when_a_config_is_not_cached(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    _cache_integration(
+        mock_redis_empty.Redis.return_value, integration_v2,
+        missing_action=integration_v2.configurations[0].action.value,
+    )
+    config_manager = IntegrationConfigurationManager()
+
+    integration = await config_manager.get_integration_details(str(integration_v2.id))
+
+    assert integration == integration_v2
+    mock_gundi_client_v2_class.return_value.get_integration_details.assert_called_once_with(str(integration_v2.id))
+
+
+@pytest.mark.asyncio
+async def test_reload_caches_absence_of_unconfigured_actions(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    integration_id = str(integration_v2.id)
+    configured = {c.action.value for c in integration_v2.configurations}
+    unconfigured = [a.value for a in integration_v2.type.actions if a.value not in configured]
+    assert unconfigured, "The fixture should have an action without configuration"
+
+    await IntegrationConfigurationManager().get_integration_details(integration_id)
+
+    for action_id in unconfigured:
+        mock_redis_empty.Redis.return_value.set.assert_any_call(
+            f"integrationconfig.{integration_id}.{action_id}", "null", None
+        )
 
 
 # TTL Feature Tests
@@ -293,9 +373,9 @@ async def test_get_integration_details_with_webhook_configuration(
     assert isinstance(integration, Integration)
     assert integration.webhook_configuration is not None
     assert isinstance(integration.webhook_configuration, WebhookConfiguration)
-    # Verify webhook config was fetched
-    mock_redis_empty.Redis.return_value.get.assert_any_call(
-        f"integrationconfig.{integration_id}.webhook"
+    # Verify webhook config was cached by the reload
+    mock_redis_empty.Redis.return_value.set.assert_any_call(
+        f"integrationconfig.{integration_id}.webhook", integration_v2_with_webhook.webhook_configuration.json(), None
     )
 
 
@@ -358,3 +438,194 @@ async def test_get_webhook_configuration_reads_cached_absence_sentinel(
     assert webhook_config is None
     # Sentinel hit — no reload from the Gundi API.
     assert not mock_gundi_client_v2_class.return_value.get_integration_details.called
+
+
+@pytest.mark.asyncio
+async def test_get_integration_details_is_served_from_memory_until_invalidated(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    redis_client = mock_redis_empty.Redis.return_value
+    _cache_integration(redis_client, integration_v2)
+    integration_id = str(integration_v2.id)
+    reader, consumer = IntegrationConfigurationManager(), IntegrationConfigurationManager()
+
+    first = await reader.get_integration_details(integration_id)
+    second = await reader.get_integration_details(integration_id)
+    assert second is first
+    assert redis_client.mget.call_count == 1
+
+    # An invalidation from any manager (e.g. the config-events consumer's) reaches every reader
+    _cache_integration(redis_client, integration_v2)
+    consumer.invalidate_cached_integration(integration_id)
+    third = await reader.get_integration_details(integration_id)
+    assert third is not first
+    assert redis_client.mget.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_integration_cache_expires_and_evicts_least_recently_used(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    from app.services import config_manager as config_manager_module
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.config_manager.settings.INTEGRATION_CACHE_MAX_SIZE", 1)
+    clock = mocker.patch("app.services.config_manager.time")
+    clock.monotonic.return_value = 1000.0
+    redis_client = mock_redis_empty.Redis.return_value
+    config_manager = IntegrationConfigurationManager()
+    integration_id = str(integration_v2.id)
+
+    _cache_integration(redis_client, integration_v2)
+    await config_manager.get_integration_details(integration_id)
+    clock.monotonic.return_value += config_manager_module.settings.INTEGRATION_CACHE_TTL + 1
+    _cache_integration(redis_client, integration_v2)
+    await config_manager.get_integration_details(integration_id)
+    assert redis_client.mget.call_count == 2  # Expired
+
+    other_id = "5f2a0a9e-0000-4000-8000-000000000001"
+    _cache_integration(redis_client, integration_v2)
+    await config_manager.get_integration_details(other_id)
+    assert list(config_manager_module._integration_cache) == [other_id]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cache_misses_share_one_reload_from_gundi(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    import asyncio
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    release = asyncio.Event()
+
+    async def slow_details(integration_id):
+        await release.wait()
+        return integration_v2
+
+    get_details = mock_gundi_client_v2_class.return_value.get_integration_details = mocker.AsyncMock(
+        side_effect=slow_details
+    )
+    config_manager = IntegrationConfigurationManager()
+    integration_id = str(integration_v2.id)
+    action_id = integration_v2.configurations[0].action.value
+    lookups = [
+        asyncio.create_task(config_manager.get_action_configuration(integration_id, action_id))
+        for _ in range(5)
+    ] + [asyncio.create_task(config_manager.get_webhook_configuration(integration_id))]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*lookups)
+
+    assert get_details.call_count == 1
+    assert results[:5] == [integration_v2.configurations[0]] * 5
+    assert results[5] is None
+
+
+@pytest.mark.asyncio
+async def test_reload_waits_for_the_replica_holding_the_lock(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.config_manager.RELOAD_LOCK_POLL_SECONDS", 0)
+    redis_client = mock_redis_empty.Redis.return_value
+    redis_client.lock.return_value.acquire.return_value = async_return(False)
+    redis_client.lock.return_value.locked.return_value = async_return(True)
+    _cache_integration(redis_client, integration_v2)
+    summary = redis_client.get.return_value
+    # Cold on the first read and the first poll; the other replica's reload lands after that
+    redis_client.get.side_effect = [async_return(None), async_return(None), summary]
+    redis_client.get.return_value = None
+
+    integration = await IntegrationConfigurationManager().get_integration_details(str(integration_v2.id))
+
+    assert integration.id == integration_v2.id
+    assert not mock_gundi_client_v2_class.return_value.get_integration_details.called
+    assert not redis_client.lock.return_value.release.called
+
+
+@pytest.mark.asyncio
+async def test_reload_proceeds_when_the_lock_holder_gives_up(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.config_manager.RELOAD_LOCK_POLL_SECONDS", 0)
+    redis_client = mock_redis_empty.Redis.return_value
+    redis_client.lock.return_value.acquire.return_value = async_return(False)
+    redis_client.lock.return_value.locked.return_value = async_return(False)
+
+    integration = await IntegrationConfigurationManager().get_integration_details(str(integration_v2.id))
+
+    assert integration == integration_v2
+    mock_gundi_client_v2_class.return_value.get_integration_details.assert_called_once_with(str(integration_v2.id))
+
+
+@pytest.mark.asyncio
+async def test_reload_writes_all_keys_in_one_transaction(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    redis_client = mock_redis_empty.Redis.return_value
+    integration_id = str(integration_v2.id)
+
+    await IntegrationConfigurationManager().get_integration_details(integration_id, ttl=600)
+
+    redis_client.pipeline.assert_called_once_with(transaction=True)
+    assert redis_client.execute.call_count == 1
+    written = {c.args[0]: c.args[2] for c in redis_client.set.call_args_list}
+    assert set(written) == {f"integration.{integration_id}", f"integrationconfig.{integration_id}.webhook"} | {
+        f"integrationconfig.{integration_id}.{a.value}" for a in integration_v2.type.actions
+    }
+    assert set(written.values()) == {600}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_cache_loads_every_integration_of_the_type(
+        mocker, mock_redis_empty, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis_empty)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    gundi = mock_gundi_client_v2_class.return_value
+    gundi.integrations_endpoint = "https://gundi/v2/integrations"
+    pages = [
+        {
+            "next": "https://gundi/v2/integrations/?page=2",
+            "results": [
+                {"id": "id-1", "type": {"value": "earth_ranger"}},
+                {"id": "id-other", "type": {"value": "other_type"}},  # Ignored, if the portal didn't filter it out
+                {"id": "id-unknown"},  # No type slug to check: ignored too
+            ],
+        },
+        {"next": None, "results": [{"id": "id-2", "type": {"value": "earth_ranger"}}]},
+    ]
+    gundi._get = mocker.AsyncMock(side_effect=[mocker.MagicMock(json=mocker.MagicMock(return_value=p)) for p in pages])
+
+    loaded = await IntegrationConfigurationManager().warm_up_cache("earth_ranger", concurrency=2)
+
+    assert loaded == 2
+    assert gundi._get.call_args_list[0].kwargs["params"] == {"type": "earth_ranger", "page_size": 100}
+    assert gundi._get.call_args_list[1].args[0] == "https://gundi/v2/integrations/?page=2"
+    assert sorted(c.args[0] for c in gundi.get_integration_details.call_args_list) == ["id-1", "id-2"]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_cache_skips_integrations_already_cached(
+        mocker, mock_redis, mock_gundi_client_v2_class, integration_v2,
+):
+    mocker.patch("app.services.config_manager.redis", mock_redis)
+    mocker.patch("app.services.config_manager.GundiClient", mock_gundi_client_v2_class)
+    _cache_integration(mock_redis.Redis.return_value, integration_v2)
+    gundi = mock_gundi_client_v2_class.return_value
+    gundi.integrations_endpoint = "https://gundi/v2/integrations"
+    gundi._get = mocker.AsyncMock(return_value=mocker.MagicMock(
+        json=mocker.MagicMock(return_value=[{"id": str(integration_v2.id), "type": {"value": "earth_ranger"}}])
+    ))
+
+    loaded = await IntegrationConfigurationManager().warm_up_cache("earth_ranger", concurrency=2)
+
+    assert loaded == 0
+    assert not gundi.get_integration_details.called
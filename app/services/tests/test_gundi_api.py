@@ -1,4 +1,8 @@
+import asyncio
+
+import httpx
 import pytest
+from app.conftest import async_return
 from app.services.gundi import send_events_to_gundi, send_observations_to_gundi, send_event_attachments_to_gundi
 
 
@@ -121,3 +125,111 @@ async def test_send_observations_to_gundi(
     assert len(response) == 2
     assert mock_gundi_sensors_client_class.called
     mock_gundi_sensors_client_class.return_value.post_observations.assert_called_once_with(data=observations)
+
+
+@pytest.mark.asyncio
+async def test_api_key_and_sender_client_are_reused_across_batches(
+        mocker, mock_gundi_client_v2_class, mock_gundi_sensors_client_class,
+        mock_get_gundi_api_key, integration_v2
+):
+    mocker.patch("app.services.gundi.GundiClient", mock_gundi_client_v2_class)
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    mocker.patch("app.services.gundi._get_gundi_api_key", mock_get_gundi_api_key)
+
+    for _ in range(3):
+        await send_observations_to_gundi(observations=[{"source": "s"}], integration_id=integration_v2.id)
+
+    assert mock_get_gundi_api_key.call_count == 1
+    assert mock_gundi_sensors_client_class.call_count == 1
+    assert mock_gundi_sensors_client_class.return_value.post_observations.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_senders_share_one_api_key_fetch(mocker, mock_gundi_sensors_client_class, integration_v2):
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    release = asyncio.Event()
+
+    async def slow_key(integration_id):
+        await release.wait()
+        return "MockAP1K3y"
+
+    get_key = mocker.patch("app.services.gundi._get_gundi_api_key", side_effect=slow_key)
+    sends = [
+        asyncio.create_task(send_observations_to_gundi(observations=[{"source": "s"}], integration_id=integration_v2.id))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*sends)
+
+    assert get_key.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_unauthorized_response_refreshes_api_key_and_retries(
+        mocker, mock_gundi_sensors_client_class, observations_created_response, integration_v2
+):
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    get_key = mocker.patch("app.services.gundi._get_gundi_api_key", side_effect=["revoked-key", "new-key"])
+    unauthorized = httpx.HTTPStatusError(
+        "401", request=httpx.Request("POST", "https://sensors/v2/observations/"),
+        response=httpx.Response(401),
+    )
+    mock_gundi_sensors_client_class.return_value.post_observations.side_effect = [
+        unauthorized, async_return(observations_created_response),
+    ]
+
+    response = await send_observations_to_gundi(observations=[{"source": "s"}], integration_id=integration_v2.id)
+
+    assert response == observations_created_response
+    assert get_key.call_count == 2
+    assert [c.kwargs["integration_api_key"] for c in mock_gundi_sensors_client_class.call_args_list] == [
+        "revoked-key", "new-key",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sender_client_posts_through_the_shared_session():
+    from app.services.gundi import GundiDataSenderClient
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(201, json=[{"object_id": "obj-1"}])
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as session:
+        client = GundiDataSenderClient(
+            integration_api_key="MockAP1K3y", session=session, sensors_api_base_url="https://sensors.test/api"
+        )
+        response = await client.post_events(data=[{"title": "t"}])
+        await client.update_event(event_id="obj-1", data={"status": "resolved"})
+
+    assert response == [{"object_id": "obj-1"}]
+    assert [(r.method, str(r.url)) for r in requests] == [
+        ("POST", "https://sensors.test/api/v2/events/"),
+        ("PATCH", "https://sensors.test/api/v2/events/obj-1/"),
+    ]
+    assert all(r.headers["apikey"] == "MockAP1K3y" for r in requests)
+
+
+@pytest.mark.asyncio
+async def test_throttled_send_honours_retry_after(
+        mocker, mock_gundi_sensors_client_class, mock_get_gundi_api_key, observations_created_response, integration_v2
+):
+    from app.services import gundi
+    mocker.patch("app.services.gundi.GundiDataSenderClient", mock_gundi_sensors_client_class)
+    mocker.patch("app.services.gundi._get_gundi_api_key", mock_get_gundi_api_key)
+    throttled = httpx.HTTPStatusError(
+        "429", request=httpx.Request("POST", "https://sensors/v2/observations/"),
+        response=httpx.Response(429, headers={"Retry-After": "0"}),
+    )
+    mock_gundi_sensors_client_class.return_value.post_observations.side_effect = [
+        throttled, async_return(observations_created_response),
+    ]
+
+    response = await send_observations_to_gundi(observations=[{"source": "s"}], integration_id=integration_v2.id)
+
+    assert response == observations_created_response
+    assert mock_gundi_sensors_client_class.return_value.post_observations.call_count == 2
+    scheduler = gundi._send_schedulers[str(integration_v2.id)]
+    assert scheduler.limit < gundi.settings.SENSORS_API_INITIAL_CONCURRENCY
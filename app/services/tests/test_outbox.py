@@ -0,0 +1,98 @@
+import httpx
+import pytest
+
+from app.conftest import async_return
+from app.services import outbox
+
+
+@pytest.fixture
+def deliveries(mocker):
+    registered = {}
+    mocker.patch.dict(outbox._deliveries, clear=True)
+    for kind in ("observations", "events"):
+        registered[kind] = mocker.MagicMock()
+        outbox.outbox_delivery(kind)(registered[kind])
+    return registered
+
+
+@pytest.mark.asyncio
+async def test_outbox_items_are_kept_per_integration(gundi_outbox):
+    await gundi_outbox.put("int-1", "observations", {"observations": [{"source": "s"}]})
+    await gundi_outbox.put("int-1", "events", {"events": []})
+    await gundi_outbox.put("int-2", "observations", {"observations": []})
+
+    assert await outbox.outbox_depth("int-1") == 2
+    assert await outbox.outbox_depth("int-2") == 1
+    due = await gundi_outbox.due(limit=10)
+    assert [(item["integration_id"], item["kind"]) for item in due] == [
+        ("int-1", "observations"), ("int-1", "events"), ("int-2", "observations"),
+    ]
+    assert due[0]["payload"] == {"observations": [{"source": "s"}]}
+
+
+@pytest.mark.asyncio
+async def test_outbox_survives_reopening(gundi_outbox):
+    await outbox.enqueue("int-1", "observations", {"observations": []})
+    gundi_outbox.close()
+
+    reopened = outbox.GundiOutbox(gundi_outbox.path)
+    try:
+        assert await reopened.depth("int-1") == 1
+    finally:
+        reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_drain_delivers_and_removes_items(gundi_outbox, deliveries):
+    deliveries["observations"].return_value = async_return({})
+    await outbox.enqueue("int-1", "observations", {"observations": [{"source": "s"}]})
+
+    assert await outbox.drain_outbox() == 1
+
+    deliveries["observations"].assert_called_once_with("int-1", {"observations": [{"source": "s"}]})
+    assert await outbox.outbox_depth("int-1") == 0
+
+
+@pytest.mark.asyncio
+async def test_drain_reschedules_items_that_fail_transiently(gundi_outbox, deliveries):
+    deliveries["observations"].side_effect = httpx.ConnectError("Gundi down")
+    await outbox.enqueue("int-1", "observations", {"observations": []})
+
+    assert await outbox.drain_outbox() == 0
+
+    assert await outbox.outbox_depth("int-1") == 1
+    assert await gundi_outbox.due(limit=10) == []  # Backing off
+
+
+@pytest.mark.asyncio
+async def test_drain_drops_items_rejected_by_gundi(gundi_outbox, deliveries):
+    deliveries["events"].side_effect = httpx.HTTPStatusError(
+        "400", request=httpx.Request("POST", "https://sensors/v2/events/"), response=httpx.Response(400),
+    )
+    await outbox.enqueue("int-1", "events", {"events": []})
+
+    assert await outbox.drain_outbox() == 0
+
+    assert await outbox.outbox_depth("int-1") == 0
+
+
+def test_is_transient_send_error():
+    request = httpx.Request("POST", "https://sensors/v2/observations/")
+    assert outbox.is_transient_send_error(httpx.ConnectTimeout("timeout"))
+    assert outbox.is_transient_send_error(httpx.HTTPStatusError("", request=request, response=httpx.Response(429)))
+    assert outbox.is_transient_send_error(httpx.HTTPStatusError("", request=request, response=httpx.Response(502)))
+    assert not outbox.is_transient_send_error(httpx.HTTPStatusError("", request=request, response=httpx.Response(400)))
+    assert not outbox.is_transient_send_error(ValueError("bad payload"))
+
+
+@pytest.mark.asyncio
+async def test_items_of_an_integration_and_kind_are_delivered_in_order(gundi_outbox, deliveries):
+    deliveries["events"].side_effect = [httpx.ConnectError("Gundi down"), async_return({}), async_return({})]
+    await outbox.enqueue("int-1", "events", {"n": 1})
+    await outbox.enqueue("int-1", "events", {"n": 2})
+    await outbox.enqueue("int-2", "events", {"n": 3})
+
+    assert await outbox.drain_outbox() == 1  # int-2's item; int-1's second waits for its first
+
+    assert [c.args for c in deliveries["events"].call_args_list] == [("int-1", {"n": 1}), ("int-2", {"n": 3})]
+    assert await gundi_outbox.due(limit=10) == []
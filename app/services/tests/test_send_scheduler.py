@@ -0,0 +1,138 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.send_scheduler import SendScheduler, parse_retry_after
+
+
+def _status_error(status, headers=None):
+    return httpx.HTTPStatusError(
+        str(status), request=httpx.Request("POST", "https://sensors/v2/observations/"),
+        response=httpx.Response(status, headers=headers),
+    )
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(httpx.Response(429, headers={"Retry-After": "7"})) == 7.0
+    assert parse_retry_after(httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert parse_retry_after(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+    assert parse_retry_after(httpx.Response(429)) is None
+
+
+@pytest.mark.asyncio
+async def test_window_grows_on_fast_successes():
+    scheduler = SendScheduler(initial_window=2, max_window=4)
+
+    async def send():
+        return "ok"
+
+    for _ in range(20):
+        assert await scheduler.call(send) == "ok"
+
+    assert scheduler.limit == 4
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_by_the_window():
+    scheduler = SendScheduler(initial_window=2, max_window=2)
+    running, peak = 0, 0
+
+    async def send():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(scheduler.call(send) for _ in range(6)))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_window_halves_once_for_a_burst_of_throttling():
+    scheduler = SendScheduler(initial_window=8, max_window=8, max_throttle_attempts=1)
+
+    async def send():
+        await asyncio.sleep(0.01)
+        raise _status_error(503)
+
+    results = await asyncio.gather(*(scheduler.call(send) for _ in range(8)), return_exceptions=True)
+
+    assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+    assert scheduler.limit == 4  # Eight concurrent failures are one congestion signal
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [400, 500])
+async def test_other_errors_do_not_shrink_the_window(status):
+    scheduler = SendScheduler(initial_window=4, max_window=4)
+
+    async def send():
+        raise _status_error(status)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await scheduler.call(send)
+
+    assert scheduler.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_timeouts_shrink_the_window():
+    scheduler = SendScheduler(initial_window=4, max_window=4)
+
+    async def send():
+        raise httpx.ReadTimeout("timed out")
+
+    with pytest.raises(httpx.ReadTimeout):
+        await scheduler.call(send)
+
+    assert scheduler.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_mixed_latency_successes_never_shrink_the_window():
+    scheduler = SendScheduler(initial_window=4, max_window=8)
+    latencies = [0.001, 0.02] * 20  # Small and large batches
+
+    async def send(latency):
+        await asyncio.sleep(latency)
+
+    for latency in latencies:
+        limit = scheduler.limit
+        await scheduler.call(lambda: send(latency))
+        assert scheduler.limit >= limit
+
+    assert scheduler.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_throttled_request_waits_retry_after_and_is_retried():
+    scheduler = SendScheduler(initial_window=4, max_window=4)
+    responses = [_status_error(429, headers={"Retry-After": "0.05"}), "ok"]
+    attempts = []
+
+    async def send():
+        attempts.append(asyncio.get_running_loop().time())
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert await scheduler.call(send) == "ok"
+    assert attempts[1] - attempts[0] >= 0.05
+    assert scheduler.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_throttling_is_raised_after_max_attempts():
+    scheduler = SendScheduler(initial_window=4, max_window=4, max_throttle_attempts=2)
+
+    async def send():
+        raise _status_error(429, headers={"Retry-After": "0"})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await scheduler.call(send)
+    assert scheduler.in_flight == 0
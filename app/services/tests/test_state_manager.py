@@ -2,8 +2,9 @@ import datetime
 import json
 
 import pytest
+import redis.asyncio as redis
 from app.conftest import async_return
-from app.services.state import IntegrationStateManager
+from app.services.state import IntegrationStateManager, StateWriteBuffer
 
 
 @pytest.mark.asyncio
@@ -185,3 +186,149 @@ async def test_delete_state_source_state(mocker, mock_redis, integration_v2, moc
     mock_redis.Redis.return_value.delete.assert_called_once_with(
         f"integration_state.{integration_id}.pull_observations.{source_id}"
     )
+
+
+@pytest.mark.asyncio
+async def test_get_states_fetches_many_sources_in_one_round_trip(mocker, mock_redis, integration_v2, mock_integration_state):
+    mocker.patch("app.services.state.redis", mock_redis)
+    mock_redis.Redis.return_value.mget.return_value = async_return(
+        [json.dumps(mock_integration_state, default=str), None]
+    )
+    state_manager = IntegrationStateManager()
+    integration_id = str(integration_v2.id)
+
+    states = await state_manager.get_states(
+        integration_id=integration_id,
+        action_id="pull_events",
+        source_ids=["event-1", "event-2", "event-1"]  # Duplicates are fetched once
+    )
+
+    assert states == {"event-1": mock_integration_state, "event-2": {}}
+    mock_redis.Redis.return_value.mget.assert_called_once_with([
+        f"integration_state.{integration_id}.pull_events.event-1",
+        f"integration_state.{integration_id}.pull_events.event-2",
+    ])
+
+
+@pytest.mark.asyncio
+async def test_get_states_with_no_sources_skips_redis(mocker, mock_redis, integration_v2):
+    mocker.patch("app.services.state.redis", mock_redis)
+    state_manager = IntegrationStateManager()
+
+    states = await state_manager.get_states(
+        integration_id=str(integration_v2.id),
+        action_id="pull_events",
+        source_ids=[]
+    )
+
+    assert states == {}
+    mock_redis.Redis.return_value.mget.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_set_states_writes_many_sources_in_one_mset(mocker, mock_redis, integration_v2, mock_integration_state):
+    mocker.patch("app.services.state.redis", mock_redis)
+    mock_redis.Redis.return_value.mset.return_value = async_return(True)
+    state_manager = IntegrationStateManager()
+    integration_id = str(integration_v2.id)
+
+    await state_manager.set_states(
+        integration_id=integration_id,
+        action_id="pull_events",
+        states={"event-1": mock_integration_state, "event-2": {}}
+    )
+
+    mock_redis.Redis.return_value.mset.assert_called_once_with({
+        f"integration_state.{integration_id}.pull_events.event-1": json.dumps(mock_integration_state, default=str),
+        f"integration_state.{integration_id}.pull_events.event-2": "{}",
+    })
+
+
+@pytest.mark.asyncio
+async def test_set_cached_writes_shared_key_with_ttl(mocker, mock_redis):
+    mocker.patch("app.services.state.redis", mock_redis)
+    state_manager = IntegrationStateManager()
+
+    await state_manager.set_cached("event_type_maps.er.example.org", {"id_by_slug": {}}, ttl_seconds=300)
+
+    mock_redis.Redis.return_value.set.assert_called_once_with(
+        "cache.event_type_maps.er.example.org", '{"id_by_slug": {}}', ex=300
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_cached_returns_none_on_miss(mocker, mock_redis_empty):
+    mocker.patch("app.services.state.redis", mock_redis_empty)
+    state_manager = IntegrationStateManager()
+
+    assert await state_manager.get_cached("event_type_maps.er.example.org") is None
+    mock_redis_empty.Redis.return_value.get.assert_called_once_with("cache.event_type_maps.er.example.org")
+
+
+@pytest.mark.asyncio
+async def test_get_cached_many_reads_all_keys_in_one_mget(mocker, mock_redis):
+    mocker.patch("app.services.state.redis", mock_redis)
+    mock_redis.Redis.return_value.mget.return_value = async_return(['{"manufacturer_id": "S-1"}', None])
+    state_manager = IntegrationStateManager()
+
+    cached = await state_manager.get_cached_many(["source_profile.i.src-1", "source_profile.i.src-2"])
+
+    assert cached == {"source_profile.i.src-1": {"manufacturer_id": "S-1"}, "source_profile.i.src-2": None}
+    mock_redis.Redis.return_value.mget.assert_called_once_with(
+        ["cache.source_profile.i.src-1", "cache.source_profile.i.src-2"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_set_cached_many_pipelines_writes_with_ttl(mocker, mock_redis):
+    mocker.patch("app.services.state.redis", mock_redis)
+    state_manager = IntegrationStateManager()
+
+    await state_manager.set_cached_many({"source_profile.i.src-1": {"manufacturer_id": "S-1"}}, ttl_seconds=60)
+
+    redis_client = mock_redis.Redis.return_value
+    redis_client.pipeline.assert_called_once_with(transaction=False)
+    redis_client.set.assert_called_once_with(
+        "cache.source_profile.i.src-1", '{"manufacturer_id": "S-1"}', ex=60
+    )
+    redis_client.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_state_write_buffer_flushes_latest_state_per_source(mocker, integration_v2):
+    state_manager = mocker.MagicMock()
+    state_manager.set_states.return_value = async_return(None)
+    integration_id = str(integration_v2.id)
+    state_buffer = StateWriteBuffer(state_manager, integration_id=integration_id, action_id="pull_observations")
+
+    state_buffer.set_state(state={"backfill": {"source_index": 1}})
+    state_buffer.set_state(state={"backfill": {"source_index": 2}})
+    state_buffer.set_state(state={"last_execution": "2024-01-01T00:00:00+00:00"}, source_id="device-123")
+    assert len(state_buffer) == 2
+    state_manager.set_states.assert_not_called()  # Write-behind
+
+    await state_buffer.flush()
+    await state_buffer.flush()  # Nothing pending, no extra round trip
+
+    state_manager.set_states.assert_called_once_with(
+        integration_id=integration_id,
+        action_id="pull_observations",
+        states={
+            "no-source": {"backfill": {"source_index": 2}},
+            "device-123": {"last_execution": "2024-01-01T00:00:00+00:00"},
+        }
+    )
+    assert len(state_buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_state_write_buffer_keeps_states_when_flush_fails(mocker, integration_v2):
+    state_manager = mocker.MagicMock()
+    state_manager.set_states.side_effect = redis.RedisError("Connection lost")
+    state_buffer = StateWriteBuffer(state_manager, integration_id=str(integration_v2.id), action_id="pull_events")
+    state_buffer.set_state(state={"gundi_object_id": "abc"}, source_id="event-1")
+
+    with pytest.raises(redis.RedisError):
+        await state_buffer.flush()
+
+    assert len(state_buffer) == 1  # Retried on the next flush
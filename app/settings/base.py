@@ -40,6 +40,18 @@ PORTAL_INBOUND_INTEGRATIONS_ENDPOINT = (
 GUNDI_API_BASE_URL = env.str("GUNDI_API_BASE_URL", None)
 GUNDI_API_SSL_VERIFY = env.bool("GUNDI_API_SSL_VERIFY", True)
 SENSORS_API_BASE_URL = env.str("SENSORS_API_BASE_URL", None)
+# How long (seconds) an integration's API key is reused before it's fetched
+# from the portal again. A 401 from the sensors API drops it right away.
+GUNDI_API_KEY_CACHE_TTL = env.int("GUNDI_API_KEY_CACHE_TTL", 15 * 60)
+# Concurrent sensors-API requests per integration: the window starts at the
+# initial value and adapts (AIMD) between 1 and the max to the API's responses.
+SENSORS_API_INITIAL_CONCURRENCY = env.int("SENSORS_API_INITIAL_CONCURRENCY", 4)
+SENSORS_API_MAX_CONCURRENCY = env.int("SENSORS_API_MAX_CONCURRENCY", 16)
+# Sends that still fail after their retries are kept in this SQLite file and
+# redelivered by a background task every GUNDI_OUTBOX_DRAIN_INTERVAL_SECONDS.
+# Each instance needs its own file (don't share it between replicas).
+GUNDI_OUTBOX_PATH = env.str("GUNDI_OUTBOX_PATH", "gundi-outbox.sqlite3")
+GUNDI_OUTBOX_DRAIN_INTERVAL_SECONDS = env.int("GUNDI_OUTBOX_DRAIN_INTERVAL_SECONDS", 30)
 
 # Used in OTel traces/spans to set the 'environment' attribute, used on metrics calculation
 TRACE_ENVIRONMENT = env.str("TRACE_ENVIRONMENT", "dev")
@@ -60,6 +72,15 @@ REDIS_HOST = env.str("REDIS_HOST", "localhost")
 REDIS_PORT = env.int("REDIS_PORT", 6379)
 REDIS_STATE_DB = env.int("REDIS_STATE_DB", 0)
 REDIS_CONFIGS_DB = env.int("REDIS_CONFIGS_DB", 1)  # ToDo: define a convention for DB numbers across services
+# Integrations (with their configs) are also kept in process memory for this
+# many seconds; config events clear them, but only on the instance receiving
+# the event, so keep it short. 0 disables.
+INTEGRATION_CACHE_TTL = env.int("INTEGRATION_CACHE_TTL", 60)
+INTEGRATION_CACHE_MAX_SIZE = env.int("INTEGRATION_CACHE_MAX_SIZE", 256)
+# Load every integration of INTEGRATION_TYPE_SLUG into the Redis config cache
+# in the background on startup, this many at a time
+CONFIG_CACHE_WARM_UP_ON_START = env.bool("CONFIG_CACHE_WARM_UP_ON_START", False)
+CONFIG_CACHE_WARM_UP_CONCURRENCY = env.int("CONFIG_CACHE_WARM_UP_CONCURRENCY", 5)
 
 
 REGISTER_ON_START = env.bool("REGISTER_ON_START", False)
@@ -69,12 +90,27 @@ INTEGRATION_SERVICE_URL = env.str("INTEGRATION_SERVICE_URL", None)  # Define a s
 PROCESS_PUBSUB_MESSAGES_IN_BACKGROUND = env.bool("PROCESS_PUBSUB_MESSAGES_IN_BACKGROUND", False)
 PROCESS_WEBHOOKS_IN_BACKGROUND = env.bool("PROCESS_WEBHOOKS_IN_BACKGROUND", True)
 MAX_ACTION_EXECUTION_TIME = env.int("MAX_ACTION_EXECUTION_TIME", 60 * 9)  # 10 minutes is the maximum ack timeout
+# Action executions running at once in this process: in total, per integration (0 for
+# no cap), and per action ("action_id=cap,..."); the rest wait, integrations taking
+# turns, for up to ACTIONS_MAX_QUEUE_WAIT_SECONDS (and never past
+# MAX_ACTION_EXECUTION_TIME, which the wait counts against). Then they're rejected
+# with a 503, so PubSub redelivers them later.
+ACTIONS_MAX_CONCURRENCY = env.int("ACTIONS_MAX_CONCURRENCY", 16)
+ACTIONS_MAX_CONCURRENCY_PER_INTEGRATION = env.int("ACTIONS_MAX_CONCURRENCY_PER_INTEGRATION", 0)
+ACTIONS_MAX_CONCURRENCY_PER_ACTION = env.dict("ACTIONS_MAX_CONCURRENCY_PER_ACTION", {}, subcast_values=int)
+ACTIONS_MAX_QUEUE_WAIT_SECONDS = env.int("ACTIONS_MAX_QUEUE_WAIT_SECONDS", 60)
 
 # Settings for system events & commands (EDA)
 INTEGRATION_EVENTS_TOPIC = env.str("INTEGRATION_EVENTS_TOPIC", "integration-events")
 default_commands_topic = f"{INTEGRATION_TYPE_SLUG}-actions-topic" if INTEGRATION_TYPE_SLUG else None
 INTEGRATION_COMMANDS_TOPIC = env.str("INTEGRATION_COMMANDS_TOPIC", default_commands_topic)
 TRIGGER_ACTIONS_ALWAYS_SYNC = env.bool("TRIGGER_ACTIONS_ALWAYS_SYNC", False)
+# Activity events are published in the background from a bounded queue; when
+# it's full, new events are dropped ("drop") or their callers wait ("block").
+ACTIVITY_EVENTS_QUEUE_SIZE = env.int("ACTIVITY_EVENTS_QUEUE_SIZE", 1000)
+ACTIVITY_EVENTS_QUEUE_FULL_POLICY = env.str(
+    "ACTIVITY_EVENTS_QUEUE_FULL_POLICY", "drop", validate=lambda policy: policy in ("drop", "block")
+)
 
 # SSRF protection for diagnostic URL forwarding.
 # When non-empty, only the listed hostnames are permitted as diagnostic destinations.
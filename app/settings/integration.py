@@ -5,3 +5,20 @@ from .base import env
 # The product name is one word — the slug-derived fallback in
 # self-registration would render "Earth Ranger".
 INTEGRATION_TYPE_NAME = env.str("INTEGRATION_TYPE_NAME", "EarthRanger")
+
+# How long (seconds) ER event-type/category maps are cached in Redis, per ER
+# host, across pull_events runs. A configured slug missing from the cached maps
+# forces a refresh, so new event types resolve right away. 0 disables the cache.
+EVENT_TYPE_MAPS_CACHE_TTL = env.int("EVENT_TYPE_MAPS_CACHE_TTL", 60 * 60)
+
+# How long (seconds) per-source profiles (manufacturer_id and subject assignment
+# history) are cached in Redis, per integration, across pull_observations runs
+# and replicas. 0 disables the cache.
+SOURCE_PROFILE_CACHE_TTL = env.int("SOURCE_PROFILE_CACHE_TTL", 60 * 60)
+
+# pull_observations accumulates transformed observations across ER pages and
+# sources, and sends a batch to the sensors API once it reaches either limit
+# or has waited this long since its first observation.
+OBSERVATION_BATCH_MAX_RECORDS = env.int("OBSERVATION_BATCH_MAX_RECORDS", 1000)
+OBSERVATION_BATCH_MAX_BYTES = env.int("OBSERVATION_BATCH_MAX_BYTES", 1024 * 1024)
+OBSERVATION_BATCH_MAX_DELAY_SECONDS = env.float("OBSERVATION_BATCH_MAX_DELAY_SECONDS", 5.0)
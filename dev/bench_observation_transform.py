@@ -0,0 +1,85 @@
+"""Micro-benchmark: per-observation cost of transform_observations_to_gundi_schema.
+
+Times the observation transform with a SourceProfileResolver whose profiles are
+already built (the steady state of a pull), plus the bare construction and
+lookup of the source_profiles records, so changes to the per-observation path
+can be compared before and after.
+
+Usage:
+    python dev/bench_observation_transform.py
+    # optional: N_OBSERVATIONS=200000 N_SOURCES=50 N_ASSIGNMENTS=20 python dev/bench_observation_transform.py
+"""
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.actions.handlers import transform_observations_to_gundi_schema  # noqa: E402
+from app.actions.source_profiles import (  # noqa: E402
+    Assignment, ResolvedSource, SourceProfile, SourceProfileResolver, resolve_source,
+)
+
+N_OBSERVATIONS = int(os.environ.get("N_OBSERVATIONS", 100_000))
+N_SOURCES = int(os.environ.get("N_SOURCES", 20))
+N_ASSIGNMENTS = int(os.environ.get("N_ASSIGNMENTS", 10))
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def build_resolver():
+    resolver = SourceProfileResolver(er_client=None)
+    for s in range(N_SOURCES):
+        # A collar swapped between animals every 30 days.
+        resolver._cache[f"src-{s}"] = SourceProfile(
+            manufacturer_id=f"SERIAL-{s}",
+            assignments=[
+                Assignment(
+                    lower=BASE + timedelta(days=30 * a),
+                    upper=BASE + timedelta(days=30 * (a + 1)),
+                    subject_name=f"subject-{s}-{a}",
+                    subject_type="elephant",
+                )
+                for a in range(N_ASSIGNMENTS)
+            ],
+        )
+    return resolver
+
+
+def build_observations():
+    span = 30 * N_ASSIGNMENTS * 24 * 3600
+    return [
+        {
+            "id": f"obs-{i}",
+            "source": f"src-{i % N_SOURCES}",
+            "recorded_at": (BASE + timedelta(seconds=(i * 7919) % span)).isoformat().replace("+00:00", "Z"),
+            "location": {"longitude": 35.0, "latitude": -1.0},
+            "exclusion_flags": 0,
+        }
+        for i in range(N_OBSERVATIONS)
+    ]
+
+
+def per_call_us(stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    resolver = build_resolver()
+    observations = build_observations()
+    profile = resolver._cache["src-0"]
+    when = BASE + timedelta(days=45)
+
+    transform_us = min(timeit.repeat(
+        lambda: transform_observations_to_gundi_schema(observations, resolver=resolver), number=1, repeat=3
+    )) / N_OBSERVATIONS * 1e6
+    print(f"{N_OBSERVATIONS} observations, {N_SOURCES} sources, {N_ASSIGNMENTS} assignments each")
+    print(f"transform_observations_to_gundi_schema: {transform_us:8.2f} us/observation")
+    print(f"resolve_source:                         {per_call_us(lambda: resolve_source(profile, 'src-0', when), 100_000):8.2f} us/call")
+    print(f"ResolvedSource(...):                    {per_call_us(lambda: ResolvedSource(external_source_id='S', source_name='n', subject_type='t'), 100_000):8.2f} us/call")
+    print(f"Assignment(...):                        {per_call_us(lambda: Assignment(lower=when, upper=None, subject_name='n'), 100_000):8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()